@@ -39,7 +39,10 @@ INSTALL_REQUIRES = [
 ]
 if sys.version_info < (3, 5):
     INSTALL_REQUIRES.append('configparser')
-EXTRAS_REQUIRE = {}
+EXTRAS_REQUIRE = {
+    'zstd': ['zstandard'],
+    'lz4': ['lz4'],
+}
 TESTS_REQUIRE = [
     'tox',
     'mock',
@@ -50,15 +50,18 @@ a new database and populate it on the next run.
 Future versions of PyBEL will include database integrity checks and provide upgrade procedures/scripts.
 """
 
+from . import columnar
 from . import constants
 from . import io
 from .canonicalize import to_bel
+from .columnar import to_columnar, from_columnar
 from .cx import to_cx_json, from_cx_json
 from .graph import BELGraph
 from .io import *
 from .manager.database_io import to_database, from_database
 
-__all__ = ['BELGraph', 'to_database', 'from_database', 'to_bel', 'to_cx_json', 'from_cx_json'] + list(io.__all__)
+__all__ = ['BELGraph', 'to_database', 'from_database', 'to_bel', 'to_cx_json', 'from_cx_json', 'to_columnar',
+           'from_columnar'] + list(io.__all__)
 
 __version__ = '0.4.1-dev'
 
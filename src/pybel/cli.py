@@ -23,7 +23,7 @@ import click
 
 from .canonicalize import to_bel
 from .constants import PYBEL_DIR, DEFAULT_CACHE_LOCATION
-from .io import from_lines, from_url, to_json, to_csv, to_graphml, to_pickle, to_neo4j
+from .io import from_lines, from_url, to_json, to_jsonl, to_csv, to_graphml, to_pickle, to_neo4j
 from .manager.cache import CacheManager
 from .manager.database_io import to_database, from_database
 from .manager.graph_cache import GraphCacheManager
@@ -54,6 +54,8 @@ def main():
 @click.option('--csv', help='Output path for *.csv')
 @click.option('--graphml', help='Output path for GraphML output. Use *.graphml for Cytoscape')
 @click.option('--json', type=click.File('w'), help='Output path for Node-link *.json')
+@click.option('--jsonl', type=click.File('w'), help='Output path for JSON Lines *.jsonl with one node or edge per line')
+@click.option('--jsonl-bel', is_flag=True, help='Include the BEL for each node and edge in the JSON Lines output')
 @click.option('--pickle', help='Output path for NetworkX *.gpickle')
 @click.option('--bel', type=click.File('w'), help='Output canonical BEL')
 @click.option('--neo', help="Connection string for neo4j upload")
@@ -65,8 +67,9 @@ def main():
 @click.option('--complete-origin', is_flag=True, help="Complete origin from protein to gene")
 @click.option('--no-citation-clearing', is_flag=True, help='Turn off citation clearing')
 @click.option('-v', '--verbose', count=True)
-def convert(path, url, database_name, database_connection, csv, graphml, json, pickle, bel, neo, neo_context,
-            store_default, store, allow_naked_names, allow_nested, complete_origin, no_citation_clearing, verbose):
+def convert(path, url, database_name, database_connection, csv, graphml, json, jsonl, jsonl_bel, pickle, bel, neo,
+            neo_context, store_default, store, allow_naked_names, allow_nested, complete_origin, no_citation_clearing,
+            verbose):
     """Options for multiple outputs/conversions"""
 
     log.setLevel(int(5 * verbose ** 2 / 2 - 25 * verbose / 2 + 20))
@@ -97,6 +100,10 @@ def convert(path, url, database_name, database_connection, csv, graphml, json, p
         log.info('Outputting json to %s', json)
         to_json(g, json)
 
+    if jsonl:
+        log.info('Outputting JSON Lines to %s', jsonl)
+        to_jsonl(g, jsonl, bel=jsonl_bel)
+
     if pickle:
         log.info('Outputting pickle to %s', pickle)
         to_pickle(g, pickle)
@@ -165,6 +172,24 @@ def insert(url, path):
         dcm.ensure_namespace_owl(url)
 
 
+@definitions.command(help='Update cached namespaces and annotations whose files changed')
+@click.option('--url', help='Resource to refresh. Defaults to all')
+@click.option('--path', help='Cache location. Defaults to {}'.format(DEFAULT_CACHE_LOCATION))
+def refresh(url, path):
+    dcm = CacheManager(connection=path)
+
+    if not url:
+        refreshed = dcm.refresh()
+    else:
+        try:
+            refreshed = [url] if dcm.refresh_definition(url) else []
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--url')
+
+    for line in refreshed:
+        click.echo(line)
+
+
 @definitions.command(help='List URLs of cached resources, or contents of a specific resource')
 @click.option('--url', help='Resource to list')
 @click.option('--path', help='Cache location. Defaults to {}'.format(DEFAULT_CACHE_LOCATION))
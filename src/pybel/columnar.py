@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+This module contains a columnar binary format for BEL graphs that can be read with :code:`mmap`. Unlike
+:func:`pybel.to_bytes`, it doesn't depend on the version of PyBEL, and a subgraph can be loaded without reading
+the whole graph.
+
+A file contains a header, a table of JSON strings, an array of node records, and an array of edge records. Each node
+record holds the identifiers of its tuple and data in the string table. Each edge record holds the indices of its
+source and target nodes, and the identifiers of its key, relation, citation, evidence, annotations, and the rest of
+its data in the string table. Equal strings are only stored once, so edges share their citations, evidences, and
+annotations.
+
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from .constants import RELATION, CITATION, EVIDENCE, ANNOTATIONS, GRAPH_ANNOTATION_LIST
+from .graph import BELGraph
+from .utils import list2tuple
+
+__all__ = [
+    'to_columnar',
+    'from_columnar',
+    'ColumnarGraph',
+]
+
+#: The bytes at the beginning of every columnar file
+COLUMNAR_MAGIC = b'PYBELCOL'
+
+#: The version of the columnar format. Files with other versions can't be read.
+COLUMNAR_FORMAT_VERSION = 2
+
+#: The magic bytes, format version, number of strings, nodes, and edges, and the offsets of the string index, string
+#: data, node records, and edge records
+HEADER = struct.Struct('<8sIIIIQQQQ')
+
+#: The offset of each string's end in the string data
+STRING_OFFSET = struct.Struct('<Q')
+
+#: The string identifiers of a node's tuple and data
+NODE_RECORD = struct.Struct('<II')
+
+#: The source index, target index, and the string identifiers of the key, relation, citation, evidence, annotations,
+#: and the rest of the data of an edge
+EDGE_RECORD = struct.Struct('<IIIIIIII')
+
+#: The string identifier for data that doesn't have a column's key
+MISSING = 0xFFFFFFFF
+
+#: The string identifier of the graph's metadata
+METADATA_STRING = 0
+
+#: The edge data keys that have their own column
+EDGE_COLUMNS = RELATION, CITATION, EVIDENCE, ANNOTATIONS
+
+
+def _dumps(value):
+    """Serializes a value to canonical JSON bytes, so equal values share a string"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def _graph_metadata(graph):
+    metadata = dict(graph.graph)
+    if GRAPH_ANNOTATION_LIST in metadata:
+        metadata[GRAPH_ANNOTATION_LIST] = {k: sorted(v) for k, v in metadata[GRAPH_ANNOTATION_LIST].items()}
+    return metadata
+
+
+def to_columnar(graph, path):
+    """Writes a graph to a file in the columnar format
+
+    :param graph: A BEL graph
+    :type graph: BELGraph
+    :param path: The path of the file to write
+    :type path: str
+    """
+    strings = []
+    string_ids = {}
+
+    def get_string_id(value):
+        s = _dumps(value)
+        string_id = string_ids.get(s)
+
+        if string_id is None:
+            string_id = string_ids[s] = len(strings)
+            strings.append(s)
+
+        return string_id
+
+    def get_column_string_id(data, key):
+        return get_string_id(data[key]) if key in data else MISSING
+
+    get_string_id(_graph_metadata(graph))
+
+    node_index = {}
+    node_records = []
+
+    for node, data in graph.nodes_iter(data=True):
+        node_index[node] = len(node_records)
+        node_records.append(NODE_RECORD.pack(get_string_id(node), get_string_id(dict(data))))
+
+    edge_records = []
+
+    for u, v, key, data in graph.edges_iter(keys=True, data=True):
+        extra = {k: value for k, value in data.items() if k not in EDGE_COLUMNS}
+
+        edge_records.append(EDGE_RECORD.pack(
+            node_index[u],
+            node_index[v],
+            get_string_id(key),
+            get_column_string_id(data, RELATION),
+            get_column_string_id(data, CITATION),
+            get_column_string_id(data, EVIDENCE),
+            get_column_string_id(data, ANNOTATIONS),
+            get_string_id(extra) if extra else MISSING
+        ))
+
+    strings_index_offset = HEADER.size
+    strings_data_offset = strings_index_offset + STRING_OFFSET.size * len(strings)
+    nodes_offset = strings_data_offset + sum(len(s) for s in strings)
+    edges_offset = nodes_offset + NODE_RECORD.size * len(node_records)
+
+    with open(os.path.expanduser(path), 'wb') as f:
+        f.write(HEADER.pack(
+            COLUMNAR_MAGIC,
+            COLUMNAR_FORMAT_VERSION,
+            len(strings),
+            len(node_records),
+            len(edge_records),
+            strings_index_offset,
+            strings_data_offset,
+            nodes_offset,
+            edges_offset
+        ))
+
+        end = 0
+        for s in strings:
+            end += len(s)
+            f.write(STRING_OFFSET.pack(end))
+
+        for s in strings:
+            f.write(s)
+
+        for record in node_records:
+            f.write(record)
+
+        for record in edge_records:
+            f.write(record)
+
+
+class ColumnarGraph(object):
+    """Reads a graph in the columnar format with :code:`mmap`, so only the parts that are used are read from disk"""
+
+    def __init__(self, path):
+        """
+        :param path: The path of a file written by :func:`to_columnar`
+        :type path: str
+        :raises ValueError: if the file isn't in the columnar format, or has a different format version
+        """
+        self.path = os.path.expanduser(path)
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError('{} is not a columnar BEL graph'.format(self.path))
+
+        (
+            magic,
+            format_version,
+            self.number_of_strings,
+            self._number_of_nodes,
+            self._number_of_edges,
+            self._strings_index_offset,
+            self._strings_data_offset,
+            self._nodes_offset,
+            self._edges_offset
+        ) = HEADER.unpack_from(self._mmap, 0)
+
+        if magic != COLUMNAR_MAGIC:
+            self.close()
+            raise ValueError('{} is not a columnar BEL graph'.format(self.path))
+
+        if format_version != COLUMNAR_FORMAT_VERSION:
+            self.close()
+            raise ValueError('Using columnar format version {}, tried reading version {}'.format(
+                COLUMNAR_FORMAT_VERSION, format_version))
+
+    def close(self):
+        """Closes the memory map of the file"""
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def number_of_nodes(self):
+        return self._number_of_nodes
+
+    def number_of_edges(self):
+        return self._number_of_edges
+
+    def _get_string_bytes(self, string_id):
+        end, = STRING_OFFSET.unpack_from(self._mmap, self._strings_index_offset + STRING_OFFSET.size * string_id)
+
+        if string_id == 0:
+            start = 0
+        else:
+            start, = STRING_OFFSET.unpack_from(self._mmap,
+                                               self._strings_index_offset + STRING_OFFSET.size * (string_id - 1))
+
+        return self._mmap[self._strings_data_offset + start:self._strings_data_offset + end]
+
+    def get_string(self, string_id):
+        """Gets a value from the string table
+
+        :param string_id: The identifier of the string
+        :type string_id: int
+        :return: The deserialized JSON value, or None if the identifier is :data:`MISSING`
+        """
+        if string_id == MISSING:
+            return
+
+        return json.loads(self._get_string_bytes(string_id).decode('utf-8'))
+
+    @property
+    def graph(self):
+        """The graph's metadata"""
+        metadata = self.get_string(METADATA_STRING)
+        if GRAPH_ANNOTATION_LIST in metadata:
+            metadata[GRAPH_ANNOTATION_LIST] = {k: set(v) for k, v in metadata[GRAPH_ANNOTATION_LIST].items()}
+        return metadata
+
+    def _get_node_record(self, node_index):
+        return NODE_RECORD.unpack_from(self._mmap, self._nodes_offset + NODE_RECORD.size * node_index)
+
+    def _get_edge_record(self, edge_index):
+        return EDGE_RECORD.unpack_from(self._mmap, self._edges_offset + EDGE_RECORD.size * edge_index)
+
+    def get_node(self, node_index):
+        """Gets a node by its index
+
+        :param node_index: The index of the node
+        :type node_index: int
+        :return: A pair of the node's tuple and data
+        :rtype: tuple[tuple,dict]
+        """
+        node_string, data_string = self._get_node_record(node_index)
+        return list2tuple(self.get_string(node_string)), self.get_string(data_string)
+
+    def get_edge(self, edge_index):
+        """Gets an edge by its index
+
+        :param edge_index: The index of the edge
+        :type edge_index: int
+        :return: A quadruple of the edge's source, target, key, and data
+        :rtype: tuple[tuple,tuple,int,dict]
+        """
+        source, target, key, _, _, _, _, _ = record = self._get_edge_record(edge_index)
+        u, v = self._get_node_tuple(source), self._get_node_tuple(target)
+        return u, v, self._get_key(key), self._get_edge_data(record)
+
+    def _get_node_tuple(self, node_index):
+        return list2tuple(self.get_string(self._get_node_record(node_index)[0]))
+
+    def _get_key(self, string_id):
+        return list2tuple(self.get_string(string_id))
+
+    def _get_edge_data(self, record):
+        relation, citation, evidence, annotations, extra = record[3:]
+
+        data = self.get_string(extra) or {}
+
+        for column, string_id in zip(EDGE_COLUMNS, (relation, citation, evidence, annotations)):
+            if string_id != MISSING:
+                data[column] = self.get_string(string_id)
+
+        return data
+
+    def find_node_indices(self, nodes):
+        """Finds the indices of the given nodes by comparing their serialized tuples, without deserializing the others
+
+        :param nodes: An iterable of node tuples
+        :type nodes: iter[tuple]
+        :return: A dictionary of {node: index} for the nodes in this graph
+        :rtype: dict
+        """
+        targets = {_dumps(node): node for node in nodes}
+        result = {}
+
+        for node_index in range(self._number_of_nodes):
+            node_bytes = self._get_string_bytes(self._get_node_record(node_index)[0])
+
+            if node_bytes in targets:
+                result[targets[node_bytes]] = node_index
+
+        return result
+
+    def to_graph(self, **kwargs):
+        """Loads the whole graph
+
+        :param kwargs: Keyword arguments to pass to :class:`pybel.BELGraph`
+        :rtype: BELGraph
+        """
+        return self._build_graph(range(self._number_of_nodes), range(self._number_of_edges), **kwargs)
+
+    def subgraph(self, nodes, **kwargs):
+        """Loads the subgraph induced by the given nodes. Only the string table entries of the given nodes and the
+        edges between them are read.
+
+        :param nodes: An iterable of node tuples
+        :type nodes: iter[tuple]
+        :param kwargs: Keyword arguments to pass to :class:`pybel.BELGraph`
+        :rtype: BELGraph
+        """
+        node_indices = set(self.find_node_indices(nodes).values())
+
+        edge_indices = [
+            edge_index
+            for edge_index in range(self._number_of_edges)
+            if set(self._get_edge_record(edge_index)[:2]) <= node_indices
+        ]
+
+        return self._build_graph(sorted(node_indices), edge_indices, **kwargs)
+
+    def _build_graph(self, node_indices, edge_indices, **kwargs):
+        graph = BELGraph(**kwargs)
+        graph.graph.update(self.graph)
+
+        nodes = {}
+
+        for node_index in node_indices:
+            nodes[node_index], data = self.get_node(node_index)
+            graph.add_node(nodes[node_index], attr_dict=data)
+
+        for edge_index in edge_indices:
+            record = self._get_edge_record(edge_index)
+            graph.add_edge(nodes[record[0]], nodes[record[1]], key=self._get_key(record[2]),
+                           attr_dict=self._get_edge_data(record))
+
+        return graph
+
+
+def from_columnar(path, **kwargs):
+    """Reads a graph from a file in the columnar format
+
+    :param path: The path of a file written by :func:`to_columnar`
+    :type path: str
+    :param kwargs: Keyword arguments to pass to :class:`pybel.BELGraph`
+    :rtype: BELGraph
+    """
+    with ColumnarGraph(path) as columnar_graph:
+        return columnar_graph.to_graph(**kwargs)
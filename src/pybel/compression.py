@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+This module contains the codecs used to compress pickled graphs and the node and edge data in the Edge Store.
+
+Compressed data starts with a header of :data:`HEADER_MAGIC`, the identifier of the codec, and the version of the
+header. Data without the header is returned unchanged by :func:`decompress`, so pickles written before compression
+was added can still be read.
+
+The :code:`zlib` codec is always available and :code:`lzma` is available on Python 3. The :code:`zstd` and :code:`lz4`
+codecs can be used if the :code:`zstandard` and :code:`lz4` packages are installed. Other codecs can be added with
+:func:`register_codec`.
+
+"""
+
+import logging
+import zlib
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+__all__ = [
+    'Codec',
+    'register_codec',
+    'get_codec',
+    'get_codec_names',
+    'compress',
+    'decompress',
+    'is_compressed',
+]
+
+#: The first byte of compressed data. It isn't a pickle opcode, so compressed data can't be mistaken for a pickle.
+HEADER_MAGIC = b'\xbe'
+
+#: The version of the header
+HEADER_VERSION = 1
+
+#: The length of the magic byte, codec identifier, and header version
+HEADER_LENGTH = 3
+
+#: The codec used by :class:`pybel.manager.graph_cache.GraphCacheManager` by default
+DEFAULT_CODEC = 'zlib'
+
+Codec = namedtuple('Codec', ['name', 'id', 'compress', 'decompress'])
+
+_codecs_by_name = {}
+_codecs_by_id = {}
+
+
+def register_codec(name, codec_id, compress, decompress):
+    """Registers a codec
+
+    :param name: The name of the codec
+    :type name: str
+    :param codec_id: The identifier of the codec that's stored in the header, between 0 and 255
+    :type codec_id: int
+    :param compress: A function from bytes to compressed bytes
+    :type compress: types.FunctionType
+    :param decompress: A function from compressed bytes to bytes
+    :type decompress: types.FunctionType
+    :raises ValueError: if another codec already has the name or identifier
+    """
+    if not 0 <= codec_id <= 255:
+        raise ValueError('Codec identifier must be between 0 and 255: {}'.format(codec_id))
+
+    if name in _codecs_by_name or codec_id in _codecs_by_id:
+        raise ValueError('Codec already registered: {} ({})'.format(name, codec_id))
+
+    codec = Codec(name, codec_id, compress, decompress)
+    _codecs_by_name[name] = _codecs_by_id[codec_id] = codec
+
+
+def get_codec(name):
+    """Gets a registered codec by name
+
+    :param name: The name of the codec
+    :type name: str
+    :rtype: Codec
+    :raises ValueError: if the codec isn't registered, which happens if its package isn't installed
+    """
+    if name not in _codecs_by_name:
+        raise ValueError('Unknown codec: {}. Available codecs: {}'.format(name, ', '.join(get_codec_names())))
+
+    return _codecs_by_name[name]
+
+
+def get_codec_names():
+    """Gets the names of the registered codecs
+
+    :rtype: list[str]
+    """
+    return sorted(_codecs_by_name)
+
+
+def compress(data, codec=DEFAULT_CODEC):
+    """Compresses bytes and adds a header recording the codec
+
+    :param data: The bytes to compress
+    :type data: bytes
+    :param codec: The name of the codec
+    :type codec: str
+    :rtype: bytes
+    """
+    codec = get_codec(codec)
+    return HEADER_MAGIC + bytes(bytearray([codec.id, HEADER_VERSION])) + codec.compress(data)
+
+
+def is_compressed(data):
+    """Checks if the bytes start with a compression header
+
+    :param data: Bytes from :func:`compress` or any other bytes
+    :type data: bytes
+    :rtype: bool
+    """
+    return data[:1] == HEADER_MAGIC
+
+
+def decompress(data):
+    """Decompresses bytes from :func:`compress`. Bytes without a compression header are returned unchanged.
+
+    :param data: Bytes from :func:`compress` or uncompressed bytes
+    :type data: bytes
+    :rtype: bytes
+    :raises ValueError: if the header's codec isn't registered, or its version is unknown
+    """
+    if not is_compressed(data):
+        return data
+
+    codec_id, version = bytearray(data[1:HEADER_LENGTH])
+
+    if version != HEADER_VERSION:
+        raise ValueError('Unknown compression header version: {}'.format(version))
+
+    if codec_id not in _codecs_by_id:
+        raise ValueError('Unknown codec identifier: {}. Is its package installed?'.format(codec_id))
+
+    return _codecs_by_id[codec_id].decompress(data[HEADER_LENGTH:])
+
+
+register_codec('none', 0, bytes, bytes)
+register_codec('zlib', 1, zlib.compress, zlib.decompress)
+
+try:
+    import lzma
+except ImportError:
+    log.debug('lzma codec is not available')
+else:
+    register_codec('lzma', 2, lzma.compress, lzma.decompress)
+
+try:
+    import zstandard
+except ImportError:
+    log.debug('zstd codec is not available')
+else:
+    register_codec(
+        'zstd',
+        3,
+        lambda data: zstandard.ZstdCompressor().compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+
+try:
+    import lz4.frame
+except ImportError:
+    log.debug('lz4 codec is not available')
+else:
+    register_codec('lz4', 4, lz4.frame.compress, lz4.frame.decompress)
@@ -18,6 +18,13 @@ PYBEL_DATA_DIR = os.path.join(PYBEL_DIR, 'data')
 if not os.path.exists(PYBEL_DATA_DIR):
     os.mkdir(PYBEL_DATA_DIR)
 
+#: The directory where downloaded namespace, annotation, and BEL files are stored. See :class:`pybel.utils.HTTPCache`
+PYBEL_HTTP_CACHE_DIR = os.path.join(PYBEL_DIR, 'http')
+
+#: The directory where snapshots of namespaces and annotations are stored. See
+#: :class:`pybel.manager.snapshot.DefinitionSnapshot`
+PYBEL_SNAPSHOT_DIR = os.path.join(PYBEL_DIR, 'snapshots')
+
 DEFAULT_CACHE_NAME = 'pybel_cache.db'
 DEFAULT_CACHE_LOCATION = os.path.join(PYBEL_DATA_DIR, DEFAULT_CACHE_NAME)
 
@@ -1,5 +1,9 @@
+import threading
+
 from .manager.cache import CacheManager
-from .parser import MetadataParser
+from .parser import MetadataParser, BelParser
+
+_local = threading.local()
 
 
 def build_metadata_parser(manager):
@@ -11,3 +15,24 @@ def build_metadata_parser(manager):
         return MetadataParser(CacheManager(connection=manager))
     else:
         return MetadataParser(CacheManager())
+
+
+def build_bel_parser(graph, **kwargs):
+    """Gets a :class:`pybel.parser.BelParser` for the given graph. Building and streamlining the grammar is expensive,
+    so it is only done once per thread. Afterwards, the same parser is reset with the new graph and definitions. The
+    parser uses the fast path for relations between simple terms. Reset it with :code:`reset(None)` when done, so it
+    doesn't keep the graph and definitions alive until the next call.
+
+    :param graph: The BEL Graph to use to store the network
+    :type graph: BELGraph
+    :param kwargs: Keyword arguments to pass to :meth:`pybel.parser.BelParser.reset`
+    :rtype: pybel.parser.BelParser
+    """
+    bel_parser = getattr(_local, 'bel_parser', None)
+
+    if bel_parser is None:
+        bel_parser = _local.bel_parser = BelParser(graph=graph, autostreamline=True, fast_path=True, **kwargs)
+    else:
+        bel_parser.reset(graph, **kwargs)
+
+    return bel_parser
@@ -11,8 +11,11 @@ Convenient property definitions are given for these attributes.
 
 """
 
+import hashlib
 import itertools as itt
+import json
 import logging
+import multiprocessing
 import time
 from collections import defaultdict, Counter
 
@@ -21,28 +24,38 @@ from pkg_resources import get_distribution
 from pyparsing import ParseException
 
 from .constants import *
-from .constructors import build_metadata_parser
+from .constructors import build_metadata_parser, build_bel_parser
 from .exceptions import PyBelWarning
-from .parser.parse_bel import BelParser
+from .parser.baseparser import enable_packrat, get_packrat_cache_size
 from .parser.parse_exceptions import MissingMetadataException
-from .parser.utils import split_file_to_annotations_and_definitions, subdict_matches
-from .utils import expand_dict
+from .parser.utils import split_file_to_annotations_and_definitions_lazy, split_statements_by_citation, \
+    subdict_matches
+from .utils import expand_dict, string_types
 
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
 __all__ = ['BELGraph']
 
 log = logging.getLogger(__name__)
 
+#: The minimum number of statements given to each worker process when parsing in parallel
+PARALLEL_CHUNK_SIZE = 2000
+
 
 class BELGraph(nx.MultiDiGraph):
     """The BELGraph class is a container for BEL networks that is based on the NetworkX MultiDiGraph data structure"""
 
     def __init__(self, lines=None, manager=None, complete_origin=False, allow_naked_names=False,
-                 allow_nested=False, citation_clearing=True, *attrs, **kwargs):
+                 allow_nested=False, citation_clearing=True, workers=None, compact=False, indexed=False, *attrs,
+                 **kwargs):
         """The default constructor parses a BEL file from an iterable of strings. This can be a file, file-like, or
         list of strings.
 
@@ -59,9 +72,32 @@ class BELGraph(nx.MultiDiGraph):
         :param citation_clearing: Should :code:`SET Citation` statements clear evidence and all annotations?
                                     Delegated to :class:`pybel.parser.ControlParser`
         :type citation_clearing: bool
+        :param workers: The number of processes to use for parsing statements. Defaults to parsing in this process.
+        :type workers: int
+        :param compact: If true, shares one copy of each node and string between all nodes and edges, and stores
+                        the data of nodes with only a function, namespace, and name as :class:`CompactNodeData`.
+                        Edges from the same citation, evidence, and annotations also share the same citation and
+                        annotation dictionaries, so they should be copied before being changed.
+        :type compact: bool
+        :param indexed: If true, keeps an index of the nodes by function and namespace, and of the edges by relation,
+                        citation, and annotations, so filtering with :meth:`nodes_iter` and :meth:`edges_iter` only
+                        checks the matching nodes and edges. Data changed without :meth:`add_node` or
+                        :meth:`add_edge` isn't reindexed.
+        :type indexed: bool
         :param \*attrs: arguments to pass to :py:meth:`networkx.MultiDiGraph`
         :param \**kwargs: keyword arguments to pass to :py:meth:`networkx.MultiDiGraph`
         """
+        self.compact = compact
+        self._interned = {}
+        self._interned_citations = {}
+        self._interned_annotations = {}
+
+        self.indexed = indexed
+        self._node_index = defaultdict(set)
+        self._edge_index = defaultdict(set)
+
+        self._structure_digest = None
+
         nx.MultiDiGraph.__init__(self, *attrs, **kwargs)
 
         self._warnings = []
@@ -74,11 +110,12 @@ class BELGraph(nx.MultiDiGraph):
                 complete_origin=complete_origin,
                 allow_naked_names=allow_naked_names,
                 allow_nested=allow_nested,
-                citation_clearing=citation_clearing
+                citation_clearing=citation_clearing,
+                workers=workers
             )
 
     def parse_lines(self, lines, manager=None, complete_origin=False, allow_naked_names=False, allow_nested=False,
-                    citation_clearing=True):
+                    citation_clearing=True, workers=None):
         """Parses an iterable of lines into this graph
 
         :param lines: iterable over lines of BEL data file
@@ -94,9 +131,12 @@ class BELGraph(nx.MultiDiGraph):
         :param citation_clearing: Should :code:`SET Citation` statements clear evidence and all annotations?
                                     Delegated to :class:`pybel.parser.ControlParser`
         :type citation_clearing: bool
+        :param workers: The number of processes to use for parsing statements. Only used with citation clearing,
+                        since the statements are divided between the processes at :code:`SET Citation` statements.
+        :type workers: int
         """
 
-        docs, definitions, states = split_file_to_annotations_and_definitions(lines)
+        docs, definitions, states = split_file_to_annotations_and_definitions_lazy(lines)
 
         metadata_parser = build_metadata_parser(manager)
 
@@ -104,8 +144,7 @@ class BELGraph(nx.MultiDiGraph):
 
         self.parse_definitions(definitions, metadata_parser)
 
-        bel_parser = BelParser(
-            graph=self,
+        parser_kwargs = dict(
             namespace_dicts=metadata_parser.namespace_dict,
             annotation_dicts=metadata_parser.annotations_dict,
             namespace_expressions=metadata_parser.namespace_re,
@@ -114,10 +153,21 @@ class BELGraph(nx.MultiDiGraph):
             allow_naked_names=allow_naked_names,
             allow_nested=allow_nested,
             citation_clearing=citation_clearing,
-            autostreamline=True
         )
 
-        self.parse_statements(states, bel_parser)
+        if workers is not None and 1 < workers and not citation_clearing:
+            log.warning('Parallel parsing is not possible without citation clearing. Parsing in serial.')
+            workers = None
+
+        if workers is not None and 1 < workers:
+            self.parse_statements_parallel(states, parser_kwargs, workers)
+        else:
+            bel_parser = build_bel_parser(self, **parser_kwargs)
+            try:
+                self.parse_statements(states, bel_parser)
+            finally:
+                # the parser is kept for the next document, so it shouldn't keep this graph and its definitions alive
+                bel_parser.reset(None)
 
         log.info('Network has %d nodes and %d edges', self.number_of_nodes(), self.number_of_edges())
 
@@ -156,6 +206,8 @@ class BELGraph(nx.MultiDiGraph):
     def parse_definitions(self, definitions, metadata_parser):
         t = time.time()
 
+        metadata_parser.prefetch(line for _, line in definitions)
+
         for line_number, line in definitions:
             try:
                 metadata_parser.parseString(line)
@@ -193,11 +245,18 @@ class BELGraph(nx.MultiDiGraph):
     def parse_statements(self, statements, bel_parser):
         """Parses a list of statements from a BEL Script
 
-        :type statements: list of str
+        :param statements: An iterable over pairs of (line number, line)
+        :type statements: iter[tuple]
         :type bel_parser: BelParser
         """
         t = time.time()
 
+        self._parse_statements(statements, bel_parser)
+
+        log.info('Parsed statements section in %.02f seconds with %d warnings', time.time() - t, len(self.warnings))
+        self._log_warning_counts()
+
+    def _parse_statements(self, statements, bel_parser):
         for line_number, line in statements:
             try:
                 bel_parser.parseString(line)
@@ -211,15 +270,88 @@ class BELGraph(nx.MultiDiGraph):
                 log.exception('Line %07d - General Failure: %s', line_number, line)
                 self.add_warning(line_number, line, e, bel_parser.get_annotations())
 
-        log.info('Parsed statements section in %.02f seconds with %d warnings', time.time() - t, len(self.warnings))
-
+    def _log_warning_counts(self):
         for k, v in sorted(Counter(e.__class__.__name__ for _, _, e, _ in self.warnings).items(), reverse=True):
             log.debug('  %s: %d', k, v)
 
+    def parse_statements_parallel(self, statements, parser_kwargs, workers, chunk_size=None):
+        """Parses a list of statements from a BEL Script using a pool of worker processes. The statements are
+        divided into chunks at :code:`SET Citation` statements, which reset the state of the control parser, then the
+        nodes, edges, and warnings from each chunk are merged back into this graph in the original order.
+
+        :param statements: An iterable over pairs of (line number, line)
+        :type statements: iter[tuple]
+        :param parser_kwargs: Keyword arguments for building a :class:`pybel.parser.BelParser` in each worker
+        :type parser_kwargs: dict
+        :param workers: The number of worker processes
+        :type workers: int
+        :param chunk_size: The minimum number of statements per chunk. Defaults to :data:`PARALLEL_CHUNK_SIZE`
+        :type chunk_size: int
+        """
+        t = time.time()
+
+        chunks = split_statements_by_citation(statements, chunk_size or PARALLEL_CHUNK_SIZE)
+
+        pool = multiprocessing.Pool(
+            workers,
+            initializer=_init_statement_worker,
+            initargs=(parser_kwargs, get_packrat_cache_size())
+        )
+
+        try:
+            # only take a few chunks per worker at a time, so the statements aren't all read into memory at once
+            while True:
+                batch = list(itt.islice(chunks, 2 * workers))
+
+                if not batch:
+                    break
+
+                for nodes, edges, warnings in pool.imap(_parse_statement_chunk, batch):
+                    self._merge_statement_chunk(nodes, edges, warnings)
+
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+        log.info('Parsed statements section in %.02f seconds with %d warnings using %d workers', time.time() - t,
+                 len(self.warnings), workers)
+        self._log_warning_counts()
+
+    def _merge_statement_chunk(self, nodes, edges, warnings):
+        """Adds the results from parsing a chunk of statements in a worker process. Nodes that already exist are
+        skipped, as are the unqualified edges that were added along with them. Qualified edges get new keys in the
+        same order that they would have gotten from parsing in serial.
+        """
+        for node, data in nodes:
+            if node not in self:
+                self.add_node(node, attr_dict=data)
+
+        for u, v, key, data in edges:
+            if key in unqualified_edge_code.values():
+                if not self.has_edge(u, v, key):
+                    self.add_edge(u, v, key=key, attr_dict=data)
+            else:
+                self.add_edge(u, v, attr_dict=data)
+
+        self.warnings.extend(warnings)
+
     def edges_iter(self, nbunch=None, data=False, keys=False, default=None, **kwargs):
-        """Allows for filtering by checking keyword arguments are a subdictionary of each edges' data.
-            See :py:meth:`networkx.MultiDiGraph.edges_iter`"""
-        for u, v, k, d in nx.MultiDiGraph.edges_iter(self, nbunch=nbunch, data=True, keys=True, default=default):
+        """Allows for filtering by checking keyword arguments are a subdictionary of each edges' data. If the graph is
+            indexed, only the edges found in the index are checked. See :py:meth:`networkx.MultiDiGraph.edges_iter`"""
+        candidates = None
+
+        if self.indexed and nbunch is None:
+            candidates = _lookup_index(self._edge_index, _edge_query_index_keys(kwargs))
+
+        if candidates is None:
+            it = nx.MultiDiGraph.edges_iter(self, nbunch=nbunch, data=True, keys=True, default=default)
+        else:
+            it = ((u, v, k, self.edge[u][v][k]) for u, v, k in candidates if self._has_edge_key(u, v, k))
+
+        for u, v, k, d in it:
             if not subdict_matches(d, kwargs):
                 continue
             elif keys and data:
@@ -232,9 +364,19 @@ class BELGraph(nx.MultiDiGraph):
                 yield u, v
 
     def nodes_iter(self, data=False, **kwargs):
-        """Allows for filtering by checking keyword arguments are a subdictionary of each nodes' data.
-            See :py:meth:`networkx.MultiDiGraph.edges_iter`"""
-        for n, d in nx.MultiDiGraph.nodes_iter(self, data=True):
+        """Allows for filtering by checking keyword arguments are a subdictionary of each nodes' data. If the graph is
+            indexed, only the nodes found in the index are checked. See :py:meth:`networkx.MultiDiGraph.nodes_iter`"""
+        candidates = None
+
+        if self.indexed:
+            candidates = _lookup_index(self._node_index, _node_query_index_keys(kwargs))
+
+        if candidates is None:
+            it = nx.MultiDiGraph.nodes_iter(self, data=True)
+        else:
+            it = ((n, self.node[n]) for n in candidates if n in self.node)
+
+        for n, d in it:
             if not subdict_matches(d, kwargs):
                 continue
             elif data:
@@ -242,6 +384,153 @@ class BELGraph(nx.MultiDiGraph):
             else:
                 yield n
 
+    def _intern(self, value):
+        """Gets the copy of a string or tuple of strings that's shared throughout this graph"""
+        if isinstance(value, tuple):
+            interned = self._interned.get(value)
+
+            if interned is None:
+                interned = tuple(self._intern(element) for element in value)
+                self._interned[interned] = interned
+
+            return interned
+
+        return self._interned.setdefault(value, value)
+
+    def _intern_dict(self, table, value):
+        """Gets the read-only copy of a dictionary that's shared throughout this graph. Sets are frozen first. If a
+        value still can't be hashed, like a list, a private copy of the dictionary is returned instead.
+
+        :param table: The table of shared dictionaries, by their sorted items
+        :type table: dict
+        :param value: A dictionary
+        :type value: dict
+        :rtype: dict
+        """
+        key = tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+
+        try:
+            interned = table.get(key)
+        except TypeError:
+            return dict(value)
+
+        if interned is None:
+            interned = table[key] = FrozenDict((self._intern(k), self._intern(v)) for k, v in key)
+
+        return interned
+
+    def add_node(self, n, attr_dict=None, **attr):
+        """Adds a node. In compact mode, the node and its data are interned first. If the graph is indexed, the node
+            is added to the index. See :py:meth:`networkx.MultiDiGraph.add_node`"""
+        self._structure_digest = None
+
+        if self.compact:
+            n = self._add_compact_node(n, attr_dict=attr_dict, **attr)
+        else:
+            nx.MultiDiGraph.add_node(self, n, attr_dict=attr_dict, **attr)
+
+        if self.indexed:
+            for index_key in _node_index_keys(self.node[n]):
+                self._node_index[index_key].add(n)
+
+    def _add_compact_node(self, n, attr_dict=None, **attr):
+        if attr_dict is None:
+            attr_dict = attr
+        else:
+            attr_dict.update(attr)
+
+        n = self._intern(n)
+
+        if set(attr_dict) == CompactNodeData.slot_keys and not self.node.get(n):
+            attr_dict = CompactNodeData(
+                self._intern(attr_dict[FUNCTION]),
+                self._intern(attr_dict[NAMESPACE]),
+                self._intern(attr_dict[NAME])
+            )
+
+            if n in self.node:  # replaces the empty dictionary from a previously added edge
+                self.node[n] = attr_dict
+                return n
+
+        nx.MultiDiGraph.add_node(self, n, attr_dict=attr_dict)
+        return n
+
+    def add_edge(self, u, v, key=None, attr_dict=None, **attr):
+        """Adds an edge. In compact mode, the nodes, evidence, citation, and annotations are interned first. If the
+            graph is indexed, the edge is added to the index. See :py:meth:`networkx.MultiDiGraph.add_edge`"""
+        self._structure_digest = None
+
+        if self.compact:
+            attr_dict = dict(attr_dict, **attr) if attr_dict is not None else attr
+
+            if EVIDENCE in attr_dict:
+                attr_dict[EVIDENCE] = self._intern(attr_dict[EVIDENCE])
+
+            if CITATION in attr_dict:
+                attr_dict[CITATION] = self._intern_dict(self._interned_citations, attr_dict[CITATION])
+
+            if ANNOTATIONS in attr_dict:
+                attr_dict[ANNOTATIONS] = self._intern_dict(self._interned_annotations, attr_dict[ANNOTATIONS])
+
+            u, v, attr = self._intern(u), self._intern(v), {}
+
+        if self.indexed and key is None:
+            key = self._next_edge_key(u, v)
+
+        nx.MultiDiGraph.add_edge(self, u, v, key=key, attr_dict=attr_dict, **attr)
+
+        if self.indexed:
+            for index_key in _edge_index_keys(self.edge[u][v][key]):
+                self._edge_index[index_key].add((u, v, key))
+
+    def add_nodes_from(self, nodes, **attr):
+        """Adds nodes with :meth:`add_node`. See :py:meth:`networkx.MultiDiGraph.add_nodes_from`"""
+        for n in nodes:
+            try:
+                hash(n)
+                node, data = n, {}
+            except TypeError:
+                node, data = n
+
+            attr_dict = attr.copy()
+            attr_dict.update(data)
+            self.add_node(node, attr_dict=attr_dict)
+
+    def remove_node(self, n):
+        self._structure_digest = None
+        nx.MultiDiGraph.remove_node(self, n)
+
+    def remove_nodes_from(self, nbunch):
+        self._structure_digest = None
+        nx.MultiDiGraph.remove_nodes_from(self, nbunch)
+
+    def remove_edge(self, u, v, key=None):
+        self._structure_digest = None
+        nx.MultiDiGraph.remove_edge(self, u, v, key=key)
+
+    def remove_edges_from(self, ebunch):
+        self._structure_digest = None
+        nx.MultiDiGraph.remove_edges_from(self, ebunch)
+
+    def clear(self):
+        self._structure_digest = None
+        nx.MultiDiGraph.clear(self)
+
+    def _next_edge_key(self, u, v):
+        """Gets the key :py:meth:`networkx.MultiDiGraph.add_edge` would give a new edge between the given nodes"""
+        if u not in self.succ or v not in self.succ[u]:
+            return 0
+
+        key_dict = self.succ[u][v]
+        key = len(key_dict)
+        while key in key_dict:
+            key += 1
+
+        return key
+
+    def _has_edge_key(self, u, v, key):
+        return u in self.succ and v in self.succ[u] and key in self.succ[u][v]
+
     def add_simple_node(self, function, namespace, name):
         """Adds a simple node, with only a namespace and name
 
@@ -315,25 +604,459 @@ class BELGraph(nx.MultiDiGraph):
         """Adds a warning to the internal warning log in the graph, with optional context information"""
         self.warnings.append((line_number, line, exception, {} if context is None else context))
 
-    def __eq__(self, other):
+    def __getstate__(self):
+        """Leaves the tables of shared strings and dictionaries out of pickles, since they are rebuilt on loading"""
+        state = self.__dict__.copy()
+        state['_interned'] = {}
+        state['_interned_citations'] = {}
+        state['_interned_annotations'] = {}
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('compact', False)
+        state.setdefault('indexed', False)
+        state.setdefault('_structure_digest', None)
+        state.setdefault('_node_index', defaultdict(set))
+        state.setdefault('_edge_index', defaultdict(set))
+        state.setdefault('_interned', {})
+        state.setdefault('_interned_citations', {})
+        state.setdefault('_interned_annotations', {})
+        self.__dict__.update(state)
+
+        if not self.compact:
+            return
+
+        for node in self.nodes_iter():
+            self._intern(node)
+
+        for u, v, data in self.edges_iter(data=True):
+            if EVIDENCE in data:
+                self._intern(data[EVIDENCE])
+
+            for key, table in ((CITATION, self._interned_citations), (ANNOTATIONS, self._interned_annotations)):
+                if key in data:
+                    data[key] = self._intern_dict(table, data[key])
+
+    def digest(self):
+        """Gets a SHA-256 digest of the nodes, edges, their data, and the metadata of this graph that doesn't depend on
+        the order they were added in, so equal graphs have equal digests. The digest of the nodes and edges is cached
+        until they're changed with a method like :meth:`add_node`, :meth:`add_edge`, or :meth:`remove_edge`, so data
+        changed in place isn't noticed until then.
+
+        :return: A hexadecimal SHA-256 digest
+        :rtype: str
+        :raises TypeError: if the data can't be serialized to JSON
+        """
+        if self._structure_digest is None:
+            self._structure_digest = _digest_items(itt.chain(
+                (('node', node, data) for node, data in self.nodes_iter(data=True)),
+                (('edge', u, v, data) for u, v, data in self.edges_iter(data=True))
+            ))
 
+        h = hashlib.sha256(self._structure_digest.encode('utf-8'))
+        h.update(_canonical_json(self.graph).encode('utf-8'))
+        return h.hexdigest()
+
+    def __eq__(self, other):
+        """Checks if two graphs have the same nodes, edges, data, and metadata by comparing their digests. Falls back to
+        comparing them directly if their data can't be digested."""
         if not isinstance(other, BELGraph):
-            return False
+            return NotImplemented
+
+        try:
+            return self.digest() == other.digest()
+        except TypeError:
+            return _graphs_equal(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def _json_default(value):
+    """Converts the values :func:`json.dumps` can't serialize so graph data can be serialized canonically"""
+    if isinstance(value, MutableMapping):
+        return dict(value)
+
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=_canonical_json)
+
+    raise TypeError('{} can not be serialized'.format(value))
+
+
+def _canonical_json(value):
+    """Serializes a value to JSON with its keys sorted"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=_json_default)
+
+
+def _digest_items(items):
+    """Calculates a SHA-256 digest of a multiset of JSON serializable items that doesn't depend on their order
+
+    :param items: An iterable of JSON serializable items
+    :type items: iter
+    :return: A hexadecimal SHA-256 digest
+    :rtype: str
+    """
+    h = hashlib.sha256()
+
+    for item_digest in sorted(hashlib.sha256(_canonical_json(item).encode('utf-8')).digest() for item in items):
+        h.update(item_digest)
+
+    return h.hexdigest()
 
-        if set(self.nodes_iter()) != set(other.nodes_iter()):
+
+def _graphs_equal(graph, other):
+    """Compares two graphs' nodes, edges, data, and metadata directly. Parallel edges are compared as multisets."""
+    if graph.graph != other.graph:
+        return False
+
+    if graph.number_of_nodes() != other.number_of_nodes() or graph.number_of_edges() != other.number_of_edges():
+        return False
+
+    for node, data in graph.nodes_iter(data=True):
+        if node not in other.node or other.node[node] != data:
             return False
 
-        if set(self.edges_iter()) != set(other.edges_iter()):
+    for u, v in set(graph.edges_iter()):
+        if not other.has_edge(u, v):
             return False
 
-        for u, v in self.edges():
-            i = itt.product(self.edge[u][v].values(), other.edge[u][v].values())
-            r = list(filter(lambda q: q[0] == q[1], i))
-            if len(self.edge[u][v]) != len(r):
+        remaining = list(other.edge[u][v].values())
+        for data in graph.edge[u][v].values():
+            if data not in remaining:
                 return False
+            remaining.remove(data)
+
+    return True
+
+
+_statement_worker_parser = None
+
+
+def _init_statement_worker(parser_kwargs, packrat_cache_size=0):
+    """Gets the :class:`pybel.parser.BelParser` once for each worker process, and enables packrat parsing if it's
+    enabled in the parent process"""
+    global _statement_worker_parser
+
+    if packrat_cache_size != 0:
+        enable_packrat(packrat_cache_size)
+
+    _statement_worker_parser = build_bel_parser(BELGraph(), **parser_kwargs)
+
+
+def _parse_statement_chunk(statements):
+    """Parses a chunk of statements into a new graph in a worker process
+
+    :param statements: A list of pairs of (line number, line)
+    :type statements: list[tuple]
+    :return: A triple of the node list, edge list with keys, and warnings
+    :rtype: tuple
+    """
+    graph = BELGraph()
+    _statement_worker_parser.graph = graph
+    _statement_worker_parser.control_parser.clear()
+    graph._parse_statements(statements, _statement_worker_parser)
+    return graph.nodes(data=True), graph.edges(keys=True, data=True), graph.warnings
+
+
+#: The node data keys that are indexed in indexed graphs
+NODE_INDEX_KEYS = {FUNCTION, NAMESPACE}
+#: The edge data keys that are indexed in indexed graphs
+EDGE_INDEX_KEYS = {RELATION}
+#: The edge data keys whose dictionaries' entries are indexed in indexed graphs
+EDGE_INDEX_DICT_KEYS = {CITATION, ANNOTATIONS}
+
+
+def _is_hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _node_index_keys(data):
+    """Gets the index keys for a node's data dictionary
+
+    :rtype: iter[tuple]
+    """
+    for key in NODE_INDEX_KEYS:
+        if key in data and _is_hashable(data[key]):
+            yield key, data[key]
+
+
+def _edge_index_keys(data):
+    """Gets the index keys for an edge's data dictionary. Entries in nested dictionaries are indexed by their parent
+    key, their key, and their value. Values that can't be hashed, like sets of annotation values, are left out, since
+    only strings and lists of strings are looked up in the index.
+
+    :rtype: iter[tuple]
+    """
+    for key in EDGE_INDEX_KEYS:
+        if key in data and _is_hashable(data[key]):
+            yield key, data[key]
+
+    for key in EDGE_INDEX_DICT_KEYS:
+        if key in data:
+            for sub_key, value in data[key].items():
+                if _is_hashable(value):
+                    yield key, sub_key, value
+
+
+def _query_values(value):
+    """Gets the values a query matches with :func:`pybel.parser.utils.subdict_matches`, or None if they can't be
+    looked up in an index"""
+    if isinstance(value, string_types):
+        return [value]
+
+    if isinstance(value, (list, set, tuple)) and all(isinstance(element, string_types) for element in value):
+        return list(value)
+
+
+def _node_query_index_keys(query):
+    """Gets a list of the sets of index keys a node has to have at least one of in order to match the query
+
+    :param query: A query for :func:`pybel.parser.utils.subdict_matches`
+    :type query: dict
+    :rtype: list[list[tuple]]
+    """
+    result = []
+
+    for key in NODE_INDEX_KEYS:
+        values = _query_values(query.get(key))
+        if values is not None:
+            result.append([(key, value) for value in values])
+
+    return result
+
+
+def _edge_query_index_keys(query):
+    """Gets a list of the sets of index keys an edge has to have at least one of in order to match the query
+
+    :param query: A query for :func:`pybel.parser.utils.subdict_matches`
+    :type query: dict
+    :rtype: list[list[tuple]]
+    """
+    result = []
+
+    for key in EDGE_INDEX_KEYS:
+        values = _query_values(query.get(key))
+        if values is not None:
+            result.append([(key, value) for value in values])
+
+    for key in EDGE_INDEX_DICT_KEYS:
+        if not isinstance(query.get(key), dict):
+            continue
+
+        for sub_key, sub_value in query[key].items():
+            values = _query_values(sub_value)
+            if values is not None:
+                result.append([(key, sub_key, value) for value in values])
+
+    return result
+
+
+def _lookup_index(index, index_keys):
+    """Gets the items in the index that have at least one of each of the sets of index keys, or None if there are no
+    index keys to look up
+
+    :param index: A dictionary of {index key: set of items}
+    :type index: dict
+    :param index_keys: A list of the sets of index keys, from :func:`_node_query_index_keys` or
+                        :func:`_edge_query_index_keys`
+    :type index_keys: list[list[tuple]]
+    :rtype: set or None
+    """
+    if not index_keys:
+        return
 
+    candidate_sets = [
+        set().union(*(index[index_key] for index_key in alternatives if index_key in index))
+        for alternatives in index_keys
+    ]
+    candidate_sets.sort(key=len)
+
+    result = candidate_sets[0]
+    for candidates in candidate_sets[1:]:
+        if not result:
+            break
+        result = result.intersection(candidates)
+
+    return result
+
+
+class CompactNodeData(object):
+    """Stores the data dictionary of a node that only has a function, namespace, and name in slots instead of a
+    dictionary. It can still be used like a dictionary, and other keys can be added.
+
+    It doesn't inherit from :class:`MutableMapping` because that doesn't define ``__slots__`` on Python 2, so every
+    instance would get a ``__dict__`` anyway. It's registered as one instead.
+    """
+
+    __slots__ = ('function', 'namespace', 'name', 'extra')
+
+    #: The keys stored in slots
+    slot_keys = {FUNCTION, NAMESPACE, NAME}
+
+    def __init__(self, function, namespace, name):
+        self.function = function
+        self.namespace = namespace
+        self.name = name
+        self.extra = None
+
+    def _slot(self, key):
+        if key == FUNCTION:
+            return 'function'
+        elif key == NAMESPACE:
+            return 'namespace'
+        elif key == NAME:
+            return 'name'
+
+    def __getitem__(self, key):
+        slot = self._slot(key)
+
+        if slot is not None and getattr(self, slot) is not _missing:
+            return getattr(self, slot)
+        elif slot is None and self.extra is not None and key in self.extra:
+            return self.extra[key]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = self._slot(key)
+
+        if slot is not None:
+            setattr(self, slot, value)
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        self[key]  # raises KeyError if missing
+
+        slot = self._slot(key)
+
+        if slot is not None:
+            setattr(self, slot, _missing)
+        else:
+            del self.extra[key]
+
+    def __iter__(self):
+        for key, slot in ((FUNCTION, 'function'), (NAMESPACE, 'namespace'), (NAME, 'name')):
+            if getattr(self, slot) is not _missing:
+                yield key
+
+        if self.extra is not None:
+            for key in self.extra:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
         return True
 
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *args):
+        try:
+            value = self[key]
+        except KeyError:
+            if args:
+                return args[0]
+            raise
+
+        del self[key]
+        return value
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def update(self, *args, **kwargs):
+        for other in args + (kwargs,):
+            pairs = other.items() if hasattr(other, 'keys') else other
+            for key, value in pairs:
+                self[key] = value
+
+    def __eq__(self, other):
+        if not isinstance(other, MutableMapping):
+            return NotImplemented
+        return dict(self) == dict(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def copy(self):
+        return dict(self)
+
+    def __getstate__(self):
+        return dict(self)
+
+    def __setstate__(self, state):
+        self.function = self.namespace = self.name = _missing
+        self.extra = None
+        self.update(state)
+
+
+MutableMapping.register(CompactNodeData)
+
+
+_missing = object()
+
+
+def _freeze(value):
+    """Gets a frozen set for a set, so it can be shared, or the value itself"""
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+
+    return value
+
+
+class FrozenDict(dict):
+    """A dictionary that can't be changed. Compact graphs share one of these between all edges with the same citation
+    or annotations, so changing it would change all of them. Copy it with :code:`dict()` to change it.
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('{} is shared between edges and can not be changed'.format(self.__class__.__name__))
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
 
 def expand_edges(graph):
     """Returns a new graph with expanded edge data dictionaries
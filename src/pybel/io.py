@@ -8,6 +8,7 @@ PyBEL provides functions for input and output to several formats. This includes:
 - Pickle object (*.pickle)
 - GraphML (*.graphml)
 - JSON (*.json)
+- JSON Lines (*.jsonl)
 - Edge list (*.csv)
 - Relational database
 - Neo4J graph database
@@ -16,22 +17,24 @@ It also includes utilities to handle bytes, line iterators, and fetching data fr
 
 """
 
+import bz2
 import codecs
+import gzip
 import json
 import logging
 import os
+import re
 
 import networkx as nx
 import py2neo
-import requests
 from networkx.readwrite.json_graph import node_link_data, node_link_graph
 from pkg_resources import get_distribution
-from requests_file import FileAdapter
 
-from .canonicalize import decanonicalize_node
-from .constants import PYBEL_CONTEXT_TAG, FUNCTION, NAME, RELATION, GRAPH_ANNOTATION_LIST
+from .canonicalize import decanonicalize_node, decanonicalize_edge
+from .compression import compress, decompress
+from .constants import PYBEL_CONTEXT_TAG, FUNCTION, NAME, RELATION, GRAPH_ANNOTATION_LIST, GRAPH_PYBEL_VERSION
 from .graph import BELGraph
-from .utils import flatten_dict, flatten_graph_data, list2tuple
+from .utils import flatten_dict, flatten_graph_data, list2tuple, HTTPCache, iter_url_lines
 
 try:
     import cPickle as pickle
@@ -48,6 +51,8 @@ __all__ = [
     'from_pickle',
     'to_json',
     'from_json',
+    'to_jsonl',
+    'from_jsonl',
     'to_graphml',
     'to_csv',
     'to_neo4j'
@@ -55,6 +60,20 @@ __all__ = [
 
 log = logging.getLogger('pybel')
 
+#: The number of characters read at a time by :func:`from_json_file`
+JSON_READ_CHUNK_SIZE = 2 ** 16
+
+_json_whitespace = re.compile(r'[ \t\n\r]*')
+
+#: The type of the JSON Lines line with the graph's metadata
+JSONL_GRAPH = 'graph'
+
+#: The type of JSON Lines lines with a node
+JSONL_NODE = 'node'
+
+#: The type of JSON Lines lines with an edge
+JSONL_EDGE = 'edge'
+
 
 def tokenize_version(version_string):
     return tuple(version_string.split('.')[0:3])
@@ -105,45 +124,52 @@ def from_path(path, encoding='utf-8', **kwargs):
         return BELGraph(lines=f, **kwargs)
 
 
-def from_url(url, **kwargs):
+def from_url(url, use_cache=False, **kwargs):
     """Loads a BEL graph from a URL resource
 
     :param url: A valid URL pointing to a BEL resource
     :type url: str
+    :param use_cache: Should the document be stored in the :class:`pybel.utils.HTTPCache`, so it's only downloaded
+                      again if it changes? Off by default, since BEL documents can be large and the cache is never
+                      cleaned up by itself.
+    :type use_cache: bool
     :param kwargs: Keyword arguments to pass to :class:`pybel.BELGraph`
     :return: a parsed BEL graph
     :rtype: BELGraph
     """
     log.info('Loading from url: %s', url)
 
-    session = requests.session()
-    session.mount('file://', FileAdapter())
-
-    response = session.get(url)
-    response.raise_for_status()
-
-    lines = (line.decode('utf-8') for line in response.iter_lines())
+    lines = HTTPCache().iter_lines(url) if use_cache else iter_url_lines(url)
+    lines = (line.decode('utf-8') for line in lines)
 
     return BELGraph(lines=lines, **kwargs)
 
 
-def to_bytes(graph, protocol=None):
+def to_bytes(graph, protocol=None, codec=None):
     """Converts a graph to bytes with pickle
 
     :param graph: A BEL graph
     :type graph: BELGraph
     :param protocol: Pickling protocol to use
     :type protocol: int
+    :param codec: The name of the codec to compress the pickle with. See :mod:`pybel.compression`. Defaults to no
+                  compression.
+    :type codec: str
     :rtype: bytes
     """
     if protocol is not None:
-        return pickle.dumps(graph, protocol=protocol)
+        graph_bytes = pickle.dumps(graph, protocol=protocol)
     else:
-        return pickle.dumps(graph)
+        graph_bytes = pickle.dumps(graph)
+
+    if codec is not None:
+        return compress(graph_bytes, codec)
+
+    return graph_bytes
 
 
 def from_bytes(bytes_graph, check_version=True):
-    """Reads a graph from bytes (the result of pickling the graph)
+    """Reads a graph from bytes (the result of pickling the graph), which may have been compressed
 
     :param bytes_graph: File or filename to write
     :type bytes_graph: bytes
@@ -151,10 +177,10 @@ def from_bytes(bytes_graph, check_version=True):
     :type check_version: bool
     :rtype: BELGraph
     """
-    return ensure_version(pickle.loads(bytes_graph), check_version)
+    return ensure_version(pickle.loads(decompress(bytes_graph)), check_version)
 
 
-def to_pickle(graph, output, protocol=None):
+def to_pickle(graph, output, protocol=None, codec=None):
     """Writes this graph to a pickle object with nx.write_gpickle
 
     :param graph: A BEL graph
@@ -163,15 +189,28 @@ def to_pickle(graph, output, protocol=None):
     :type output: file or file-like or str
     :param protocol: Pickling protocol to use
     :type protocol: int
+    :param codec: The name of the codec to compress the pickle with. See :mod:`pybel.compression`. Defaults to no
+                  compression.
+    :type codec: str
     """
-    if protocol is not None:
+    if codec is not None:
+        graph_bytes = to_bytes(graph, protocol=protocol, codec=codec)
+
+        if hasattr(output, 'write'):
+            output.write(graph_bytes)
+        else:
+            with open(os.path.expanduser(output), 'wb') as f:
+                f.write(graph_bytes)
+
+    elif protocol is not None:
         nx.write_gpickle(graph, output, protocol=protocol)
     else:
         nx.write_gpickle(graph, output)
 
 
 def from_pickle(path, check_version=True):
-    """Reads a graph from a gpickle file
+    """Reads a graph from a gpickle file, which may have been compressed with a codec from
+    :mod:`pybel.compression`
 
     :param path: File or filename to read. Filenames ending in .gz or .bz2 will be uncompressed.
     :type path: file or str
@@ -179,7 +218,20 @@ def from_pickle(path, check_version=True):
     :type check_version: bool
     :rtype: BELGraph
     """
-    return ensure_version(nx.read_gpickle(path), check_version=check_version)
+    if hasattr(path, 'read'):
+        return from_bytes(path.read(), check_version=check_version)
+
+    path = os.path.expanduser(path)
+
+    if path.endswith('.gz'):
+        opener = gzip.open
+    elif path.endswith('.bz2'):
+        opener = bz2.BZ2File
+    else:
+        opener = open
+
+    with opener(path, 'rb') as f:
+        return from_bytes(f.read(), check_version=check_version)
 
 
 def to_json_dict(graph):
@@ -196,6 +248,47 @@ def to_json_dict(graph):
     return data
 
 
+def iter_json(graph):
+    """Serializes this graph as the same node-link JSON object as :func:`to_json_dict` one node and one link at a
+    time, so the whole object is never in memory
+
+    :param graph: A BEL graph
+    :type graph: BELGraph
+    :return: An iterator over the pieces of the JSON string
+    :rtype: iter[str]
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False)
+
+    graph_data = dict(graph.graph)
+    graph_data[GRAPH_ANNOTATION_LIST] = {k: sorted(v) for k, v in graph_data.get(GRAPH_ANNOTATION_LIST, {}).items()}
+
+    yield '{"directed": true, "multigraph": true, "graph": '
+    yield encoder.encode(graph_data)
+    yield ', "nodes": ['
+
+    node_ids = {}
+
+    for node_id, (node, data) in enumerate(graph.nodes_iter(data=True)):
+        node_ids[node] = node_id
+
+        node_data = dict(data)
+        node_data['id'] = node
+
+        yield (', ' if node_id else '') + encoder.encode(node_data)
+
+    yield '], "links": ['
+
+    for i, (u, v, key, data) in enumerate(graph.edges_iter(keys=True, data=True)):
+        link = dict(data)
+        link['source'] = node_ids[u]
+        link['target'] = node_ids[v]
+        link['key'] = key
+
+        yield (', ' if i else '') + encoder.encode(link)
+
+    yield ']}'
+
+
 def to_jsons(graph):
     """Dumps this graph as a node-link JSON object to a string
 
@@ -204,19 +297,20 @@ def to_jsons(graph):
     :return: A string representation of the node-link JSON produced for this graph by :func:`to_json_dict`
     :rtype: str
     """
-    return json.dumps(to_json_dict(graph), ensure_ascii=False)
+    return ''.join(iter_json(graph))
 
 
 def to_json(graph, output):
-    """Writes this graph as a node-link JSON object
+    """Writes this graph as a node-link JSON object. It's written one node and one link at a time with
+    :func:`iter_json`.
 
     :param graph: A BEL graph
     :type graph: BELGraph
     :param output: A write-supporting file or file-like object
     :type output: file
     """
-    json_dict = to_json_dict(graph)
-    json.dump(json_dict, output, ensure_ascii=False)
+    for chunk in iter_json(graph):
+        output.write(chunk)
 
 
 def from_json_dict(data, check_version=True):
@@ -237,8 +331,296 @@ def from_json_dict(data, check_version=True):
     return ensure_version(graph, check_version=check_version)
 
 
+class JSONStreamReader(object):
+    """Decodes a JSON document from a file one value at a time, so only the value being read and a chunk of the file
+    are in memory"""
+
+    def __init__(self, file, chunk_size=JSON_READ_CHUNK_SIZE):
+        """
+        :param file: A file opened in text mode
+        :type file: file
+        :param chunk_size: The number of characters read at a time
+        :type chunk_size: int
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+
+    def _fill(self):
+        """Reads the next chunk of the file into the buffer, dropping what's already been decoded
+
+        :return: If anything was read
+        :rtype: bool
+        """
+        chunk = self.file.read(self.chunk_size)
+
+        if not chunk:
+            return False
+
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def _peek(self):
+        """Skips whitespace and gets the next character, or an empty string at the end of the file"""
+        while True:
+            self._position = _json_whitespace.match(self._buffer, self._position).end()
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+
+            if not self._fill():
+                return ''
+
+    def _expect(self, characters):
+        """Consumes the next character if it's one of the given characters
+
+        :raises ValueError: if it isn't
+        """
+        character = self._peek()
+
+        if not character or character not in characters:
+            raise ValueError('Expected one of {} in JSON but got {}'.format(characters, repr(character)))
+
+        self._position += 1
+        return character
+
+    def decode(self):
+        """Decodes the next value"""
+        self._peek()
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except ValueError:
+                # the value continues in the next chunk, unless the file is over
+                if not self._fill():
+                    raise
+                continue
+
+            # a number at the end of the buffer might continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+
+            self._position = end
+            return value
+
+    def iter_object(self):
+        """Iterates over the keys of the next value, which has to be an object. The value of each key has to be
+        consumed with :meth:`decode`, :meth:`iter_object`, or :meth:`iter_array` before getting the next key.
+
+        :rtype: iter[str]
+        """
+        self._expect('{')
+
+        if self._peek() == '}':
+            self._position += 1
+            return
+
+        while True:
+            key = self.decode()
+            self._expect(':')
+
+            yield key
+
+            if self._expect(',}') == '}':
+                return
+
+    def iter_array(self):
+        """Iterates over the values in the next value, which has to be an array"""
+        self._expect('[')
+
+        if self._peek() == ']':
+            self._position += 1
+            return
+
+        while True:
+            yield self.decode()
+
+            if self._expect(',]') == ']':
+                return
+
+
+def _add_json_link(graph, nodes, link):
+    u = nodes[link.pop('source')]
+    v = nodes[link.pop('target')]
+    key = link.pop('key', None)
+    graph.add_edge(u, v, key=key, attr_dict=link)
+
+
+def from_json_file(file, check_version=True, chunk_size=JSON_READ_CHUNK_SIZE):
+    """Reads a graph from a node-link JSON object in a file. Nodes and links are added to the graph as they are
+    decoded, so the JSON object is never all in memory.
+
+    :param file: A file opened in text mode
+    :type file: file
+    :param check_version: Checks if the graph was produced by this version of PyBEL
+    :type check_version: bool
+    :param chunk_size: The number of characters read at a time
+    :type chunk_size: int
+    :rtype: BELGraph
+    """
+    reader = JSONStreamReader(file, chunk_size=chunk_size)
+    graph = BELGraph()
+
+    nodes = []
+    links = []
+    nodes_read = False
+
+    for key in reader.iter_object():
+        if key == 'graph':
+            graph.graph.update((k, v) for k, v in reader.decode().items() if k != GRAPH_PYBEL_VERSION)
+
+        elif key == 'nodes':
+            for node_data in reader.iter_array():
+                node = list2tuple(node_data.pop('id'))
+                nodes.append(node)
+                graph.add_node(node, attr_dict=node_data)
+
+            nodes_read = True
+
+        elif key == 'links':
+            for link in reader.iter_array():
+                if nodes_read:
+                    _add_json_link(graph, nodes, link)
+                else:  # the nodes have to be read before their links can be added
+                    links.append(link)
+
+        else:
+            reader.decode()
+
+    for link in links:
+        _add_json_link(graph, nodes, link)
+
+    return ensure_version(graph, check_version=check_version)
+
+
 def from_json(path, check_version=True):
-    """Reads graph from node-link JSON Object
+    """Reads graph from node-link JSON Object with :func:`from_json_file`
+
+    :param path: file path to read
+    :type path: str
+    :param check_version: Checks if the graph was produced by this version of PyBEL
+    :type check_version: bool
+    :rtype: BELGraph
+    """
+    with codecs.open(os.path.expanduser(path), encoding='utf-8') as f:
+        return from_json_file(f, check_version=check_version)
+
+
+def iter_jsonl(graph, bel=False, header=True):
+    """Serializes this graph as JSON Lines. The first line has the graph's metadata, then there's one line for each
+    node and one line for each edge. Edges refer to their nodes by their tuples instead of their positions, so every
+    line can be read on its own.
+
+    :param graph: A BEL graph
+    :type graph: BELGraph
+    :param bel: Include the BEL for each node and edge
+    :type bel: bool
+    :param header: Include the line with the graph's metadata. Use False to append to a file that has one.
+    :type header: bool
+    :return: An iterator over the lines, with their newlines
+    :rtype: iter[str]
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False)
+
+    if header:
+        graph_data = dict(graph.graph)
+        graph_data[GRAPH_ANNOTATION_LIST] = {k: sorted(v) for k, v in
+                                             graph_data.get(GRAPH_ANNOTATION_LIST, {}).items()}
+
+        yield encoder.encode({'type': JSONL_GRAPH, 'data': graph_data}) + '\n'
+
+    for node, data in graph.nodes_iter(data=True):
+        line = {'type': JSONL_NODE, 'id': node, 'data': dict(data)}
+
+        if bel:
+            line['bel'] = decanonicalize_node(graph, node)
+
+        yield encoder.encode(line) + '\n'
+
+    for u, v, key, data in graph.edges_iter(keys=True, data=True):
+        line = {'type': JSONL_EDGE, 'source': u, 'target': v, 'key': key, 'data': dict(data)}
+
+        if bel:
+            line['bel'] = decanonicalize_edge(graph, u, v, key)
+
+        yield encoder.encode(line) + '\n'
+
+
+def to_jsonl(graph, output, bel=False, header=True):
+    """Writes this graph as JSON Lines with :func:`iter_jsonl`. Files can be concatenated, and split at any line, then
+    read with :func:`from_jsonl`.
+
+    :param graph: A BEL graph
+    :type graph: BELGraph
+    :param output: A write-supporting file or file-like object
+    :type output: file
+    :param bel: Include the BEL for each node and edge
+    :type bel: bool
+    :param header: Include the line with the graph's metadata
+    :type header: bool
+    """
+    for line in iter_jsonl(graph, bel=bel, header=header):
+        output.write(line)
+
+
+def _update_graph_data(graph, data):
+    """Adds the metadata from a JSON Lines header to a graph. Dictionaries are merged, so the headers of concatenated
+    files are combined."""
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(graph.graph.get(key), dict):
+            graph.graph[key].update(value)
+        else:
+            graph.graph[key] = value
+
+
+def from_jsonl_lines(lines, graph=None, check_version=True):
+    """Reads a graph from JSON Lines. The lines can come in any order and from any number of files written by
+    :func:`to_jsonl`, so a file can be split and its parts read in parallel into separate graphs, or one after the
+    other into the same graph.
+
+    :param lines: An iterable of lines
+    :type lines: iter[str]
+    :param graph: A graph to add the nodes and edges to. Defaults to a new graph.
+    :type graph: BELGraph
+    :param check_version: Checks if the graph was produced by this version of PyBEL
+    :type check_version: bool
+    :rtype: BELGraph
+    :raises ValueError: if a line has an unknown type
+    """
+    graph = BELGraph() if graph is None else graph
+
+    for line in lines:
+        line = line.strip()
+
+        if not line:
+            continue
+
+        data = json.loads(line)
+        line_type = data['type']
+
+        if line_type == JSONL_NODE:
+            graph.add_node(list2tuple(data['id']), attr_dict=data['data'])
+
+        elif line_type == JSONL_EDGE:
+            graph.add_edge(list2tuple(data['source']), list2tuple(data['target']), key=data['key'],
+                           attr_dict=data['data'])
+
+        elif line_type == JSONL_GRAPH:
+            _update_graph_data(graph, data['data'])
+
+        else:
+            raise ValueError('Unknown JSON Lines type: {}'.format(line_type))
+
+    return ensure_version(graph, check_version=check_version)
+
+
+def from_jsonl(path, check_version=True):
+    """Reads a graph from a JSON Lines file written by :func:`to_jsonl`
 
     :param path: file path to read
     :type path: str
@@ -246,10 +628,8 @@ def from_json(path, check_version=True):
     :type check_version: bool
     :rtype: BELGraph
     """
-    with open(os.path.expanduser(path)) as f:
-        json_dict = json.load(f)
-        graph = from_json_dict(json_dict, check_version=check_version)
-        return graph
+    with codecs.open(os.path.expanduser(path), encoding='utf-8') as f:
+        return from_jsonl_lines(f, check_version=check_version)
 
 
 def to_graphml(graph, output):
@@ -263,7 +643,7 @@ def to_graphml(graph, output):
     g = nx.MultiDiGraph()
 
     for node, data in graph.nodes(data=True):
-        g.add_node(node, json=json.dumps(data))
+        g.add_node(node, json=json.dumps(dict(data)))
 
     for u, v, key, data in graph.edges(data=True, keys=True):
         g.add_edge(u, v, key=key, attr_dict=flatten_dict(data))
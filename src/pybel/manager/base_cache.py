@@ -1,11 +1,14 @@
+import logging
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 from .models import Base
 from ..constants import PYBEL_CONNECTION_ENV, DEFAULT_CACHE_LOCATION
 
+log = logging.getLogger(__name__)
+
 
 class BaseCacheManager:
     """Creates a connection to database and a persistent session using SQLAlchemy"""
@@ -34,6 +37,40 @@ class BaseCacheManager:
 
     def create_database(self, checkfirst=True):
         Base.metadata.create_all(self.engine, checkfirst=checkfirst)
+        self.migrate_database()
+
+    def migrate_database(self):
+        """Adds the columns and indexes that were added to the models after their tables were made, so databases
+        made by older versions of PyBEL can still be used. Added columns are nullable and are empty for the rows that
+        were already there.
+        """
+        inspector = inspect(self.engine)
+        table_names = set(inspector.get_table_names())
+        preparer = self.engine.dialect.identifier_preparer
+
+        for table in Base.metadata.sorted_tables:
+            if table.name not in table_names:
+                continue
+
+            column_names = {column['name'] for column in inspector.get_columns(table.name)}
+
+            for column in table.columns:
+                if column.name in column_names:
+                    continue
+
+                log.info('Adding column %s to %s', column.name, table.name)
+                self.engine.execute('ALTER TABLE {} ADD COLUMN {} {}'.format(
+                    preparer.format_table(table),
+                    preparer.format_column(column),
+                    column.type.compile(dialect=self.engine.dialect)
+                ))
+
+            index_names = {index['name'] for index in inspector.get_indexes(table.name)}
+
+            for index in table.indexes:
+                if index.name not in index_names:
+                    log.info('Adding index %s to %s', index.name, table.name)
+                    index.create(self.engine)
 
     def drop_database(self):
         Base.metadata.drop_all(self.engine)
@@ -9,26 +9,245 @@ enable this option, but can specify a database location if they choose.
 
 """
 
+import hashlib
 import itertools as itt
 import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict, defaultdict
+from functools import partial
+from multiprocessing.pool import ThreadPool
 
 import networkx as nx
+from sqlalchemy import create_engine, select, and_, bindparam, func
 from sqlalchemy.orm.exc import NoResultFound
 
 from . import defaults
 from . import models
 from .base_cache import BaseCacheManager
-from .utils import parse_owl, extract_shared_required, extract_shared_optional
+from .snapshot import DefinitionSnapshot, write_snapshot, get_snapshot_path, NAMESPACE_SNAPSHOT, \
+    ANNOTATION_SNAPSHOT
+from .utils import iter_owl, extract_shared_required, extract_shared_optional, iter_chunks, iter_closure, OWL_EDGE
+from ..constants import PYBEL_SNAPSHOT_DIR
 from ..parser.language import belns_encodings
-from ..utils import download_url
+from ..utils import download_url, get_session, parse_definition_lines, HTTPCache
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 log = logging.getLogger(__name__)
 
 DEFAULT_BELNS_ENCODING = ''.join(sorted(belns_encodings))
 
+#: The number of names whose encodings are kept in memory by each :class:`LazyNamespace`
+NAMESPACE_CACHE_SIZE = 10000
+
+#: The number of namespace or annotation entries inserted at once
+ENTRY_CHUNK_SIZE = 5000
+
+#: The number of threads used by :meth:`CacheManager.prefetch` to download namespace and annotation files
+PREFETCH_WORKERS = 8
+
+_namespace_entry_table = models.NamespaceEntry.__table__
+_annotation_entry_table = models.AnnotationEntry.__table__
+
+_select_namespace_entries = select([_namespace_entry_table.c.name, _namespace_entry_table.c.encoding]).where(
+    _namespace_entry_table.c.namespace_id == bindparam('namespace_id')
+)
+
+_select_annotation_entries = select([_annotation_entry_table.c.name, _annotation_entry_table.c.label]).where(
+    _annotation_entry_table.c.annotation_id == bindparam('annotation_id')
+)
+
+_select_namespace_encoding = select([_namespace_entry_table.c.encoding]).where(and_(
+    _namespace_entry_table.c.namespace_id == bindparam('namespace_id'),
+    _namespace_entry_table.c.name == bindparam('name')
+))
+
+_select_namespace_names = select([_namespace_entry_table.c.name]).where(
+    _namespace_entry_table.c.namespace_id == bindparam('namespace_id')
+)
+
+_count_namespace_names = select([func.count(_namespace_entry_table.c.id)]).where(
+    _namespace_entry_table.c.namespace_id == bindparam('namespace_id')
+)
+
+
+class LazyNamespace(Mapping):
+    """A read-only dictionary of {name: set of encodings} for a namespace in the definition cache. Each name is looked
+    up in the database the first time it's used, and the encodings of the most recently used names are kept in memory,
+    so memory use depends on the names a document uses instead of the size of the namespace.
+
+    It can be pickled and used in other processes as long as the database isn't in memory.
+    """
+
+    def __init__(self, engine, namespace_id, cache_size=NAMESPACE_CACHE_SIZE):
+        """
+        :param engine: The engine of the definition cache
+        :type engine: sqlalchemy.engine.Engine
+        :param namespace_id: The database identifier of the namespace
+        :type namespace_id: int
+        :param cache_size: The maximum number of names whose encodings are kept in memory
+        :type cache_size: int
+        """
+        self.engine = engine
+        self.namespace_id = namespace_id
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._length = None
+        self._pid = os.getpid()
+
+    def _execute(self, statement, **kwargs):
+        # SQLite connections can't be shared with a forked process, so child processes open their own. An in-memory
+        # database can't be opened again, but the child process has its own copy of it.
+        if self._pid != os.getpid() and self.engine.url.database not in {None, '', ':memory:'}:
+            self.engine = create_engine(self.engine.url)
+            self._pid = os.getpid()
+
+        return self.engine.execute(statement, namespace_id=self.namespace_id, **kwargs)
+
+    def __getitem__(self, name):
+        if name in self._cache:
+            encodings = self._cache.pop(name)
+        else:
+            row = self._execute(_select_namespace_encoding, name=name).first()
+            encodings = None if row is None else set(row[0])
+
+            if len(self._cache) >= self.cache_size:
+                self._cache.popitem(last=False)
+
+        # names that aren't in the namespace are cached too, since they are often repeated in a document
+        self._cache[name] = encodings
+
+        if encodings is None:
+            raise KeyError(name)
+
+        return encodings
+
+    def __iter__(self):
+        for name, in self._execute(_select_namespace_names):
+            yield name
+
+    def __len__(self):
+        if self._length is None:
+            self._length = self._execute(_count_namespace_names).scalar()
+
+        return self._length
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['engine'] = self.engine.url
+        state['_cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.engine = create_engine(self.engine)
+        self._pid = os.getpid()
+
+
+class _LineHasher(object):
+    """Passes through the lines of a namespace or annotation file while hashing them, for checking if it changed"""
+
+    def __init__(self, lines):
+        """
+        :param lines: An iterable over the lines of the file as bytes, without line endings
+        :type lines: iter[bytes]
+        """
+        self.lines = lines
+        self._hash = hashlib.sha256()
+
+    def __iter__(self):
+        for line in self.lines:
+            self._hash.update(line)
+            self._hash.update(b'\n')
+            yield line
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def _try_download_definition(url, session, http_cache, directory):
+    """Downloads a namespace or annotation file to disk with :meth:`pybel.utils.HTTPCache.download`. Returns a pair of
+    the URL and the path of the file, or None if it can't be downloaded."""
+    try:
+        return url, http_cache.download(url, directory, session=session)
+    except Exception as e:
+        log.warning('Could not prefetch %s: %s', url, e)
+
+
+def _get_namespace_insert_values(url, config):
+    """Gets the values of the columns of a namespace from a parsed namespace file"""
+    namespace_insert_values = {
+        'name': config['Namespace']['NameString'],
+        'url': url,
+        'domain': config['Namespace']['DomainString']
+    }
+
+    namespace_insert_values.update(extract_shared_required(config, 'Namespace'))
+    namespace_insert_values.update(extract_shared_optional(config, 'Namespace'))
+
+    namespace_mapping = {
+        'species': ('Namespace', 'SpeciesString'),
+        'query_url': ('Namespace', 'QueryValueURL')
+    }
+
+    for database_column, (section, key) in namespace_mapping.items():
+        if section in config and key in config[section]:
+            namespace_insert_values[database_column] = config[section][key]
+
+    return namespace_insert_values
+
+
+def _iter_unique_values(values, repeated):
+    """Skips the names that were already seen in the (name, value) pairs from a namespace or annotation file, since
+    some files list a name more than once. Only the names are kept in memory, along with the last value of each
+    repeated name, which is the one that's kept.
+
+    :param values: The (name, value) pairs
+    :type values: iter[tuple[str,str]]
+    :param repeated: A dictionary to fill with the last value of each name listed more than once
+    :type repeated: dict[str,str]
+    """
+    seen = set()
+
+    for name, value in values:
+        if name in seen:
+            repeated[name] = value
+            continue
+
+        seen.add(name)
+        yield name, value
+
+
+def _get_annotation_insert_values(url, config):
+    """Gets the values of the columns of an annotation from a parsed annotation file"""
+    annotation_insert_values = {
+        'type': config['AnnotationDefinition']['TypeString'],
+        'url': url
+    }
+    annotation_insert_values.update(extract_shared_required(config, 'AnnotationDefinition'))
+    annotation_insert_values.update(extract_shared_optional(config, 'AnnotationDefinition'))
+
+    annotation_mapping = {
+        'name': ('Citation', 'NameString')
+    }
+
+    for database_column, (section, key) in annotation_mapping.items():
+        if section in config and key in config[section]:
+            annotation_insert_values[database_column] = config[section][key]
+
+    return annotation_insert_values
+
 
 class CacheManager(BaseCacheManager):
-    def __init__(self, connection=None, echo=False):
+    def __init__(self, connection=None, echo=False, lazy_namespaces=False, namespace_cache_size=NAMESPACE_CACHE_SIZE,
+                 http_cache=None, snapshots=False, snapshot_directory=None):
         """The definition cache manager takes care of storing BEL namespace and annotation files for later use.
         It uses SQLite by default for speed and lightness, but any database can be used wiht its SQLAlchemy interface.
 
@@ -36,10 +255,38 @@ class CacheManager(BaseCacheManager):
         :type connection: str
         :param echo: Whether or not echo the running sql code.
         :type echo: bool
+        :param lazy_namespaces: If true, namespaces are given as :class:`LazyNamespace` instead of dictionaries, so
+                                their names are looked up in the database as they are used instead of all being loaded
+        :type lazy_namespaces: bool
+        :param namespace_cache_size: The number of names kept in memory by each :class:`LazyNamespace`
+        :type namespace_cache_size: int
+        :param http_cache: The cache of downloaded namespace and annotation files. Defaults to one in
+                           :data:`pybel.constants.PYBEL_HTTP_CACHE_DIR`
+        :type http_cache: pybel.utils.HTTPCache
+        :param snapshots: If true, namespaces and annotations are given as
+                          :class:`pybel.manager.snapshot.DefinitionSnapshot` instead of dictionaries. They are read
+                          from snapshot files with :code:`mmap`, so processes using the same namespaces share them.
+                          The snapshots are written the first time they're used, and again when the files change.
+        :type snapshots: bool
+        :param snapshot_directory: The directory of the snapshot files. Defaults to
+                                   :data:`pybel.constants.PYBEL_SNAPSHOT_DIR`
+        :type snapshot_directory: str
         """
 
         BaseCacheManager.__init__(self, connection=connection, echo=echo)
 
+        if lazy_namespaces and snapshots:
+            raise ValueError('Lazy namespaces and snapshots can not be used together')
+
+        self.lazy_namespaces = lazy_namespaces
+        self.namespace_cache_size = namespace_cache_size
+        self.http_cache = HTTPCache() if http_cache is None else http_cache
+
+        if snapshots:
+            self.snapshot_directory = PYBEL_SNAPSHOT_DIR if snapshot_directory is None else snapshot_directory
+        else:
+            self.snapshot_directory = None
+
         self.namespace_cache = {}
         self.annotation_cache = {}
 
@@ -51,45 +298,65 @@ class CacheManager(BaseCacheManager):
         self.annotation_edge_cache = {}
         self.annotation_graph_cache = {}
 
+        self.namespace_ancestor_cache = {}
+        self.namespace_descendant_cache = {}
+
+        self.annotation_ancestor_cache = {}
+        self.annotation_descendant_cache = {}
+
     # NAMESPACE MANAGEMENT
 
-    def insert_namespace(self, url):
+    def insert_namespace(self, url, config=None, content_hash=None, lines=None):
         """Inserts the namespace file at the given location to the cache
 
         :param url: the location of the namespace file
         :type url: str
+        :param config: The namespace file already parsed by :func:`pybel.utils.download_url`. If not given, the file
+                       is streamed through the HTTP cache and its names are inserted as they are read, so it's never
+                       all in memory.
+        :type config: dict
+        :param content_hash: The hash of the namespace file's content, which is used by :meth:`refresh_namespace`
+        :type content_hash: str
+        :param lines: The lines of the namespace file as bytes, without line endings, to stream instead of the HTTP
+                      cache's
+        :type lines: iter[bytes]
         :return: SQL Alchemy model instance, populated with data from URL
         :rtype: :class:`pybel.manager.models.Namespace`
         """
         log.info('Caching namespace %s', url)
 
-        config = download_url(url)
-
-        namespace_insert_values = {
-            'name': config['Namespace']['NameString'],
-            'url': url,
-            'domain': config['Namespace']['DomainString']
-        }
-
-        namespace_insert_values.update(extract_shared_required(config, 'Namespace'))
-        namespace_insert_values.update(extract_shared_optional(config, 'Namespace'))
-
-        namespace_mapping = {
-            'species': ('Namespace', 'SpeciesString'),
-            'query_url': ('Namespace', 'QueryValueURL')
-        }
-
-        for database_column, (section, key) in namespace_mapping.items():
-            if section in config and key in config[section]:
-                namespace_insert_values[database_column] = config[section][key]
-
-        namespace = models.Namespace(**namespace_insert_values)
+        repeated = {}
 
-        values = {c: e if e else DEFAULT_BELNS_ENCODING for c, e in config['Values'].items() if c}
+        if config is None:
+            hasher = _LineHasher(self.http_cache.iter_lines(url) if lines is None else lines)
+            config, values = parse_definition_lines(hasher, url=url)
+            values = _iter_unique_values(values, repeated)
+        else:
+            hasher, values = None, config['Values'].items()
 
-        namespace.entries = [models.NamespaceEntry(name=c, encoding=e) for c, e in values.items()]
+        namespace = models.Namespace(**_get_namespace_insert_values(url, config))
 
         self.session.add(namespace)
+        self.session.flush()
+
+        entries = (
+            {'namespace_id': namespace.id, 'name': c, 'encoding': e if e else DEFAULT_BELNS_ENCODING}
+            for c, e in values
+        )
+
+        if not self._insert_entries(_namespace_entry_table, entries):
+            self.session.rollback()
+            raise ValueError('Downloaded empty file: {}'.format(url))
+
+        self._update_repeated_entries(
+            _namespace_entry_table,
+            _namespace_entry_table.c.namespace_id,
+            _namespace_entry_table.c.encoding,
+            namespace.id,
+            {c: e if e else DEFAULT_BELNS_ENCODING for c, e in repeated.items()}
+        )
+
+        namespace.content_hash = content_hash if hasher is None else hasher.hexdigest()
         self.session.commit()
 
         return namespace
@@ -106,16 +373,33 @@ class CacheManager(BaseCacheManager):
 
         try:
             results = self.session.query(models.Namespace).filter(models.Namespace.url == url).one()
-            log.info('Loaded namespace from %s (%d)', url, len(results.entries))
         except NoResultFound:
             results = self.insert_namespace(url)
 
         if results is None:
             raise ValueError('No results for {}'.format(url))
-        elif not results.entries:
+
+        if self.snapshot_directory is not None:
+            namespace = self._get_snapshot(
+                NAMESPACE_SNAPSHOT,
+                results,
+                _select_namespace_entries,
+                namespace_id=results.id
+            )
+        elif self.lazy_namespaces:
+            namespace = LazyNamespace(self.engine, results.id, cache_size=self.namespace_cache_size)
+        else:
+            namespace = {
+                name: set(encoding)
+                for name, encoding in self.session.execute(_select_namespace_entries, {'namespace_id': results.id})
+            }
+
+        if not namespace:
             raise ValueError('No entries for {}'.format(url))
 
-        self.namespace_cache[url] = {entry.name: set(entry.encoding) for entry in results.entries}
+        log.info('Loaded namespace from %s (%d)', url, len(namespace))
+
+        self.namespace_cache[url] = namespace
 
     def get_namespace(self, url):
         """Returns a dict of names and their encodings for the given namespace file
@@ -132,46 +416,120 @@ class CacheManager(BaseCacheManager):
 
     def load_default_namespaces(self):
         """Caches the default set of namespaces"""
+        self.prefetch(namespace_urls=defaults.default_namespaces)
+
         for url in defaults.default_namespaces:
             self.ensure_namespace(url)
 
     # ANNOTATION MANAGEMENT
 
-    def insert_annotation(self, url):
+    def insert_annotation(self, url, config=None, content_hash=None, lines=None):
         """Inserts the namespace file at the given location to the cache
 
         :param url: the location of the namespace file
         :type url: str
+        :param config: The annotation file already parsed by :func:`pybel.utils.download_url`. If not given, the file
+                       is streamed through the HTTP cache and its values are inserted as they are read.
+        :type config: dict
+        :param content_hash: The hash of the annotation file's content, which is used by :meth:`refresh_annotation`
+        :type content_hash: str
+        :param lines: The lines of the annotation file as bytes, without line endings, to stream instead of the HTTP
+                      cache's
+        :type lines: iter[bytes]
         :return: SQL Alchemy model instance, populated with data from URL
         :rtype: :class:`models.Namespace`
         """
         log.info('Caching annotation %s', url)
 
-        config = download_url(url)
-
-        annotation_insert_values = {
-            'type': config['AnnotationDefinition']['TypeString'],
-            'url': url
-        }
-        annotation_insert_values.update(extract_shared_required(config, 'AnnotationDefinition'))
-        annotation_insert_values.update(extract_shared_optional(config, 'AnnotationDefinition'))
-
-        annotation_mapping = {
-            'name': ('Citation', 'NameString')
-        }
+        repeated = {}
 
-        for database_column, (section, key) in annotation_mapping.items():
-            if section in config and key in config[section]:
-                annotation_insert_values[database_column] = config[section][key]
+        if config is None:
+            hasher = _LineHasher(self.http_cache.iter_lines(url) if lines is None else lines)
+            config, values = parse_definition_lines(hasher, url=url)
+            values = _iter_unique_values(values, repeated)
+        else:
+            hasher, values = None, config['Values'].items()
 
-        annotation = models.Annotation(**annotation_insert_values)
-        annotation.entries = [models.AnnotationEntry(name=c, label=l) for c, l in config['Values'].items() if c]
+        annotation = models.Annotation(**_get_annotation_insert_values(url, config))
 
         self.session.add(annotation)
+        self.session.flush()
+
+        entries = (
+            {'annotation_id': annotation.id, 'name': c, 'label': l}
+            for c, l in values
+        )
+
+        if not self._insert_entries(_annotation_entry_table, entries):
+            self.session.rollback()
+            raise ValueError('Downloaded empty file: {}'.format(url))
+
+        self._update_repeated_entries(
+            _annotation_entry_table,
+            _annotation_entry_table.c.annotation_id,
+            _annotation_entry_table.c.label,
+            annotation.id,
+            repeated
+        )
+
+        annotation.content_hash = content_hash if hasher is None else hasher.hexdigest()
         self.session.commit()
 
         return annotation
 
+    def _insert_entries(self, table, entries, chunk_size=ENTRY_CHUNK_SIZE):
+        """Inserts namespace or annotation entries with bulk inserts, without building ORM objects. Rolls back the
+        session if they can't be inserted.
+
+        :param table: The table of the entries
+        :type table: sqlalchemy.Table
+        :param entries: An iterable of dictionaries of column values
+        :type entries: iter[dict]
+        :param chunk_size: The number of entries inserted at once
+        :type chunk_size: int
+        :return: The number of entries inserted
+        :rtype: int
+        """
+        count = 0
+
+        try:
+            for chunk in iter_chunks(entries, chunk_size):
+                self.session.execute(table.insert(), chunk)
+                count += len(chunk)
+        except:
+            self.session.rollback()
+            raise
+
+        return count
+
+    def _update_repeated_entries(self, table, definition_column, value_column, definition_id, repeated):
+        """Sets the entries of the names listed more than once in a namespace or annotation file to their last values,
+        after their first ones were inserted by :meth:`_insert_entries`
+
+        :param table: The table of the entries
+        :type table: sqlalchemy.Table
+        :param definition_column: The column of the entries' namespace or annotation
+        :type definition_column: sqlalchemy.Column
+        :param value_column: The column of the entries' encoding or label
+        :type value_column: sqlalchemy.Column
+        :param definition_id: The identifier of the namespace or annotation
+        :type definition_id: int
+        :param repeated: A dictionary from the repeated names to their last values
+        :type repeated: dict[str,str]
+        """
+        if not repeated:
+            return
+
+        statement = table.update().where(and_(
+            definition_column == definition_id,
+            table.c.name == bindparam('entry_name')
+        )).values({value_column: bindparam('entry_value')})
+
+        self.session.execute(statement, [
+            {'entry_name': name, 'entry_value': value}
+            for name, value in repeated.items()
+        ])
+
     def ensure_annotation(self, url):
         """Caches an annotation file if not already in the cache
 
@@ -184,11 +542,53 @@ class CacheManager(BaseCacheManager):
 
         try:
             results = self.session.query(models.Annotation).filter(models.Annotation.url == url).one()
-            log.info('Loaded annotation from %s (%d)', url, len(results.entries))
         except NoResultFound:
             results = self.insert_annotation(url)
 
-        self.annotation_cache[url] = {entry.name: entry.label for entry in results.entries}
+        if self.snapshot_directory is not None:
+            self.annotation_cache[url] = self._get_snapshot(
+                ANNOTATION_SNAPSHOT,
+                results,
+                _select_annotation_entries,
+                annotation_id=results.id
+            )
+        else:
+            self.annotation_cache[url] = dict(
+                self.session.execute(_select_annotation_entries, {'annotation_id': results.id}).fetchall()
+            )
+
+        log.info('Loaded annotation from %s (%d)', url, len(self.annotation_cache[url]))
+
+    def _get_snapshot(self, kind, definition, select_entries, **params):
+        """Opens the snapshot of a namespace or annotation, writing it first if it's missing or out of date
+
+        :param kind: :data:`pybel.manager.snapshot.NAMESPACE_SNAPSHOT` or
+                     :data:`pybel.manager.snapshot.ANNOTATION_SNAPSHOT`
+        :type kind: int
+        :param definition: A namespace or annotation
+        :type definition: models.Namespace or models.Annotation
+        :param select_entries: A statement selecting the (name, value) pairs of the definition's entries
+        :param params: The parameters of the statement
+        :rtype: pybel.manager.snapshot.DefinitionSnapshot
+        """
+        path = get_snapshot_path(self.snapshot_directory, kind, definition.url)
+        content_hash = definition.content_hash or ''
+
+        if os.path.exists(path):
+            try:
+                snapshot = DefinitionSnapshot(path)
+            except ValueError:
+                log.info('Writing snapshot of %s again', definition.url)
+            else:
+                if snapshot.content_hash == content_hash:
+                    return snapshot
+
+                snapshot.close()
+
+        log.info('Writing snapshot of %s to %s', definition.url, path)
+        write_snapshot(path, kind, self.session.execute(select_entries, params).fetchall(), content_hash)
+
+        return DefinitionSnapshot(path)
 
     def get_annotation(self, url):
         """Returns a dict of annotations and their labels for the given annotation file
@@ -205,45 +605,408 @@ class CacheManager(BaseCacheManager):
 
     def load_default_annotations(self):
         """Caches the default set of annotations"""
+        self.prefetch(annotation_urls=defaults.default_annotations)
+
         for url in defaults.default_annotations:
             self.ensure_annotation(url)
 
+    # PREFETCHING
+
+    def _get_stored_urls(self, model, urls):
+        """Gets the URLs that are already stored in the database"""
+        return {url for url, in self.session.query(model.url).filter(model.url.in_(urls))}
+
+    def prefetch(self, namespace_urls=None, annotation_urls=None, workers=PREFETCH_WORKERS):
+        """Downloads the namespace and annotation files that aren't in the cache yet to disk at the same time, with a
+        pool of threads sharing one session. Each file is streamed into the cache line by line as soon as it's
+        downloaded, so none of them are read into memory.
+
+        Files that can't be downloaded are skipped, so the error is raised when they are used instead.
+
+        :param namespace_urls: The locations of namespace files
+        :type namespace_urls: iter[str]
+        :param annotation_urls: The locations of annotation files
+        :type annotation_urls: iter[str]
+        :param workers: The number of threads for downloading
+        :type workers: int
+        """
+        namespace_urls = set(namespace_urls or []) - set(self.namespace_cache)
+        annotation_urls = set(annotation_urls or []) - set(self.annotation_cache)
+
+        if namespace_urls:
+            namespace_urls -= self._get_stored_urls(models.Namespace, namespace_urls)
+
+        if annotation_urls:
+            annotation_urls -= self._get_stored_urls(models.Annotation, annotation_urls)
+
+        downloads = {url: self.insert_namespace for url in namespace_urls}
+        downloads.update((url, self.insert_annotation) for url in annotation_urls)
+
+        if not downloads:
+            return
+
+        t = time.time()
+
+        pool = ThreadPool(min(workers, len(downloads)))
+
+        # files the HTTP cache can't store are downloaded here
+        directory = tempfile.mkdtemp()
+
+        download = partial(
+            _try_download_definition,
+            session=get_session(pool_size=workers),
+            http_cache=self.http_cache,
+            directory=directory
+        )
+
+        try:
+            # the database session isn't thread-safe, so the files are stored from this thread as they arrive
+            for result in pool.imap_unordered(download, sorted(downloads)):
+                if result is not None:
+                    url, path = result
+                    downloads[url](url, lines=self.http_cache.iter_file_lines(path))
+        finally:
+            pool.close()
+            pool.join()
+            shutil.rmtree(directory)
+
+        log.info('Prefetched %d definitions in %.02f seconds', len(downloads), time.time() - t)
+
+    # REFRESHING
+
+    def _update_entries(self, table, definition_column, value_column, definition_id, entries, references=(),
+                        chunk_size=ENTRY_CHUNK_SIZE):
+        """Updates the stored entries of a namespace or annotation to match a new version of its file. Unchanged
+        entries keep their identifiers, so the rows that refer to them stay valid.
+
+        :param table: The table of the entries
+        :type table: sqlalchemy.Table
+        :param definition_column: The column of the entries' namespace or annotation
+        :type definition_column: sqlalchemy.Column
+        :param value_column: The column of the entries' encoding or label
+        :type value_column: sqlalchemy.Column
+        :param definition_id: The identifier of the namespace or annotation
+        :type definition_id: int
+        :param entries: A dictionary of {name: encoding or label} from the new file
+        :type entries: dict
+        :param references: The columns of other tables that refer to entries, whose rows are deleted along with the
+                           entries that were removed from the file
+        :type references: iter[sqlalchemy.Column]
+        :param chunk_size: The number of entries deleted or inserted at once
+        :type chunk_size: int
+        """
+        stored = {
+            name: (entry_id, value)
+            for entry_id, name, value in self.session.execute(
+                select([table.c.id, table.c.name, value_column]).where(definition_column == definition_id)
+            )
+        }
+
+        removed_ids = [entry_id for name, (entry_id, _) in stored.items() if name not in entries]
+
+        changed = [
+            {'entry_id': entry_id, 'value': entries[name]}
+            for name, (entry_id, value) in stored.items()
+            if name in entries and entries[name] != value
+        ]
+
+        added = (
+            {definition_column.name: definition_id, 'name': name, value_column.name: value}
+            for name, value in entries.items()
+            if name not in stored
+        )
+
+        log.info('Removing %d entries and updating %d entries', len(removed_ids), len(changed))
+
+        try:
+            for chunk in iter_chunks(removed_ids, chunk_size):
+                for column in references:
+                    self.session.execute(column.table.delete().where(column.in_(chunk)))
+                self.session.execute(table.delete().where(table.c.id.in_(chunk)))
+
+            if changed:
+                update = table.update().where(table.c.id == bindparam('entry_id'))
+                self.session.execute(update.values({value_column.name: bindparam('value')}), changed)
+        except:
+            self.session.rollback()
+            raise
+
+        self._insert_entries(table, added, chunk_size=chunk_size)
+        self.session.commit()
+
+    def refresh_namespace(self, url):
+        """Checks if the namespace file at the given location changed with a conditional request, and updates the
+        cache if its content is different from the stored version
+
+        :param url: the location of the namespace file
+        :type url: str
+        :return: If the namespace was inserted or updated
+        :rtype: bool
+        """
+        try:
+            namespace = self.session.query(models.Namespace).filter(models.Namespace.url == url).one()
+        except NoResultFound:
+            self.insert_namespace(url)
+            return True
+
+        hasher = _LineHasher(self.http_cache.iter_lines(url))
+        config, values = parse_definition_lines(hasher, url=url)
+        values = dict(values)
+        content_hash = hasher.hexdigest()
+
+        if not values:
+            raise ValueError('Downloaded empty file: {}'.format(url))
+
+        if content_hash == namespace.content_hash:
+            log.info('Namespace has not changed: %s', url)
+            return False
+
+        log.info('Refreshing namespace %s', url)
+
+        for column, value in _get_namespace_insert_values(url, config).items():
+            setattr(namespace, column, value)
+
+        namespace.content_hash = content_hash
+
+        self._update_entries(
+            _namespace_entry_table,
+            _namespace_entry_table.c.namespace_id,
+            _namespace_entry_table.c.encoding,
+            namespace.id,
+            {c: e if e else DEFAULT_BELNS_ENCODING for c, e in values.items()}
+        )
+
+        self.session.expire(namespace, ['entries'])
+        self.namespace_cache.pop(url, None)
+
+        return True
+
+    def refresh_annotation(self, url):
+        """Checks if the annotation file at the given location changed with a conditional request, and updates the
+        cache if its content is different from the stored version. Removed values are also removed from the edges in
+        the Edge Store.
+
+        :param url: the location of the annotation file
+        :type url: str
+        :return: If the annotation was inserted or updated
+        :rtype: bool
+        """
+        try:
+            annotation = self.session.query(models.Annotation).filter(models.Annotation.url == url).one()
+        except NoResultFound:
+            self.insert_annotation(url)
+            return True
+
+        hasher = _LineHasher(self.http_cache.iter_lines(url))
+        config, values = parse_definition_lines(hasher, url=url)
+        values = dict(values)
+        content_hash = hasher.hexdigest()
+
+        if not values:
+            raise ValueError('Downloaded empty file: {}'.format(url))
+
+        if content_hash == annotation.content_hash:
+            log.info('Annotation has not changed: %s', url)
+            return False
+
+        log.info('Refreshing annotation %s', url)
+
+        for column, value in _get_annotation_insert_values(url, config).items():
+            setattr(annotation, column, value)
+
+        annotation.content_hash = content_hash
+
+        self._update_entries(
+            _annotation_entry_table,
+            _annotation_entry_table.c.annotation_id,
+            _annotation_entry_table.c.label,
+            annotation.id,
+            values,
+            references=[models.edge_annotation.c.annotationEntry_id]
+        )
+
+        self.session.expire(annotation, ['entries'])
+        self.annotation_cache.pop(url, None)
+
+        return True
+
+    def refresh_definition(self, url):
+        """Refreshes the namespace or annotation that's stored for the given location, whichever it is. See
+        :meth:`refresh_namespace` and :meth:`refresh_annotation`
+
+        :param url: the location of the namespace or annotation file
+        :type url: str
+        :return: If the namespace or annotation was updated
+        :rtype: bool
+        :raises ValueError: if no namespace or annotation is stored for the location
+        """
+        if self._get_stored_urls(models.Namespace, [url]):
+            return self.refresh_namespace(url)
+
+        if self._get_stored_urls(models.Annotation, [url]):
+            return self.refresh_annotation(url)
+
+        raise ValueError('No namespace or annotation is cached for {}'.format(url))
+
+    def refresh(self):
+        """Refreshes all stored namespaces and annotations. See :meth:`refresh_namespace` and
+        :meth:`refresh_annotation`
+
+        :return: The locations of the namespaces and annotations that were updated
+        :rtype: list[str]
+        """
+        refreshed = [url for url in self.ls_namespaces() if self.refresh_namespace(url)]
+        refreshed.extend(url for url in self.ls_annotations() if self.refresh_annotation(url))
+        return refreshed
+
     # NAMESPACE OWL MANAGEMENT
 
-    def insert_owl(self, iri, owl_model, owl_entry_model):
-        """Caches an ontology at the given IRI
+    def insert_owl(self, iri, owl_model, owl_entry_model, closure_table=None):
+        """Caches an ontology at the given IRI. Its terms are stored with bulk inserts while it's read with
+        :func:`pybel.manager.utils.iter_owl`, then the relations between them are stored, without building ORM
+        objects or a graph of the whole ontology.
 
         :param iri: the location of the ontology
         :type iri: str
+        :param owl_model: :class:`models.OwlNamespace` or :class:`models.OwlAnnotation`
+        :param owl_entry_model: :class:`models.OwlNamespaceEntry` or :class:`models.OwlAnnotationEntry`
+        :param closure_table: :data:`models.owl_namespace_closure` or :data:`models.owl_annotation_closure`, to also
+                              store the transitive closure of the relations
+        :type closure_table: sqlalchemy.Table
         """
         log.info('Caching owl %s', iri)
 
-        graph = parse_owl(iri)
+        owl = owl_model(iri=iri)
 
-        if 0 == len(graph):
-            raise ValueError('Empty owl document: {}'.format(iri))
+        self.session.add(owl)
+        self.session.flush()
 
-        owl = owl_model(iri=iri)
+        entry_table = owl_entry_model.__table__
+        relationship_table = owl_entry_model.children.property.secondary
 
-        entries = {node: owl_entry_model(entry=node) for node in graph.nodes_iter()}
+        terms = set()
+        edges = set()
 
-        owl.entries = list(entries.values())
+        def iter_new_entries():
+            for item in iter_owl(iri, http_cache=self.http_cache):
+                if item[0] == OWL_EDGE:
+                    edges.add(item[1:3])
 
-        for u, v in graph.edges_iter():
-            entries[u].children.append(entries[v])
+                for term in item[1:3] if item[0] == OWL_EDGE else item[1:2]:
+                    if term not in terms:
+                        terms.add(term)
+                        yield {'owl_id': owl.id, 'entry': term}
+
+        self._insert_entries(entry_table, iter_new_entries())
+
+        if not terms:
+            self.session.rollback()
+            raise ValueError('Empty owl document: {}'.format(iri))
+
+        entry_ids = self._get_owl_entry_ids(entry_table, owl.id)
+
+        self._insert_entries(relationship_table, (
+            {'left_id': entry_ids[u], 'right_id': entry_ids[v]}
+            for u, v in edges
+        ))
+
+        if closure_table is not None:
+            graph = nx.DiGraph()
+            graph.add_edges_from(edges)
+            self._insert_owl_closure(closure_table, owl.id, entry_ids, graph)
 
-        self.session.add(owl)
         self.session.commit()
 
         return owl
 
+    def _get_owl_entry_ids(self, entry_table, owl_id):
+        """Gets a dictionary of {term: id} for the entries of a cached ontology"""
+        return dict(self.session.execute(
+            select([entry_table.c.entry, entry_table.c.id]).where(entry_table.c.owl_id == owl_id)
+        ).fetchall())
+
+    def _insert_owl_closure(self, closure_table, owl_id, entry_ids, graph):
+        """Stores the transitive closure of an ontology's graph with bulk inserts"""
+        self._insert_entries(closure_table, (
+            {'owl_id': owl_id, 'descendant_id': entry_ids[u], 'ancestor_id': entry_ids[v], 'depth': depth}
+            for u, v, depth in iter_closure(graph)
+        ))
+
+    def _load_owl(self, owl_id, owl_entry_model):
+        """Loads the terms and relations of a cached ontology with one query each, without building ORM objects
+
+        :param owl_id: The database identifier of the ontology
+        :type owl_id: int
+        :param owl_entry_model: :class:`models.OwlNamespaceEntry` or :class:`models.OwlAnnotationEntry`
+        :return: A pair of the set of terms and the set of (child, parent) pairs
+        :rtype: tuple[set[str],set[tuple[str,str]]]
+        """
+        entry_table = owl_entry_model.__table__
+        relationship_table = owl_entry_model.children.property.secondary
+
+        terms = {
+            entry
+            for entry, in self.session.execute(
+                select([entry_table.c.entry]).where(entry_table.c.owl_id == owl_id)
+            ).fetchall()
+        }
+
+        child_table = entry_table.alias()
+        parent_table = entry_table.alias()
+
+        query = select([child_table.c.entry, parent_table.c.entry]).select_from(
+            relationship_table
+            .join(child_table, relationship_table.c.left_id == child_table.c.id)
+            .join(parent_table, relationship_table.c.right_id == parent_table.c.id)
+        ).where(child_table.c.owl_id == owl_id)
+
+        edges = {(child, parent) for child, parent in self.session.execute(query).fetchall()}
+
+        return terms, edges
+
+    def _load_owl_closure(self, iri, owl_model, owl_entry_model, closure_table, graph):
+        """Loads the ancestors and descendants of every term in a cached ontology with one query. The closure of an
+        ontology that was cached before closures were stored is computed from its graph and stored first.
+
+        :return: A pair of dictionaries of {term: set of ancestors} and {term: set of descendants}
+        :rtype: tuple[dict[str,set[str]],dict[str,set[str]]]
+        """
+        owl = self.session.query(owl_model).filter(owl_model.iri == iri).one()
+
+        entry_table = owl_entry_model.__table__
+        descendant_table = entry_table.alias()
+        ancestor_table = entry_table.alias()
+
+        query = select([descendant_table.c.entry, ancestor_table.c.entry]).select_from(
+            closure_table
+            .join(descendant_table, closure_table.c.descendant_id == descendant_table.c.id)
+            .join(ancestor_table, closure_table.c.ancestor_id == ancestor_table.c.id)
+        ).where(closure_table.c.owl_id == owl.id)
+
+        rows = self.session.execute(query).fetchall()
+
+        if not rows and graph.number_of_edges():
+            log.info('Storing closure of owl %s', iri)
+            self._insert_owl_closure(closure_table, owl.id, self._get_owl_entry_ids(entry_table, owl.id), graph)
+            self.session.commit()
+            rows = self.session.execute(query).fetchall()
+
+        ancestors = defaultdict(set)
+        descendants = defaultdict(set)
+
+        for descendant, ancestor in rows:
+            ancestors[descendant].add(ancestor)
+            descendants[ancestor].add(descendant)
+
+        return dict(ancestors), dict(descendants)
+
     def insert_namespace_owl(self, iri):
         """Caches an ontology at the given IRI
 
         :param iri: the location of the ontology
         :type iri: str
         """
-        return self.insert_owl(iri, models.OwlNamespace, models.OwlNamespaceEntry)
+        return self.insert_owl(iri, models.OwlNamespace, models.OwlNamespaceEntry, models.owl_namespace_closure)
 
     def insert_annotation_owl(self, iri):
         """Caches an ontology at the given IRI
@@ -251,7 +1014,7 @@ class CacheManager(BaseCacheManager):
         :param iri: the location of the ontology
         :type iri: str
         """
-        return self.insert_owl(iri, models.OwlAnnotation, models.OwlAnnotationEntry)
+        return self.insert_owl(iri, models.OwlAnnotation, models.OwlAnnotationEntry, models.owl_annotation_closure)
 
     def ensure_namespace_owl(self, iri):
         """Caches an ontology at the given IRI if it is not already in the cache
@@ -266,8 +1029,10 @@ class CacheManager(BaseCacheManager):
         except NoResultFound:
             results = self.insert_namespace_owl(iri)
 
-        self.namespace_term_cache[iri] = set(entry.entry for entry in results.entries)
-        self.namespace_edge_cache[iri] = set((sub.entry, sup.entry) for sub in results.entries for sup in sub.children)
+        self.namespace_term_cache[iri], self.namespace_edge_cache[iri] = self._load_owl(
+            results.id,
+            models.OwlNamespaceEntry
+        )
 
         graph = nx.DiGraph()
         graph.add_edges_from(self.namespace_edge_cache[iri])
@@ -281,8 +1046,10 @@ class CacheManager(BaseCacheManager):
         except NoResultFound:
             results = self.insert_annotation_owl(iri)
 
-        self.annotation_term_cache[iri] = set(entry.entry for entry in results.entries)
-        self.annotation_edge_cache[iri] = set((sub.entry, sup.entry) for sub in results.entries for sup in sub.children)
+        self.annotation_term_cache[iri], self.annotation_edge_cache[iri] = self._load_owl(
+            results.id,
+            models.OwlAnnotationEntry
+        )
 
         graph = nx.DiGraph()
         graph.add_edges_from(self.annotation_edge_cache[iri])
@@ -342,6 +1109,118 @@ class CacheManager(BaseCacheManager):
         self.ensure_annotation_owl(iri)
         return self.annotation_graph_cache[iri]
 
+    def ensure_namespace_owl_closure(self, iri):
+        """Loads the stored transitive closure of the ontology at the given IRI, caching the ontology first if needed
+
+        :param iri: the location of the ontology
+        :type iri: str
+        """
+        if iri in self.namespace_ancestor_cache:
+            return
+
+        self.ensure_namespace_owl(iri)
+
+        self.namespace_ancestor_cache[iri], self.namespace_descendant_cache[iri] = self._load_owl_closure(
+            iri,
+            models.OwlNamespace,
+            models.OwlNamespaceEntry,
+            models.owl_namespace_closure,
+            self.namespace_graph_cache[iri]
+        )
+
+    def ensure_annotation_owl_closure(self, iri):
+        """Loads the stored transitive closure of the ontology at the given IRI, caching the ontology first if needed
+
+        :param iri: the location of the ontology
+        :type iri: str
+        """
+        if iri in self.annotation_ancestor_cache:
+            return
+
+        self.ensure_annotation_owl(iri)
+
+        self.annotation_ancestor_cache[iri], self.annotation_descendant_cache[iri] = self._load_owl_closure(
+            iri,
+            models.OwlAnnotation,
+            models.OwlAnnotationEntry,
+            models.owl_annotation_closure,
+            self.annotation_graph_cache[iri]
+        )
+
+    def get_namespace_owl_ancestors(self, iri, term):
+        """Gets the terms that the given term descends from in the ontology at the given IRI
+
+        :param iri: the location of the ontology
+        :type iri: str
+        :param term: a class or individual in the ontology
+        :type term: str
+        :rtype: set[str]
+        """
+        self.ensure_namespace_owl_closure(iri)
+        return self.namespace_ancestor_cache[iri].get(term, set())
+
+    def get_annotation_owl_ancestors(self, iri, term):
+        """Gets the terms that the given term descends from in the ontology at the given IRI
+
+        :param iri: the location of the ontology
+        :type iri: str
+        :param term: a class or individual in the ontology
+        :type term: str
+        :rtype: set[str]
+        """
+        self.ensure_annotation_owl_closure(iri)
+        return self.annotation_ancestor_cache[iri].get(term, set())
+
+    def get_namespace_owl_descendants(self, iri, term):
+        """Gets the terms that descend from the given term in the ontology at the given IRI
+
+        :param iri: the location of the ontology
+        :type iri: str
+        :param term: a class in the ontology
+        :type term: str
+        :rtype: set[str]
+        """
+        self.ensure_namespace_owl_closure(iri)
+        return self.namespace_descendant_cache[iri].get(term, set())
+
+    def get_annotation_owl_descendants(self, iri, term):
+        """Gets the terms that descend from the given term in the ontology at the given IRI
+
+        :param iri: the location of the ontology
+        :type iri: str
+        :param term: a class in the ontology
+        :type term: str
+        :rtype: set[str]
+        """
+        self.ensure_annotation_owl_closure(iri)
+        return self.annotation_descendant_cache[iri].get(term, set())
+
+    def is_namespace_owl_descendant(self, iri, term, ancestor):
+        """Checks if a term descends from another in the ontology at the given IRI, without traversing it
+
+        :param iri: the location of the ontology
+        :type iri: str
+        :param term: a class or individual in the ontology
+        :type term: str
+        :param ancestor: a class in the ontology
+        :type ancestor: str
+        :rtype: bool
+        """
+        return ancestor in self.get_namespace_owl_ancestors(iri, term)
+
+    def is_annotation_owl_descendant(self, iri, term, ancestor):
+        """Checks if a term descends from another in the ontology at the given IRI, without traversing it
+
+        :param iri: the location of the ontology
+        :type iri: str
+        :param term: a class or individual in the ontology
+        :type term: str
+        :param ancestor: a class in the ontology
+        :type ancestor: str
+        :rtype: bool
+        """
+        return ancestor in self.get_annotation_owl_ancestors(iri, term)
+
     def ls_namespace_owl(self):
         """Returns a list of the locations of the stored ontologies"""
         return [owl.iri for owl in self.session.query(models.OwlNamespace).all()]
@@ -371,7 +1250,7 @@ class CacheManager(BaseCacheManager):
 
         log.info('Caching equivalences: %s', url)
 
-        config = download_url(url)
+        config = download_url(url, http_cache=self.http_cache)
         values = config['Values']
 
         ns = self.session.query(models.Namespace).filter_by(url=namespace_url).one()
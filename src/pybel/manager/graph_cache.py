@@ -7,15 +7,21 @@ This module contains the Graph Cache Manager
 """
 
 import logging
+from collections import defaultdict, deque
+
+from sqlalchemy import select, and_, func
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.exc import NoResultFound
 
 from . import models
 from .base_cache import BaseCacheManager
-from .utils import parse_datetime
+from .utils import parse_datetime, iter_chunks
 from ..canonicalize import decanonicalize_edge, decanonicalize_node
+from ..compression import DEFAULT_CODEC, compress, decompress, get_codec
 from ..constants import *
 from ..graph import BELGraph
 from ..io import to_bytes, from_bytes
-from ..parser.utils import subdict_matches
+from ..utils import string_types
 
 try:
     import cPickle as pickle
@@ -24,23 +30,75 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+#: The number of rows looked up or inserted at a time when storing graphs in bulk
+BULK_CHUNK_SIZE = 500
+
+#: The number of edges loaded at a time when filtering the Edge Store
+EDGE_BATCH_SIZE = 1000
+
 
 class GraphCacheManager(BaseCacheManager):
-    def insert_graph(self, graph, store_parts=False):
+    def __init__(self, connection=None, echo=False, codec=DEFAULT_CODEC):
+        """
+        :param connection: custom database connection string can be given explicitly, loaded from a 'PYBEL_CONNECTION'
+                           in the environment, or will default to ~/.pybel/data/pybel_cache.db
+        :type connection: str or None
+        :param echo: Whether or not echo the running sql code.
+        :type echo: bool
+        :param codec: The name of the codec used to compress the graphs and the node and edge data that are stored, or
+                      None to not compress them. See :mod:`pybel.compression`
+        :type codec: str
+        """
+        if codec is not None:
+            get_codec(codec)  # fail early on codecs that aren't installed
+
+        self.codec = codec
+
+        BaseCacheManager.__init__(self, connection=connection, echo=echo)
+
+    def dump_blob(self, data):
+        """Pickles node or edge data and compresses it with this manager's codec
+
+        :param data: A node or edge data dictionary
+        :type data: dict
+        :rtype: bytes
+        """
+        blob = pickle.dumps(data)
+
+        if self.codec is not None:
+            return compress(blob, self.codec)
+
+        return blob
+
+    def insert_graph(self, graph, store_parts=False, bulk=False, chunk_size=BULK_CHUNK_SIZE):
         """Stores a graph in the database
 
         :param graph: a BEL network
         :type graph: pybel.BELGraph
         :param store_parts: Should the graph be stored in the Edge Store?
         :type store_parts: bool
+        :param bulk: Should the graph be stored in the Edge Store with batched queries and inserts? See
+                     :meth:`store_graph_parts_bulk`
+        :type bulk: bool
+        :param chunk_size: The number of rows looked up or inserted at a time when storing in bulk
+        :type chunk_size: int
         :return: A Network object
         :rtype: models.Network
         """
-        graph_bytes = to_bytes(graph)
+        graph_bytes = to_bytes(graph, codec=self.codec)
 
-        network = models.Network(blob=graph_bytes, **graph.document)
+        network = models.Network(
+            blob=graph_bytes,
+            number_of_nodes=graph.number_of_nodes(),
+            number_of_edges=graph.number_of_edges(),
+            **graph.document
+        )
 
-        if store_parts:
+        if store_parts and bulk:
+            self.session.add(network)
+            self.session.flush()
+            self.store_graph_parts_bulk(network, graph, chunk_size=chunk_size)
+        elif store_parts:
             self.store_graph_parts(network, graph)
 
         self.session.add(network)
@@ -74,7 +132,7 @@ class GraphCacheManager(BaseCacheManager):
                 relation=data[RELATION],
                 evidence=evidence,
                 bel=bel,
-                blob=pickle.dumps(data)
+                blob=self.dump_blob(data)
             )
 
             for key, value in data[ANNOTATIONS].items():
@@ -84,6 +142,245 @@ class GraphCacheManager(BaseCacheManager):
 
             network.edges.append(edge)
 
+    def store_graph_parts_bulk(self, network, graph, chunk_size=BULK_CHUNK_SIZE):
+        """Stores the given graph into the Edge Store like :meth:`store_graph_parts`, but looks up the existing nodes,
+        authors, citations, evidences, and annotation entries with batched :code:`IN` queries and inserts the new ones
+        with batched inserts instead of using a query for each one.
+
+        :param network: A SQLAlchemy PyBEL Network object that has already been flushed, so it has an identifier
+        :type network: models.Network
+        :param graph: A BEL Graph
+        :type graph: pybel.BELGraph
+        :param chunk_size: The number of rows looked up or inserted at a time
+        :type chunk_size: int
+        :raises sqlalchemy.orm.exc.NoResultFound: if an annotation entry used in the graph isn't in the cache
+        """
+        node_bel = {node: decanonicalize_node(graph, node) for node in graph.nodes_iter()}
+        node_ids = self._bulk_get_or_create(models.Node.__table__, ('bel',), {
+            (bel,): {'bel': bel, 'blob': self.dump_blob(dict(graph.node[node]))}
+            for node, bel in node_bel.items()
+        }, chunk_size)
+
+        edges = [
+            (u, v, k, data)
+            for u, v, k, data in graph.edges_iter(data=True, keys=True)
+            if CITATION in data and EVIDENCE in data
+        ]
+
+        citations, citation_authors = {}, {}
+        for _, _, _, data in edges:
+            citation = data[CITATION]
+            key = citation[CITATION_REFERENCE], citation[CITATION_TYPE]
+
+            if key in citations:
+                continue
+
+            citations[key] = {
+                'type': citation[CITATION_TYPE],
+                'name': citation[CITATION_NAME],
+                'reference': citation[CITATION_REFERENCE],
+                'date': parse_datetime(citation[CITATION_DATE]) if citation.get(CITATION_DATE) else None,
+                'comments': citation.get(CITATION_COMMENTS),
+            }
+
+            if citation.get(CITATION_AUTHORS):
+                citation_authors[key] = citation[CITATION_AUTHORS].split('|')
+
+        citation_table = models.Citation.__table__
+        citation_ids = self._bulk_select_ids(citation_table, ('reference', 'type'), citations, chunk_size)
+        new_citations = [key for key in citations if key not in citation_ids]
+
+        if new_citations:
+            self._bulk_insert(citation_table, [citations[key] for key in new_citations], chunk_size)
+            citation_ids.update(self._bulk_select_ids(citation_table, ('reference', 'type'), new_citations, chunk_size))
+
+            authors = {
+                (name,): {'name': name}
+                for key in new_citations
+                for name in citation_authors.get(key, [])
+            }
+            author_ids = self._bulk_get_or_create(models.Author.__table__, ('name',), authors, chunk_size)
+
+            self._bulk_insert(models.author_citation, [
+                {'author_id': author_ids[name,], 'citation_id': citation_ids[key]}
+                for key in new_citations
+                for name in citation_authors.get(key, [])
+            ], chunk_size)
+
+        evidences = {}
+        for _, _, _, data in edges:
+            citation_id = citation_ids[data[CITATION][CITATION_REFERENCE], data[CITATION][CITATION_TYPE]]
+            evidences.setdefault((data[EVIDENCE],), {'text': data[EVIDENCE], 'citation_id': citation_id})
+
+        evidence_ids = self._bulk_get_or_create(models.Evidence.__table__, ('text',), evidences, chunk_size)
+
+        annotation_entry_ids = self._bulk_get_annotation_entry_ids(graph, edges, chunk_size)
+
+        edge_rows = []
+        edge_annotations = []
+        for u, v, k, data in edges:
+            edge_rows.append({
+                'source_id': node_ids[node_bel[u],],
+                'target_id': node_ids[node_bel[v],],
+                'relation': data[RELATION],
+                'evidence_id': evidence_ids[data[EVIDENCE],],
+                'bel': decanonicalize_edge(graph, u, v, k),
+                'blob': self.dump_blob(data)
+            })
+
+            edge_annotations.append({
+                annotation_entry_ids[graph.annotation_url[key], value]
+                for key, value in data.get(ANNOTATIONS, {}).items()
+                if key in graph.annotation_url
+            })
+
+        edge_ids = self._bulk_insert_get_ids(
+            models.Edge.__table__,
+            ('source_id', 'target_id', 'relation', 'evidence_id', 'bel'),
+            edge_rows,
+            chunk_size
+        )
+
+        self._bulk_insert(models.network_edge, [
+            {'network_id': network.id, 'edge_id': edge_id}
+            for edge_id in edge_ids
+        ], chunk_size)
+
+        self._bulk_insert(models.edge_annotation, [
+            {'edge_id': edge_id, 'annotationEntry_id': annotation_entry_id}
+            for edge_id, annotation_entry_ids in zip(edge_ids, edge_annotations)
+            for annotation_entry_id in annotation_entry_ids
+        ], chunk_size)
+
+    def _bulk_get_annotation_entry_ids(self, graph, edges, chunk_size):
+        """Looks up the identifiers of the annotation entries used by the given edges
+
+        :return: A dictionary of {(annotation url, value): annotation entry id}
+        :rtype: dict
+        """
+        values = {
+            (graph.annotation_url[key], value)
+            for _, _, _, data in edges
+            for key, value in data.get(ANNOTATIONS, {}).items()
+            if key in graph.annotation_url
+        }
+
+        if not values:
+            return {}
+
+        annotation_ids = dict(self.session.execute(
+            select([models.Annotation.url, models.Annotation.id]).where(
+                models.Annotation.url.in_({url for url, _ in values}))
+        ).fetchall())
+
+        entry_ids = self._bulk_select_ids(models.AnnotationEntry.__table__, ('name', 'annotation_id'), {
+            (value, annotation_ids[url]) for url, value in values if url in annotation_ids
+        }, chunk_size)
+
+        result = {}
+        for url, value in values:
+            if url not in annotation_ids or (value, annotation_ids[url]) not in entry_ids:
+                raise NoResultFound('Missing annotation entry {} from {}'.format(value, url))
+
+            result[url, value] = entry_ids[value, annotation_ids[url]]
+
+        return result
+
+    def _bulk_select_ids(self, table, columns, keys, chunk_size):
+        """Looks up the identifiers of the rows with the given keys with batched :code:`IN` queries on the first
+        column
+
+        :param table: A SQLAlchemy table
+        :type table: sqlalchemy.Table
+        :param columns: The names of the columns whose values are the keys
+        :type columns: tuple[str]
+        :param keys: The tuples of values of the columns to look up
+        :type keys: iter[tuple]
+        :param chunk_size: The number of values in each query
+        :type chunk_size: int
+        :return: A dictionary of {key: id} for the keys that were found
+        :rtype: dict
+        """
+        keys = set(keys)
+        result = {}
+
+        query_columns = [table.c.id] + [table.c[column] for column in columns]
+
+        for chunk in iter_chunks(sorted({key[0] for key in keys}), chunk_size):
+            for row in self.session.execute(select(query_columns).where(table.c[columns[0]].in_(chunk))):
+                key = tuple(row[1:])
+                if key in keys:
+                    result.setdefault(key, row[0])
+
+        return result
+
+    def _bulk_get_or_create(self, table, columns, rows, chunk_size):
+        """Looks up the identifiers of the rows with the given keys, and inserts the ones that don't exist yet
+
+        :param table: A SQLAlchemy table
+        :type table: sqlalchemy.Table
+        :param columns: The names of the columns whose values are the keys
+        :type columns: tuple[str]
+        :param rows: A dictionary of {key: row dictionary} for the rows to insert if they don't exist
+        :type rows: dict
+        :param chunk_size: The number of rows in each query and insert
+        :type chunk_size: int
+        :return: A dictionary of {key: id}
+        :rtype: dict
+        """
+        result = self._bulk_select_ids(table, columns, rows, chunk_size)
+        missing = [key for key in rows if key not in result]
+
+        if missing:
+            self._bulk_insert(table, [rows[key] for key in missing], chunk_size)
+            result.update(self._bulk_select_ids(table, columns, missing, chunk_size))
+
+        return result
+
+    def _bulk_insert_get_ids(self, table, columns, rows, chunk_size):
+        """Inserts rows that don't have a unique key with :meth:`_bulk_insert`, then gets their identifiers with one
+        query for the rows after the largest identifier from before the insert
+
+        :param table: A SQLAlchemy table
+        :type table: sqlalchemy.Table
+        :param columns: The names of the columns that tell the new rows apart
+        :type columns: tuple[str]
+        :param rows: A list of row dictionaries
+        :type rows: list[dict]
+        :param chunk_size: The number of rows in each insert
+        :type chunk_size: int
+        :return: The identifiers of the rows, in the same order
+        :rtype: list[int]
+        """
+        last_id = self.session.execute(select([func.max(table.c.id)])).scalar() or 0
+
+        self._bulk_insert(table, rows, chunk_size)
+
+        query = select([table.c.id] + [table.c[column] for column in columns]).where(
+            table.c.id > last_id).order_by(table.c.id)
+
+        new_ids = defaultdict(deque)
+        for row in self.session.execute(query):
+            new_ids[tuple(row[1:])].append(row[0])
+
+        return [
+            new_ids[tuple(row[column] for column in columns)].popleft()
+            for row in rows
+        ]
+
+    def _bulk_insert(self, table, rows, chunk_size):
+        """Inserts rows with an :code:`executemany` for each chunk
+
+        :param table: A SQLAlchemy table
+        :type table: sqlalchemy.Table
+        :param rows: A list of row dictionaries
+        :type rows: list[dict]
+        :param chunk_size: The number of rows in each insert
+        :type chunk_size: int
+        """
+        for chunk in iter_chunks(rows, chunk_size):
+            self.session.execute(table.insert(), chunk)
+
     def get_bel_annotation_entry(self, url, value):
         """Gets a given AnnotationEntry
 
@@ -129,7 +426,7 @@ class GraphCacheManager(BaseCacheManager):
         :rtype: models.Node
         """
         bel = decanonicalize_node(graph, node)
-        blob = pickle.dumps(graph.node[node])
+        blob = self.dump_blob(dict(graph.node[node]))
 
         result = self.session.query(models.Node).filter_by(bel=bel).one_or_none()
 
@@ -221,24 +518,38 @@ class GraphCacheManager(BaseCacheManager):
         """Returns all of the versions of a graph with the given name"""
         return {x for x, in self.session.query(models.Network.version).filter(models.Network.name == name).all()}
 
-    def get_graph(self, name, version=None):
+    def get_graph(self, name, version=None, lazy=False):
         """Loads most recent graph, or allows for specification of version
 
         :param name: The name of the graph
         :type name: str
         :param version: The version string of the graph. If not specified, loads most recent graph added with this name
         :type version: None or str
+        :param lazy: If true, returns a :class:`LazyBELGraph` that only loads the graph when it's first used
+        :type lazy: bool
         :return: A BEL Graph
         :rtype: pybel.BELGraph
         """
+        query = self.session.query(models.Network.id if lazy else models.Network.blob)
+
         if version is not None:
-            n = self.session.query(models.Network).filter(models.Network.name == name,
-                                                          models.Network.version == version).one()
+            result = query.filter(models.Network.name == name, models.Network.version == version).one()
         else:
-            n = self.session.query(models.Network).filter(models.Network.name == name).order_by(
-                models.Network.created.desc()).first()
+            result = query.filter(models.Network.name == name).order_by(models.Network.created.desc()).first()
+
+        if lazy:
+            return LazyBELGraph(self, result.id)
 
-        return from_bytes(n.blob)
+        return from_bytes(result.blob)
+
+    def get_graph_blob_by_id(self, network_id):
+        """Gets the pickled graph from the database by the network's identifier
+
+        :param network_id: The network's database identifier
+        :type network_id: int
+        :rtype: bytes
+        """
+        return self.session.query(models.Network.blob).filter(models.Network.id == network_id).scalar()
 
     def get_graph_by_id(self, id):
         """Gets the graph from the database by its identifier
@@ -263,27 +574,84 @@ class GraphCacheManager(BaseCacheManager):
 
     def ls(self):
         """Lists network id, network name, and network version triples"""
-        return [(network.id, network.name, network.version) for network in self.session.query(models.Network).all()]
+        query = self.session.query(models.Network.id, models.Network.name, models.Network.version)
+        return [tuple(row) for row in query.all()]
+
+    def get_network_summaries(self):
+        """Lists the metadata, creation time, and number of nodes and edges of each stored network, without loading
+        any of the graphs. Networks that were stored without their numbers of nodes and edges are loaded once to count
+        them.
+
+        :return: A list of dictionaries of the columns of each network besides the graph
+        :rtype: list[dict]
+        """
+        columns = [
+            column
+            for column in models.Network.__table__.columns
+            if column.name != 'blob'
+        ]
+
+        summaries = [
+            dict(zip((column.name for column in columns), row))
+            for row in self.session.query(*columns).all()
+        ]
+
+        for summary in summaries:
+            if summary['number_of_nodes'] is None or summary['number_of_edges'] is None:
+                self._store_counts(summary)
+
+        return summaries
+
+    def _store_counts(self, summary):
+        """Counts the nodes and edges of a network that was stored without them, and stores them
+
+        :param summary: A network's summary from :meth:`get_network_summaries`, which is updated with the counts
+        :type summary: dict
+        """
+        graph = from_bytes(self.get_graph_blob_by_id(summary['id']))
+
+        summary['number_of_nodes'] = graph.number_of_nodes()
+        summary['number_of_edges'] = graph.number_of_edges()
+
+        self.session.query(models.Network).filter(models.Network.id == summary['id']).update({
+            models.Network.number_of_nodes: summary['number_of_nodes'],
+            models.Network.number_of_edges: summary['number_of_edges'],
+        }, synchronize_session=False)
+        self.session.commit()
 
     def get_edge_iter_by_filter(self, **annotations):
-        """Returns an iterator over models.Edge object that match the given annotations
+        """Returns an iterator over models.Edge object that match the given annotations. The annotations are matched
+        in the database and the edges are loaded in batches of :data:`EDGE_BATCH_SIZE`, along with their source and
+        target nodes.
 
-        :param annotations: dictionary of {URL: values}
+        :param annotations: dictionary of {annotation name: value or list of values}
         :type annotations: dict
         :return: An iterator over models.Edge object that match the given annotations
         :rtype: iter of models.Edge
         """
+        query = self.session.query(models.Edge).options(
+            joinedload(models.Edge.source),
+            joinedload(models.Edge.target)
+        )
+
+        for name, values in annotations.items():
+            if isinstance(values, string_types):
+                values = [values]
+            elif not isinstance(values, (list, set, tuple)):
+                raise ValueError('invalid value: {}'.format(values))
+
+            query = query.filter(models.Edge.annotations.any(and_(
+                models.AnnotationEntry.name.in_(values),
+                models.AnnotationEntry.annotation.has(models.Annotation.name == name)
+            )))
 
-        # TODO make smarter
-        for edge in self.session.query(models.Edge).all():
-            ad = {a.annotation.name: a.name for a in edge.annotations}
-            if subdict_matches(ad, annotations):
-                yield edge
+        for edge in query.yield_per(EDGE_BATCH_SIZE):
+            yield edge
 
     def get_graph_by_filter(self, **annotations):
         """Fills a BEL graph with edges retrieved from a filter
 
-        :param annotations: dictionary of {URL: values}
+        :param annotations: dictionary of {annotation name: value or list of values}
         :type annotations: dict
         :return: A BEL Graph
         :rtype: pybel.BELGraph
@@ -292,11 +660,79 @@ class GraphCacheManager(BaseCacheManager):
 
         for edge in self.get_edge_iter_by_filter(**annotations):
             if edge.source.id not in graph:
-                graph.add_node(edge.source.id, attr_dict=pickle.loads(edge.source.blob))
+                graph.add_node(edge.source.id, attr_dict=load_blob(edge.source.blob))
 
             if edge.target.id not in graph:
-                graph.add_node(edge.target.id, attr_dict=pickle.loads(edge.target.blob))
+                graph.add_node(edge.target.id, attr_dict=load_blob(edge.target.blob))
 
-            graph.add_edge(edge.source.id, edge.target.id, attr_dict=pickle.loads(edge.blob))
+            graph.add_edge(edge.source.id, edge.target.id, attr_dict=load_blob(edge.blob))
 
         return graph
+
+
+def load_blob(blob):
+    """Loads node or edge data from the Edge Store that may have been compressed
+
+    :param blob: The bytes from :meth:`GraphCacheManager.dump_blob`
+    :type blob: bytes
+    :rtype: dict
+    """
+    return pickle.loads(decompress(blob))
+
+
+class LazyBELGraph(BELGraph):
+    """A BEL graph stored in the database that's only loaded from the database when one of its attributes is first
+    used. Until then, only the manager and the network's identifier are kept. Made without a network identifier, like
+    NetworkX does for subgraphs, it's an empty BEL graph."""
+
+    def __init__(self, manager=None, network_id=None, **kwargs):
+        """
+        :param manager: The graph cache manager to load the graph with
+        :type manager: GraphCacheManager
+        :param network_id: The network's database identifier
+        :type network_id: int
+        :param kwargs: Keyword arguments to pass to :class:`pybel.BELGraph` when no network identifier is given
+        """
+        if network_id is None:
+            BELGraph.__init__(self, **kwargs)
+            return
+
+        self.__dict__['_manager'] = manager
+        self.__dict__['_network_id'] = network_id
+
+    @property
+    def network_id(self):
+        """The network's database identifier"""
+        return self.__dict__.get('_network_id')
+
+    @property
+    def loaded(self):
+        """Has the graph been loaded yet?"""
+        return 'graph' in self.__dict__
+
+    def load(self):
+        """Loads the graph from the database if it hasn't been yet
+
+        :return: This graph
+        :rtype: LazyBELGraph
+        """
+        if not self.loaded:
+            manager = self.__dict__.pop('_manager')
+            graph = from_bytes(manager.get_graph_blob_by_id(self.network_id))
+            self.__dict__.update(graph.__dict__)
+
+        return self
+
+    def __getattr__(self, item):
+        # only called for attributes that aren't set yet, like the ones BELGraph.__init__ would have set
+        if item.startswith('__') or self.loaded or '_manager' not in self.__dict__:
+            raise AttributeError(item)
+
+        self.load()
+        return getattr(self, item)
+
+    def __reduce_ex__(self, protocol):
+        """Copies and pickles of the graph are plain BEL graphs, so they don't depend on the database"""
+        state = BELGraph.__getstate__(self.load())
+        state.pop('_network_id', None)
+        return BELGraph, (), state
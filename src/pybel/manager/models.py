@@ -8,10 +8,10 @@ This module contains the database models that support the PyBEL definition cache
 
 import datetime
 
-from sqlalchemy import Column, ForeignKey, Table, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Table, UniqueConstraint, Index
 from sqlalchemy import Integer, String, DateTime, Text, Date, Binary, Boolean
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 from ..constants import CITATION_REFERENCE, CITATION_TYPE, METADATA_VERSION, METADATA_NAME
 
@@ -24,6 +24,8 @@ OWL_NAMESPACE_TABLE_NAME = 'pybel_owlNamespace'
 OWL_NAMESPACE_ENTRY_TABLE_NAME = 'pybel_owlNamespaceEntry'
 OWL_ANNOTATION_TABLE_NAME = 'pybel_owlAnnotation'
 OWL_ANNOTATION_ENTRY_TABLE_NAME = 'pybel_owlAnnotationEntry'
+OWL_NAMESPACE_CLOSURE_TABLE_NAME = 'pybel_owlNamespaceClosure'
+OWL_ANNOTATION_CLOSURE_TABLE_NAME = 'pybel_owlAnnotationClosure'
 
 NAMESPACE_EQUIVALENCE_CLASS_TABLE_NAME = 'pybel_namespaceEquivalenceClass'
 NAMESPACE_EQUIVALENCE_TABLE_NAME = 'pybel_namespaceEquivalence'
@@ -71,6 +73,8 @@ class Namespace(Base):
 
     has_equivalences = Column(Boolean, default=False)
 
+    content_hash = Column(String(64), nullable=True)
+
 
 class NamespaceEntry(Base):
     """Represents a name within a BEL namespace"""
@@ -87,6 +91,10 @@ class NamespaceEntry(Base):
     equivalence_id = Column(Integer, ForeignKey('{}.id'.format(NAMESPACE_EQUIVALENCE_CLASS_TABLE_NAME)), nullable=True)
     equivalence = relationship('NamespaceEntryEquivalence', back_populates='members')
 
+    __table_args__ = (
+        Index('ix_{}_namespace_id_name'.format(NAMESPACE_ENTRY_TABLE_NAME), 'namespace_id', 'name'),
+    )
+
 
 class NamespaceEntryEquivalence(Base):
     __tablename__ = NAMESPACE_EQUIVALENCE_CLASS_TABLE_NAME
@@ -124,6 +132,8 @@ class Annotation(Base):
 
     entries = relationship('AnnotationEntry', back_populates="annotation")
 
+    content_hash = Column(String(64), nullable=True)
+
 
 class AnnotationEntry(Base):
     """Represents a value within a BEL Annotation"""
@@ -145,6 +155,18 @@ owl_namespace_relationship = Table(
 )
 
 
+#: The transitive closure of :data:`owl_namespace_relationship`. Stores every pair of an entry and an entry it
+#: can reach by following the relationships, so ancestors and descendants can be looked up without traversal
+owl_namespace_closure = Table(
+    OWL_NAMESPACE_CLOSURE_TABLE_NAME, Base.metadata,
+    Column('owl_id', Integer, ForeignKey('{}.id'.format(OWL_NAMESPACE_TABLE_NAME)), nullable=False, index=True),
+    Column('descendant_id', Integer, ForeignKey('{}.id'.format(OWL_NAMESPACE_ENTRY_TABLE_NAME)), primary_key=True),
+    Column('ancestor_id', Integer, ForeignKey('{}.id'.format(OWL_NAMESPACE_ENTRY_TABLE_NAME)), primary_key=True),
+    Column('depth', Integer, nullable=False, doc='The length of the shortest path from the descendant to the ancestor'),
+    Index('ix_{}_ancestor_id'.format(OWL_NAMESPACE_CLOSURE_TABLE_NAME), 'ancestor_id')
+)
+
+
 class OwlNamespace(Base):
     """Represents an OWL Namespace"""
     __tablename__ = OWL_NAMESPACE_TABLE_NAME
@@ -180,6 +202,18 @@ owl_annotation_relationship = Table(
 )
 
 
+#: The transitive closure of :data:`owl_annotation_relationship`. Stores every pair of an entry and an entry it
+#: can reach by following the relationships, so ancestors and descendants can be looked up without traversal
+owl_annotation_closure = Table(
+    OWL_ANNOTATION_CLOSURE_TABLE_NAME, Base.metadata,
+    Column('owl_id', Integer, ForeignKey('{}.id'.format(OWL_ANNOTATION_TABLE_NAME)), nullable=False, index=True),
+    Column('descendant_id', Integer, ForeignKey('{}.id'.format(OWL_ANNOTATION_ENTRY_TABLE_NAME)), primary_key=True),
+    Column('ancestor_id', Integer, ForeignKey('{}.id'.format(OWL_ANNOTATION_ENTRY_TABLE_NAME)), primary_key=True),
+    Column('depth', Integer, nullable=False, doc='The length of the shortest path from the descendant to the ancestor'),
+    Index('ix_{}_ancestor_id'.format(OWL_ANNOTATION_CLOSURE_TABLE_NAME), 'ancestor_id')
+)
+
+
 class OwlAnnotation(Base):
     """Represents an OWL namespace used as an annotation"""
     __tablename__ = OWL_ANNOTATION_TABLE_NAME
@@ -244,7 +278,10 @@ class Network(Base):
     licenses = Column(String(255), nullable=True)
 
     created = Column(DateTime, default=datetime.datetime.utcnow)
-    blob = Column(Binary)
+    blob = deferred(Column(Binary))
+
+    number_of_nodes = Column(Integer, nullable=True)
+    number_of_edges = Column(Integer, nullable=True)
 
     edges = relationship('Edge', secondary=network_edge)
 
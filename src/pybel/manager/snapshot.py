@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+This module contains read-only snapshot files of the namespaces and annotations in the definition cache. A snapshot
+is read with :code:`mmap`, so processes that use the same namespaces share one copy of them in the operating system's
+page cache instead of each loading them into a dictionary.
+
+A file contains a header, an index of the names in sorted order, an index of their values, a hash table of the
+positions of the names, and the string data. Names are found by their CRC-32 checksum in the hash table with linear
+probing, so a lookup only reads a few records of the file.
+
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+
+from ..utils import ensure_directory, replace_file
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+__all__ = [
+    'DefinitionSnapshot',
+    'write_snapshot',
+    'get_snapshot_path',
+]
+
+log = logging.getLogger(__name__)
+
+#: The bytes at the beginning of every snapshot file
+SNAPSHOT_MAGIC = b'PYBELDEF'
+
+#: The version of the snapshot format. Files with other versions are written again.
+SNAPSHOT_FORMAT_VERSION = 1
+
+#: The kind of snapshot for namespaces, whose values are encodings
+NAMESPACE_SNAPSHOT = 0
+
+#: The kind of snapshot for annotations, whose values are labels
+ANNOTATION_SNAPSHOT = 1
+
+SNAPSHOT_KIND_NAMES = {
+    NAMESPACE_SNAPSHOT: 'namespace',
+    ANNOTATION_SNAPSHOT: 'annotation',
+}
+
+#: The magic bytes, format version, kind, number of entries, hash of the definition's file, number of slots in the
+#: hash table, and the offsets of the name index, value index, hash table, and string data
+HEADER = struct.Struct('<8sIII64sIQQQQ')
+
+#: The offset and length of a string in the string data
+STRING_RECORD = struct.Struct('<QI')
+
+#: The position of a name in the name index plus one, or zero for empty slots of the hash table
+HASH_SLOT = struct.Struct('<I')
+
+#: The length of missing values
+MISSING = 0xFFFFFFFF
+
+
+def get_snapshot_path(directory, kind, url):
+    """Gets the path of the snapshot of a namespace or annotation
+
+    :param directory: The directory of the snapshots
+    :type directory: str
+    :param kind: :data:`NAMESPACE_SNAPSHOT` or :data:`ANNOTATION_SNAPSHOT`
+    :type kind: int
+    :param url: The location of the namespace or annotation file
+    :type url: str
+    :rtype: str
+    """
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return os.path.join(directory, '{}-{}.snapshot'.format(SNAPSHOT_KIND_NAMES[kind], key))
+
+
+def _hash_name(name):
+    return zlib.crc32(name) & 0xFFFFFFFF
+
+
+def _get_number_of_slots(number_of_entries):
+    """Gets the smallest power of two that's at least twice the number of entries, so the hash table is at most half
+    full"""
+    number_of_slots = 1
+
+    while number_of_slots < 2 * number_of_entries:
+        number_of_slots *= 2
+
+    return number_of_slots
+
+
+def write_snapshot(path, kind, entries, content_hash=None):
+    """Writes a snapshot of a namespace or annotation. It's written to a temporary file first, so other processes
+    never read half a file.
+
+    :param path: The path of the file to write
+    :type path: str
+    :param kind: :data:`NAMESPACE_SNAPSHOT` or :data:`ANNOTATION_SNAPSHOT`
+    :type kind: int
+    :param entries: An iterable of (name, value) pairs. The values are encodings for namespaces and labels for
+                    annotations, and can be None.
+    :type entries: iter[tuple[str,str]]
+    :param content_hash: The hash of the definition's file, for checking if the snapshot is out of date
+    :type content_hash: str
+    """
+    entries = sorted(
+        (name.encode('utf-8'), None if value is None else value.encode('utf-8'))
+        for name, value in entries
+    )
+
+    number_of_slots = _get_number_of_slots(len(entries))
+    slots = [0] * number_of_slots
+
+    for position, (name, _) in enumerate(entries):
+        slot = _hash_name(name) & (number_of_slots - 1)
+
+        while slots[slot]:
+            slot = (slot + 1) & (number_of_slots - 1)
+
+        slots[slot] = position + 1
+
+    names_index_offset = HEADER.size
+    values_index_offset = names_index_offset + STRING_RECORD.size * len(entries)
+    hash_table_offset = values_index_offset + STRING_RECORD.size * len(entries)
+    data_offset = hash_table_offset + HASH_SLOT.size * number_of_slots
+
+    directory = os.path.dirname(path)
+
+    if directory:
+        ensure_directory(directory)
+
+    handle, temp_path = tempfile.mkstemp(dir=directory or None)
+
+    with os.fdopen(handle, 'wb') as f:
+        f.write(HEADER.pack(
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_FORMAT_VERSION,
+            kind,
+            len(entries),
+            (content_hash or '').encode('ascii'),
+            number_of_slots,
+            names_index_offset,
+            values_index_offset,
+            hash_table_offset,
+            data_offset
+        ))
+
+        offset = 0
+        for name, _ in entries:
+            f.write(STRING_RECORD.pack(offset, len(name)))
+            offset += len(name)
+
+        for _, value in entries:
+            if value is None:
+                f.write(STRING_RECORD.pack(0, MISSING))
+            else:
+                f.write(STRING_RECORD.pack(offset, len(value)))
+                offset += len(value)
+
+        for slot in slots:
+            f.write(HASH_SLOT.pack(slot))
+
+        for name, _ in entries:
+            f.write(name)
+
+        for _, value in entries:
+            if value is not None:
+                f.write(value)
+
+    replace_file(temp_path, path)
+
+
+class DefinitionSnapshot(Mapping):
+    """A read-only dictionary of a namespace's {name: set of encodings} or an annotation's {name: label} that's read
+    from a snapshot file with :code:`mmap`.
+
+    It can be pickled and used in other processes, which open the same file again.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of a file written by :func:`write_snapshot`
+        :type path: str
+        :raises ValueError: if the file isn't a snapshot, or has a different format version
+        """
+        self.path = path
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError('{} is not a definition snapshot'.format(self.path))
+
+        (
+            magic,
+            format_version,
+            self.kind,
+            self._length,
+            content_hash,
+            self._number_of_slots,
+            self._names_index_offset,
+            self._values_index_offset,
+            self._hash_table_offset,
+            self._data_offset
+        ) = HEADER.unpack_from(self._mmap, 0)
+
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError('{} is not a definition snapshot'.format(self.path))
+
+        if format_version != SNAPSHOT_FORMAT_VERSION:
+            self.close()
+            raise ValueError('Using snapshot format version {}, tried reading version {}'.format(
+                SNAPSHOT_FORMAT_VERSION, format_version))
+
+        #: The hash of the definition's file when the snapshot was written
+        self.content_hash = content_hash.rstrip(b'\0').decode('ascii')
+
+    def close(self):
+        """Closes the memory map of the file"""
+        self._mmap.close()
+
+    def _get_string(self, index_offset, position):
+        offset, length = STRING_RECORD.unpack_from(self._mmap, index_offset + STRING_RECORD.size * position)
+
+        if length == MISSING:
+            return
+
+        start = self._data_offset + offset
+        return self._mmap[start:start + length]
+
+    def _find(self, name):
+        """Finds the position of a name in the name index with the hash table, or None if it's missing"""
+        name = name.encode('utf-8')
+        mask = self._number_of_slots - 1
+        slot = _hash_name(name) & mask
+
+        while True:
+            position, = HASH_SLOT.unpack_from(self._mmap, self._hash_table_offset + HASH_SLOT.size * slot)
+
+            if not position:
+                return
+
+            if self._get_string(self._names_index_offset, position - 1) == name:
+                return position - 1
+
+            slot = (slot + 1) & mask
+
+    def __getitem__(self, name):
+        position = self._find(name)
+
+        if position is None:
+            raise KeyError(name)
+
+        value = self._get_string(self._values_index_offset, position)
+
+        if value is not None:
+            value = value.decode('utf-8')
+
+        if self.kind == NAMESPACE_SNAPSHOT:
+            return set(value or '')
+
+        return value
+
+    def __contains__(self, name):
+        return self._find(name) is not None
+
+    def __iter__(self):
+        for position in range(self._length):
+            yield self._get_string(self._names_index_offset, position).decode('utf-8')
+
+    def __len__(self):
+        return self._length
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import itertools as itt
 from datetime import datetime
+from io import BytesIO
 from xml.etree import ElementTree as ET
 
 import networkx as nx
-import requests
 from onto2nx.ontospy import Ontospy
-from requests_file import FileAdapter
+
+from ..utils import HTTPCache
 
 try:
     from urlparse import urldefrag
@@ -21,95 +23,249 @@ owl_ns = {
 IRI = 'IRI'
 AIRI = 'abbreviatedIRI'
 
+#: The kind of the items from :class:`OWLReader` for classes and individuals
+OWL_NODE = 'node'
 
-class OWLParser(nx.DiGraph):
-    def __init__(self, content=None, file=None, *attrs, **kwargs):
-        """Builds a model of an OWL ontology in OWL/XML document using a NetworkX graph
+#: The kind of the items from :class:`OWLReader` for subclass and class assertion relations
+OWL_EDGE = 'edge'
 
-        :param content: The content of an XML file as a string
-        :type content: str
-        :param file: input OWL file path or file-like object
-        :type file: file or str
+
+def _owl_tag(tag):
+    return '{{{}}}{}'.format(owl_ns['owl'], tag)
+
+
+OWL_DECLARATION = _owl_tag('Declaration')
+OWL_CLASS = _owl_tag('Class')
+OWL_NAMED_INDIVIDUAL = _owl_tag('NamedIndividual')
+OWL_SUBCLASS_OF = _owl_tag('SubClassOf')
+OWL_CLASS_ASSERTION = _owl_tag('ClassAssertion')
+OWL_OBJECT_SOME_VALUES_FROM = _owl_tag('ObjectSomeValuesFrom')
+
+
+def has_iri(attribs):
+    return any(key in {IRI, AIRI} for key in attribs)
+
+
+def strip_iri(iri, ontology_iri):
+    return iri.lstrip(ontology_iri).lstrip('#').strip()
+
+
+def strip_airi(airi):
+    l, r = airi.split(':')
+    return r
+
+
+def get_iri(attribs, ontology_iri):
+    if IRI in attribs:
+        return strip_iri(attribs[IRI], ontology_iri)
+    elif AIRI in attribs:
+        return strip_airi(attribs[AIRI])
+
+
+class OWLFormatError(ValueError):
+    """Raised by :class:`OWLReader` when a document isn't OWL/XML, so it can be read with :func:`parse_owl_rdf`
+    instead"""
+
+
+class OWLReader(object):
+    """Reads the classes, individuals, and relations of an ontology in an OWL/XML document in one pass with
+    :func:`xml.etree.ElementTree.iterparse`. Each top-level element is cleared once it's read, so the document is
+    never all in memory.
+    """
+
+    def __init__(self, source):
+        """
+        :param source: The path of an OWL/XML file or a binary file-like object
+        :type source: str or file
         """
+        self.source = source
 
-        nx.DiGraph.__init__(self, *attrs, **kwargs)
+        #: The IRI of the ontology, which is set once the root element is read
+        self.iri = None
 
-        if file is not None:
-            self.tree = ET.parse(file)
-        elif content is not None:
-            self.tree = ET.ElementTree(ET.fromstring(content))
-        else:
-            raise ValueError('Missing data source (file/content)')
+    def __iter__(self):
+        """Iterates over (:data:`OWL_NODE`, name, type) for classes and individuals and
+        (:data:`OWL_EDGE`, child, parent, type) for relations, in the order they appear in the document
 
-        self.root = self.tree.getroot()
-        self.graph['IRI'] = self.root.attrib['ontologyIRI']
+        :raises OWLFormatError: if the document isn't XML, or its root isn't an OWL/XML ontology
+        """
+        events = ET.iterparse(self.source, events=('start', 'end'))
 
-        for el in self.root.findall('./owl:Declaration/owl:Class', owl_ns):
-            self.add_node(self.get_iri(el.attrib), type="Class")
+        try:
+            _, root = next(events)
+        except ET.ParseError as e:
+            raise OWLFormatError('Not an XML document: {}'.format(e))
 
-        for el in self.root.findall('./owl:Declaration/owl:NamedIndividual', owl_ns):
-            self.add_node(self.get_iri(el.attrib), type="NamedIndividual")
+        if 'ontologyIRI' not in root.attrib:
+            raise OWLFormatError('Not an OWL/XML document: the root element is {}'.format(root.tag))
 
-        for el in self.root.findall('./owl:SubClassOf', owl_ns):
+        self.iri = root.attrib['ontologyIRI']
+        depth = 1
+
+        for event, el in events:
+            if event == 'start':
+                depth += 1
+                continue
+
+            depth -= 1
+
+            if depth != 1:
+                continue
+
+            for item in self._iter_element(el):
+                yield item
+
+            root.clear()
+
+    def _iter_element(self, el):
+        """Gets the items from a top-level element"""
+        if el.tag == OWL_DECLARATION:
+            for child in el:
+                if child.tag == OWL_CLASS:
+                    yield OWL_NODE, get_iri(child.attrib, self.iri), 'Class'
+                elif child.tag == OWL_NAMED_INDIVIDUAL:
+                    yield OWL_NODE, get_iri(child.attrib, self.iri), 'NamedIndividual'
+
+        elif el.tag == OWL_SUBCLASS_OF:
             if len(el) != 2:
                 raise ValueError('something weird with SubClassOf: {} {}'.format(el, el.attrib))
 
-            child = self.get_iri(el[0].attrib)
+            child = get_iri(el[0].attrib, self.iri)
 
-            if any(x in el[1].attrib for x in {IRI, AIRI}):
-                parent = self.get_iri(el[1].attrib)
-                self.add_edge(child, parent, type='SubClassOf')
-            elif el[1].tag == '{http://www.w3.org/2002/07/owl#}ObjectSomeValuesFrom':  # check if ObjectSomeValuesFrom?
+            if has_iri(el[1].attrib):
+                yield OWL_EDGE, child, get_iri(el[1].attrib, self.iri), 'SubClassOf'
+            elif el[1].tag == OWL_OBJECT_SOME_VALUES_FROM:
                 object_property, parent = el[1]
-                parent = self.get_iri(parent.attrib)
-                relation = self.get_iri(object_property.attrib)
-                self.add_edge(child, parent, type=relation)
+                yield OWL_EDGE, child, get_iri(parent.attrib, self.iri), get_iri(object_property.attrib, self.iri)
 
-        for el in self.root.findall('./owl:ClassAssertion', owl_ns):
+        elif el.tag == OWL_CLASS_ASSERTION:
             a = el.find('./owl:Class', owl_ns)
-            if not self.has_iri(a.attrib):
-                continue
-            a = self.get_iri(a.attrib)
+            if a is None or not has_iri(a.attrib):
+                return
 
             b = el.find('./owl:NamedIndividual', owl_ns)
-            if not self.has_iri(b.attrib):
-                continue
-            b = self.get_iri(b.attrib)
-            self.add_edge(b, a, type="ClassAssertion")
+            if b is None or not has_iri(b.attrib):
+                return
+
+            yield OWL_EDGE, get_iri(b.attrib, self.iri), get_iri(a.attrib, self.iri), 'ClassAssertion'
+
+
+class OWLParser(nx.DiGraph):
+    def __init__(self, content=None, file=None, *attrs, **kwargs):
+        """Builds a model of an OWL ontology in OWL/XML document using a NetworkX graph
+
+        :param content: The content of an XML file
+        :type content: bytes or str
+        :param file: input OWL file path or file-like object
+        :type file: file or str
+        """
+
+        nx.DiGraph.__init__(self, *attrs, **kwargs)
+
+        if file is not None:
+            reader = OWLReader(file)
+        elif content is not None:
+            reader = OWLReader(BytesIO(content if isinstance(content, bytes) else content.encode('utf-8')))
+        else:
+            raise ValueError('Missing data source (file/content)')
+
+        for item in reader:
+            if item[0] == OWL_NODE:
+                _, node, node_type = item
+                self.add_node(node, type=node_type)
+            else:
+                _, child, parent, relation = item
+                self.add_edge(child, parent, type=relation)
+
+        self.graph['IRI'] = reader.iri
 
     @property
     def iri(self):
         return self.graph['IRI']
 
     def has_iri(self, attribs):
-        return any(key in {IRI, AIRI} for key in attribs)
+        return has_iri(attribs)
 
     def strip_iri(self, iri):
-        return iri.lstrip(self.graph[IRI]).lstrip('#').strip()
+        return strip_iri(iri, self.graph[IRI])
 
     def strip_airi(self, airi):
-        l, r = airi.split(':')
-        return r
+        return strip_airi(airi)
 
     def get_iri(self, attribs):
-        if IRI in attribs:
-            return self.strip_iri(attribs[IRI])
-        elif AIRI in attribs:
-            return self.strip_airi(attribs[AIRI])
+        return get_iri(attribs, self.graph[IRI])
 
 
-def parse_owl(url):
+def iter_closure(graph):
+    """Iterates over the transitive closure of an ontology's graph. Since its edges point from a term to its parent,
+    the terms reachable from a term are its ancestors.
+
+    :param graph: A graph from :func:`parse_owl`
+    :type graph: networkx.DiGraph
+    :return: An iterator over (descendant, ancestor, depth) triples, where depth is the length of the shortest path
+    :rtype: iter[tuple[str,str,int]]
+    """
+    for node in graph.nodes_iter():
+        for ancestor, depth in nx.single_source_shortest_path_length(graph, node).items():
+            if ancestor != node:
+                yield node, ancestor, depth
+
+
+def open_owl(url, http_cache=None):
+    """Opens the ontology at the given URL as a binary file-like object, for reading it incrementally
+
+    :param url: The location of the ontology
+    :type url: str
+    :param http_cache: The cache of downloaded files. Defaults to one in :data:`pybel.constants.PYBEL_HTTP_CACHE_DIR`
+    :type http_cache: pybel.utils.HTTPCache
+    """
+    http_cache = HTTPCache() if http_cache is None else http_cache
+    return http_cache.open(url)
+
+
+def iter_owl(url, http_cache=None):
+    """Iterates over the terms and relations of the ontology at the given URL like :class:`OWLReader`, without
+    building a graph. Documents that aren't OWL/XML are read with :func:`parse_owl_rdf` instead.
+
+    :param url: The location of the ontology
+    :type url: str
+    :param http_cache: The cache of downloaded files. Defaults to one in :data:`pybel.constants.PYBEL_HTTP_CACHE_DIR`
+    :type http_cache: pybel.utils.HTTPCache
+    :rtype: iter[tuple]
+    """
     try:
-        return parse_owl_pybel(url)
-    except:
+        with open_owl(url, http_cache=http_cache) as f:
+            for item in OWLReader(f):
+                yield item
+    except OWLFormatError:  # only raised before the first item
+        graph = parse_owl_rdf(url)
+
+        for node, data in graph.nodes_iter(data=True):
+            yield OWL_NODE, node, data.get('type')
+
+        for u, v, data in graph.edges_iter(data=True):
+            yield OWL_EDGE, u, v, data.get('type')
+
+
+def parse_owl(url, http_cache=None):
+    """Parses the ontology at the given URL into a graph with :func:`parse_owl_pybel`, or with
+    :func:`parse_owl_rdf` if it isn't OWL/XML
+
+    :param url: The location of the ontology
+    :type url: str
+    :param http_cache: The cache of downloaded files. Defaults to one in :data:`pybel.constants.PYBEL_HTTP_CACHE_DIR`
+    :type http_cache: pybel.utils.HTTPCache
+    :rtype: networkx.DiGraph
+    """
+    try:
+        return parse_owl_pybel(url, http_cache=http_cache)
+    except OWLFormatError:
         return parse_owl_rdf(url)
 
 
-def parse_owl_pybel(url):
-    session = requests.Session()
-    session.mount('file://', FileAdapter())
-    res = session.get(url)
-    owl = OWLParser(content=res.content)
+def parse_owl_pybel(url, http_cache=None):
+    with open_owl(url, http_cache=http_cache) as f:
+        owl = OWLParser(file=f)
     return owl
 
 
@@ -188,3 +344,19 @@ def extract_shared_optional(config, definition_header='Namespace'):
         x['citation_published'] = parse_datetime(config['Citation']['PublishedDate'])
 
     return x
+
+
+def iter_chunks(iterable, chunk_size):
+    """Splits an iterable into lists of the given size
+
+    :param iterable: An iterable
+    :param chunk_size: The maximum size of each list
+    :type chunk_size: int
+    :rtype: iter[list]
+    """
+    it = iter(iterable)
+    chunk = list(itt.islice(it, chunk_size))
+
+    while chunk:
+        yield chunk
+        chunk = list(itt.islice(it, chunk_size))
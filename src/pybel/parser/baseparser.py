@@ -5,12 +5,15 @@ import logging
 import time
 
 from pyparsing import Suppress, ZeroOrMore, oneOf, White, dblQuotedString, removeQuotes, Word, alphanums, \
-    delimitedList, replaceWith, Group, And
+    delimitedList, replaceWith, Group, And, ParserElement
 
 from ..constants import SUBJECT, RELATION, OBJECT
 
 log = logging.getLogger(__name__)
 
+#: The default number of results kept in PyParsing's packrat cache
+PACKRAT_CACHE_SIZE = 128
+
 W = Suppress(ZeroOrMore(White()))
 C = Suppress(',')
 WCW = W + C + W
@@ -48,6 +51,42 @@ def one_of_tags(tags, canonical_tag, identifier):
     return oneOf(tags).setParseAction(replaceWith(canonical_tag)).setResultsName(identifier)
 
 
+#: The cache size packrat parsing was enabled with by :func:`enable_packrat`, or 0 if it isn't enabled
+_packrat_cache_size = 0
+
+
+def enable_packrat(cache_size=PACKRAT_CACHE_SIZE):
+    """Enables PyParsing's packrat mode, which memoizes the results of each parser element at each location so nested
+    terms aren't parsed over and over while backtracking. The cache is cleared at the beginning of each statement.
+
+    This is the switch for packrat parsing in PyBEL. It's a global setting for PyParsing, so it applies to every
+    parser in this process from then on and can't be turned back off. Call it once, before parsing. The worker
+    processes of parallel parsing enable it too.
+
+    :param cache_size: The maximum number of results to keep in the cache. If None, the cache is unbounded.
+    :type cache_size: int
+    """
+    global _packrat_cache_size
+
+    if ParserElement._packratEnabled:
+        if cache_size != _packrat_cache_size:
+            log.warning('Packrat parsing is already enabled. Ignoring cache size: %s', cache_size)
+        return
+
+    log.info('Enabling packrat parsing with cache size: %s', cache_size)
+    ParserElement.enablePackrat(cache_size)
+    _packrat_cache_size = cache_size
+
+
+def get_packrat_cache_size():
+    """Gets the cache size packrat parsing was enabled with by :func:`enable_packrat`
+
+    :return: The cache size, None if it's unbounded, or 0 if packrat parsing isn't enabled
+    :rtype: int or None
+    """
+    return _packrat_cache_size
+
+
 def triple(subject, relation, obj):
     return And([Group(subject)(SUBJECT), relation(RELATION), Group(obj)(OBJECT)])
 
@@ -8,6 +8,7 @@ This module handles parsing BEL relations and validation of semantics.
 
 import itertools as itt
 import logging
+import re
 from copy import deepcopy
 
 from pyparsing import Suppress, delimitedList, oneOf, Optional, Group, replaceWith, MatchFirst
@@ -45,11 +46,78 @@ degradation_tags = one_of_tags(['deg', 'degradation'], DEGRADATION, MODIFIER)
 reaction_tags = one_of_tags(['reaction', 'rxn'], REACTION, FUNCTION)
 molecular_activity_tags = Suppress(oneOf(['ma', 'molecularActivity']))
 
+#: The tags of the functions with only an identifier that are handled by :meth:`BelParser.parse_simple_relation`
+simple_function_labels = {
+    'a': ABUNDANCE,
+    'abundance': ABUNDANCE,
+    'g': GENE,
+    'geneAbundance': GENE,
+    'm': MIRNA,
+    'microRNAAbundance': MIRNA,
+    'p': PROTEIN,
+    'proteinAbundance': PROTEIN,
+    'r': RNA,
+    'rnaAbundance': RNA,
+    'complex': COMPLEX,
+    'complexAbundance': COMPLEX,
+    'bp': BIOPROCESS,
+    'biologicalProcess': BIOPROCESS,
+    'o': PATHOLOGY,
+    'path': PATHOLOGY,
+    'pathology': PATHOLOGY,
+}
+
+#: The tags of the BEL term to BEL term relations that are handled by :meth:`BelParser.parse_simple_relation`
+simple_relation_labels = {
+    '->': pbc.INCREASES,
+    '→': pbc.INCREASES,
+    'increases': pbc.INCREASES,
+    '=>': pbc.DIRECTLY_INCREASES,
+    '⇒': pbc.DIRECTLY_INCREASES,
+    'directlyIncreases': pbc.DIRECTLY_INCREASES,
+    '-|': pbc.DECREASES,
+    'decreases': pbc.DECREASES,
+    '=|': pbc.DIRECTLY_DECREASES,
+    'directlyDecreases': pbc.DIRECTLY_DECREASES,
+    'analogousTo': 'analogousTo',
+    'cnc': pbc.CAUSES_NO_CHANGE,
+    'causesNoChange': pbc.CAUSES_NO_CHANGE,
+    'reg': 'regulates',
+    'regulates': 'regulates',
+    'neg': pbc.NEGATIVE_CORRELATION,
+    'negativeCorrelation': pbc.NEGATIVE_CORRELATION,
+    'pos': pbc.POSITIVE_CORRELATION,
+    'positiveCorrelation': pbc.POSITIVE_CORRELATION,
+    '--': 'association',
+    'association': 'association',
+    'orthologous': 'orthologous',
+    'isA': 'isA',
+    'eq': EQUIVALENT_TO,
+    EQUIVALENT_TO: EQUIVALENT_TO,
+}
+
+
+def _build_simple_term_re(prefix):
+    """Builds a regular expression for a function with only a namespace and name, like :code:`p(HGNC:AKT1)`. Quoted
+    names can't contain escapes, so they're the same before and after removing the quotes."""
+    return (
+        r'(?P<{0}_function>[A-Za-z]+)[ \t]*\([ \t]*(?P<{0}_namespace>[A-Za-z0-9]+)[ \t]*:[ \t]*'
+        r'(?:(?P<{0}_name>[A-Za-z0-9]+)|"(?P<{0}_quoted_name>[^"\\\n\r]*)")[ \t]*\)'
+    ).format(prefix)
+
+
+re_simple_relation = re.compile('{}[ \t]*(?P<relation>{})[ \t]*{}$'.format(
+    _build_simple_term_re(SUBJECT),
+    '|'.join(re.escape(tag) for tag in sorted(simple_relation_labels, key=len, reverse=True)),
+    _build_simple_term_re(OBJECT)
+))
+
 
 class BelParser(BaseParser):
     def __init__(self, graph, namespace_dicts=None, namespace_mappings=None, annotation_dicts=None,
                  namespace_expressions=None, annotation_expressions=None, complete_origin=False,
-                 allow_naked_names=False, allow_nested=False, citation_clearing=True, autostreamline=False):
+                 allow_naked_names=False, allow_nested=False, citation_clearing=True, autostreamline=False,
+                 fast_path=False):
         """Build a parser backed by a given dictionary of namespaces
 
         :param graph: The BEL Graph to use to store the network
@@ -80,11 +148,15 @@ class BelParser(BaseParser):
         :param citation_clearing: Should :code:`SET Citation` statements clear evidence and all annotations?
                                     Delegated to :class:`pybel.parser.ControlParser`
         :type citation_clearing: bool
+        :param fast_path: If true, :meth:`parseString` handles relations between simple terms with
+                          :meth:`parse_simple_relation` before falling back to the full grammar
+        :type fast_path: bool
         """
 
         self.graph = graph
         self.allow_nested = allow_nested
         self.complete_origin = complete_origin
+        self.fast_path = fast_path
 
         self.control_parser = ControlParser(
             annotation_dicts=annotation_dicts,
@@ -426,6 +498,116 @@ class BelParser(BaseParser):
 
         BaseParser.__init__(self, self.language, streamline=autostreamline)
 
+    def reset(self, graph, namespace_dicts=None, annotation_dicts=None, namespace_expressions=None,
+              annotation_expressions=None, complete_origin=False, allow_naked_names=False, allow_nested=False,
+              citation_clearing=True):
+        """Prepares this parser for another document without rebuilding its grammar. The parameters are the same
+        as for :class:`BelParser`, and the control parser's citation, evidence, and annotations are cleared.
+
+        :param graph: The BEL Graph to use to store the network
+        :type graph: BELGraph
+        :param namespace_dicts: A dictionary of {namespace: set of members}
+        :type namespace_dicts: dict
+        :param annotation_dicts: A dictionary of {annotation: set of values}
+        :type annotation_dicts: dict
+        :param namespace_expressions: A dictionary of {namespace: regular expression strings}
+        :type namespace_expressions: dict
+        :param annotation_expressions: A dictionary of {annotation: regular expression strings}
+        :type annotation_expressions: dict
+        :param complete_origin: If true, infer the RNA and Gene origins of unmodified proteins
+        :type complete_origin: bool
+        :param allow_naked_names: If true, turn off naked namespace failures
+        :type allow_naked_names: bool
+        :param allow_nested: If true, turn off nested statement failures
+        :type allow_nested: bool
+        :param citation_clearing: Should :code:`SET Citation` statements clear evidence and all annotations?
+        :type citation_clearing: bool
+        """
+        self.graph = graph
+        self.allow_nested = allow_nested
+        self.complete_origin = complete_origin
+
+        self.control_parser.reset(
+            annotation_dicts=annotation_dicts,
+            annotation_expressions=annotation_expressions,
+            citation_clearing=citation_clearing
+        )
+
+        self.identifier_parser.reset(
+            namespace_dicts=namespace_dicts,
+            namespace_expressions=namespace_expressions,
+            allow_naked_names=allow_naked_names
+        )
+
+    def parseString(self, s):
+        """Parses a string with the language represented by this parser. If the fast path is enabled and the
+        string is a relation between simple terms, returns a dictionary of the tokens instead of the PyParsing results
+
+        :param s: input string
+        :type s: str
+        """
+        if self.fast_path:
+            tokens = self.parse_simple_relation(s)
+
+            if tokens is not None:
+                return tokens
+
+        return self.language.parseString(s)
+
+    def parse_simple_relation(self, s):
+        """Handles a relation between two terms that only have a function, namespace, and name, like
+        :code:`p(HGNC:AKT1) -> p(HGNC:EGFR)`, without using the PyParsing grammar. The terms are validated and added
+        to the graph in the same order as in the full grammar, so the results are identical.
+
+        :param s: input string
+        :type s: str
+        :return: The tokens, as they are given to :meth:`handle_relation`, or None if the string isn't a relation
+                 between simple terms
+        :rtype: dict or None
+        """
+        match = re_simple_relation.match(s)
+
+        if match is None:
+            return
+
+        subject_function = simple_function_labels.get(match.group('subject_function'))
+        object_function = simple_function_labels.get(match.group('object_function'))
+
+        if subject_function is None or object_function is None:
+            return
+
+        subject_tokens = self._handle_simple_term(s, match, SUBJECT, subject_function)
+        object_tokens = self._handle_simple_term(s, match, OBJECT, object_function)
+
+        tokens = {
+            SUBJECT: subject_tokens,
+            RELATION: simple_relation_labels[match.group('relation')],
+            OBJECT: object_tokens
+        }
+
+        return self.handle_relation(s, 0, tokens)
+
+    def _handle_simple_term(self, s, match, prefix, function):
+        name = match.group('{}_name'.format(prefix))
+
+        identifier = {
+            NAMESPACE: match.group('{}_namespace'.format(prefix)),
+            NAME: name if name is not None else match.group('{}_quoted_name'.format(prefix))
+        }
+
+        if self.namespace_dict is not None:
+            self.identifier_parser.handle_identifier_qualified(s, 0, identifier)
+
+        tokens = {
+            FUNCTION: function,
+            IDENTIFIER: identifier
+        }
+
+        self.check_function_semantics(s, 0, tokens)
+        self.ensure_node(tokens)
+
+        return tokens
+
     @property
     def namespace_dict(self):
         return self.identifier_parser.namespace_dict
@@ -36,17 +36,15 @@ class ControlParser(BaseParser):
         :type citation_clearing: bool
         """
 
-        self.citation_clearing = citation_clearing
-
-        self.valid_annotations = {} if annotation_dicts is None else annotation_dicts
-        self.annotations_re = {} if annotation_expressions is None else annotation_expressions
-        self.annotations_re_compiled = {k: re.compile(v) for k, v in self.annotations_re.items()}
-
-        self.statement_group = None
         self.citation = {}
-        self.evidence = None
         self.annotations = {}
 
+        self.reset(
+            annotation_dicts=annotation_dicts,
+            annotation_expressions=annotation_expressions,
+            citation_clearing=citation_clearing
+        )
+
         annotation_key = ppc.identifier('key').setParseAction(self.handle_annotation_key)
 
         self.set_statement_group = And([Suppress(BEL_KEYWORD_STATEMENT_GROUP), Suppress('='), quote('group')])
@@ -108,6 +106,25 @@ class ControlParser(BaseParser):
 
         BaseParser.__init__(self, self.language)
 
+    def reset(self, annotation_dicts=None, annotation_expressions=None, citation_clearing=True):
+        """Sets new annotation definitions and clears the statement group, citation, evidence, and annotations, so
+        the grammar can be reused for another document
+
+        :param annotation_dicts: A dictionary of {annotation: set of valid values} for parsing
+        :type annotation_dicts: dict
+        :param annotation_expressions: A dictionary of {annotation: regular expression string}
+        :type annotation_expressions: dict
+        :param citation_clearing: Should :code:`SET Citation` statements clear evidence and all annotations?
+        :type citation_clearing: bool
+        """
+        self.citation_clearing = citation_clearing
+
+        self.valid_annotations = {} if annotation_dicts is None else annotation_dicts
+        self.annotations_re = {} if annotation_expressions is None else annotation_expressions
+        self.annotations_re_compiled = {k: re.compile(v) for k, v in self.annotations_re.items()}
+
+        self.clear()
+
     def validate_annotation_key(self, key):
         if key not in self.valid_annotations and key not in self.annotations_re_compiled:
             raise UndefinedAnnotationWarning(key)
@@ -30,18 +30,45 @@ class IdentifierParser(BaseParser):
         :type allow_naked_names: bool
         """
 
+        if namespace_mappings is not None:
+            # TODO implement
+            raise NotImplementedError('Mapping not yet implemented')
+
+        self.identifier_qualified = word(NAMESPACE) + Suppress(':') + (word | quote)(NAME)
+        self.identifier_bare = (word | quote)(NAME)
+
+        self.reset(
+            namespace_dicts=namespace_dicts,
+            default_namespace=default_namespace,
+            namespace_expressions=namespace_expressions,
+            allow_naked_names=allow_naked_names
+        )
+
+        BaseParser.__init__(self, self.identifier_qualified | self.identifier_bare)
+
+    def reset(self, namespace_dicts=None, default_namespace=None, namespace_expressions=None,
+              allow_naked_names=False):
+        """Sets new namespace definitions and updates the parse actions of the already built grammar
+
+        :param namespace_dicts: dictionary of {namespace: set of names}
+        :type namespace_dicts: dict
+        :param default_namespace: set of strings that can be used without a namespace
+        :type default_namespace: set of str
+        :param namespace_expressions: dictionary of {namespace: regular expression string} to compile
+        :type namespace_expressions: dict
+        :param allow_naked_names: if true, turn off naked namespace failures
+        :type allow_naked_names: bool
+        """
         self.namespace_dict = namespace_dicts
         self.namespace_regex = {} if namespace_expressions is None else namespace_expressions
         self.namespace_regex_compiled = {k: re.compile(v) for k, v in self.namespace_regex.items()}
         self.default_namespace = set(default_namespace) if default_namespace is not None else None
         self.allow_naked_names = allow_naked_names
 
-        self.identifier_qualified = word(NAMESPACE) + Suppress(':') + (word | quote)(NAME)
-
         if self.namespace_dict is not None:
             self.identifier_qualified.setParseAction(self.handle_identifier_qualified)
-
-        self.identifier_bare = (word | quote)(NAME)
+        else:
+            self.identifier_qualified.setParseAction()
 
         if self.default_namespace is not None:
             self.identifier_bare.setParseAction(self.handle_identifier_default)
@@ -50,12 +77,6 @@ class IdentifierParser(BaseParser):
         else:
             self.identifier_bare.setParseAction(handle_namespace_invalid)
 
-        if namespace_mappings is not None:
-            # TODO implement
-            raise NotImplementedError('Mapping not yet implemented')
-
-        BaseParser.__init__(self, self.identifier_qualified | self.identifier_bare)
-
     def handle_identifier_qualified(self, s, l, tokens):
         namespace = tokens[NAMESPACE]
 
@@ -8,7 +8,7 @@ This module supports the relation parser by handling statements.
 
 import logging
 
-from pyparsing import Suppress, And, Word, Optional, MatchFirst
+from pyparsing import Suppress, And, Word, Optional, MatchFirst, ParseException
 from pyparsing import pyparsing_common as ppc
 
 from . import language
@@ -107,6 +107,29 @@ class MetadataParser(BaseParser):
 
         BaseParser.__init__(self, self.language)
 
+    def prefetch(self, lines):
+        """Downloads the namespace and annotation files defined by URL in the given lines at the same time, before
+        the lines are parsed one at a time. See :meth:`pybel.manager.cache.CacheManager.prefetch`
+
+        :param lines: An iterable over lines from the definitions section of a BEL script
+        :type lines: iter[str]
+        """
+        # copies of the grammar without parse actions, so nothing is downloaded or defined one at a time
+        namespace_url = self.namespace_url.copy().setParseAction()
+        annotation_url = self.annotation_url.copy().setParseAction()
+
+        namespace_urls, annotation_urls = [], []
+
+        for line in lines:
+            for grammar, urls in ((namespace_url, namespace_urls), (annotation_url, annotation_urls)):
+                try:
+                    urls.append(grammar.parseString(line)['url'])
+                except ParseException:
+                    continue
+                break
+
+        self.cache_manager.prefetch(namespace_urls=namespace_urls, annotation_urls=annotation_urls)
+
     def handle_document(self, s, l, tokens):
         key = tokens['key']
         value = tokens['value']
@@ -8,6 +8,12 @@ log = logging.getLogger('pybel')
 
 re_match_bel_header = re.compile("(SET\s+DOCUMENT|DEFINE\s+NAMESPACE|DEFINE\s+ANNOTATION)")
 
+#: Matches only well-formed :code:`SET Citation` statements, which always reset the control parser's state
+re_match_set_citation = re.compile(r'SET[ \t]*Citation[ \t]*=[ \t]*\{[ \t]*"[^"\n\r\\]*"'
+                                   r'(?:[ \t]*,[ \t]*"[^"\n\r\\]*")*[ \t]*\}')
+#: Matches statements that always close the current statement group
+re_match_unset_statement_group = re.compile(r'UNSET[ \t]*(STATEMENT_GROUP|ALL)[ \t]*$')
+
 
 def sanitize_file_lines(f):
     """Enumerates a line iterator and returns the pairs of (line number, line) that are cleaned"""
@@ -60,6 +66,86 @@ def split_file_to_annotations_and_definitions(file):
     return documents, definitions, statements
 
 
+def split_file_to_annotations_and_definitions_lazy(file):
+    """Enumerates a line iterable and splits into 3 parts without reading the whole file into memory.
+
+    The document and definitions sections are read up to the first line that is not a :code:`SET DOCUMENT`,
+    :code:`DEFINE NAMESPACE`, or :code:`DEFINE ANNOTATION` statement. The rest of the file is returned as an iterator
+    over the statements, so they can be parsed while the file is still being read. The iterator raises a
+    :class:`ValueError` if it reaches another of these statements.
+
+    :param file: An iterable over the lines of a BEL script
+    :type file: iter[str]
+    :return: A triple of the document lines, the definitions lines, and an iterator over the statement lines. Each
+             line is a pair of (line number, line)
+    :rtype: tuple[list,list,iter]
+    """
+    content = sanitize_file_lines(file)
+    header = []
+
+    for line_number, line in content:
+        if not re_match_bel_header.match(line):
+            content = itt.chain([(line_number, line)], content)
+            break
+
+        header.append((line_number, line))
+
+    end_document_section = 0
+    for j, (i, l) in enumerate(header, start=1):
+        if l.startswith('SET DOCUMENT'):
+            end_document_section = j
+
+    log.info('Header length: %d lines', len(header))
+    documents = header[:end_document_section]
+    definitions = header[end_document_section:]
+    statements = _check_statements(content)
+
+    return documents, definitions, statements
+
+
+def _check_statements(statements):
+    """Passes through an iterable of (line number, line) pairs, stopping at definitions after the header
+
+    :raises ValueError: if a :code:`SET DOCUMENT`, :code:`DEFINE NAMESPACE`, or :code:`DEFINE ANNOTATION` statement
+                        comes after the first statement, since the statements before it have already been parsed
+    """
+    for line_number, line in statements:
+        if re_match_bel_header.match(line):
+            raise ValueError('Line {:07d} - Definition after the first statement: {}. Move it to the top of the '
+                             'document.'.format(line_number, line))
+
+        yield line_number, line
+
+
+def split_statements_by_citation(statements, chunk_size):
+    """Groups an iterable of (line number, line) pairs into lists that each begin at a :code:`SET Citation` statement,
+    except for the first. Since setting the citation clears the evidence and annotations, each chunk can be parsed
+    independently, as long as citation clearing is enabled. Chunks are never split inside of a statement group.
+
+    :param statements: An iterable over pairs of (line number, line)
+    :type statements: iter[tuple]
+    :param chunk_size: The minimum number of lines in each chunk before it is split at the next citation
+    :type chunk_size: int
+    :rtype: iter[list[tuple]]
+    """
+    chunk = []
+    in_statement_group = False
+
+    for line_number, line in statements:
+        if re_match_unset_statement_group.match(line):
+            in_statement_group = False
+        elif 'STATEMENT_GROUP' in line:
+            in_statement_group = True
+        elif chunk_size <= len(chunk) and not in_statement_group and re_match_set_citation.match(line):
+            yield chunk
+            chunk = []
+
+        chunk.append((line_number, line))
+
+    if chunk:
+        yield chunk
+
+
 def check_stability(ns_dict, ns_mapping):
     """Check the stability of namespace mapping
 
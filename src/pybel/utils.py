@@ -1,51 +1,402 @@
 # -*- coding: utf-8 -*-
 
+import errno
+import hashlib
+import json
 import logging
+import os
+import tempfile
 from collections import defaultdict, MutableMapping
+from contextlib import contextmanager
 from configparser import ConfigParser
 
 import networkx as nx
 import requests
 from requests_file import FileAdapter
 
+from .constants import PYBEL_HTTP_CACHE_DIR
+
+try:
+    from os import replace as replace_file
+except ImportError:
+    from os import rename as replace_file
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
 log = logging.getLogger('pybel')
 
+#: The number of bytes written at a time when storing a response in the :class:`HTTPCache`
+HTTP_CACHE_CHUNK_SIZE = 2 ** 16
+
+
+def ensure_directory(directory):
+    """Makes a directory and its parents if they don't exist yet. Other processes can make it at the same time.
+
+    :param directory: The path of the directory
+    :type directory: str
+    """
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST or not os.path.isdir(directory):
+            raise
+
+
+def get_session(pool_size=None):
+    """Builds a session for downloading BEL resources that can also read :code:`file://` URLs
+
+    :param pool_size: The number of connections to keep open to each host, for sharing the session between threads.
+                      Defaults to the :mod:`requests` default.
+    :type pool_size: int
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    session.mount('file://', FileAdapter())
+
+    if pool_size is not None:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
 
-def download_url(url):
+    return session
+
+
+class HTTPCache(object):
+    """Stores downloaded files on disk along with their :code:`ETag` and :code:`Last-Modified` headers. Later
+    downloads of the same URL are conditional requests, so the file is only transferred again if it changed on the
+    server. Responses without either header and URLs that don't use HTTP aren't stored.
+
+    Each file is stored with its headers on the first line, so the headers always match the content even if several
+    processes store the same URL at once.
+    """
+
+    def __init__(self, directory=None):
+        """
+        :param directory: The directory for the stored files. Defaults to :data:`pybel.constants.PYBEL_HTTP_CACHE_DIR`
+        :type directory: str
+        """
+        self.directory = PYBEL_HTTP_CACHE_DIR if directory is None else directory
+
+    def _get_path(self, url):
+        """Gets the path of the file stored for the given URL"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, '{}.cache'.format(key))
+
+    def get_headers(self, url):
+        """Gets the validating headers stored for the given URL
+
+        :param url: The URL of a file
+        :type url: str
+        :return: A dictionary of the stored headers, or None if the URL hasn't been stored
+        :rtype: dict or None
+        """
+        try:
+            with open(self._get_path(url), 'rb') as f:
+                return json.loads(f.readline().decode('utf-8'))
+        except (IOError, OSError):
+            return
+
+    @staticmethod
+    def _write(directory, url, response, headers):
+        """Writes a response's content with the given headers on the first line to a new file in the directory, then
+        gets its path"""
+        handle, path = tempfile.mkstemp(dir=directory)
+
+        with os.fdopen(handle, 'wb') as f:
+            f.write(json.dumps(dict(headers, url=url)).encode('utf-8'))
+            f.write(b'\n')
+
+            for chunk in response.iter_content(HTTP_CACHE_CHUNK_SIZE):
+                f.write(chunk)
+
+        return path
+
+    def _store(self, url, response):
+        """Stores the content of a response with its validating headers, then gets the path of the stored file"""
+        ensure_directory(self.directory)
+
+        headers = {
+            'ETag': response.headers.get('ETag'),
+            'Last-Modified': response.headers.get('Last-Modified'),
+        }
+
+        # written to a temporary file first so other processes never read half a file
+        path = self._write(self.directory, url, response, headers)
+        content_path = self._get_path(url)
+        replace_file(path, content_path)
+
+        return content_path
+
+    @staticmethod
+    def _open(path):
+        """Opens a file written by :meth:`_write` and skips the line with its headers"""
+        f = open(path, 'rb')
+        f.readline()
+        return f
+
+    def _request(self, url, session=None):
+        """Makes a conditional request for the URL. Gets a pair of the path of the stored file if it's unchanged or
+        was just stored, and otherwise the streaming response if it can't be stored.
+        """
+        if session is None:
+            session = get_session()
+
+        if not url.startswith(('http://', 'https://')):
+            response = session.get(url, stream=True)
+            response.raise_for_status()
+            return None, response
+
+        stored_headers = self.get_headers(url)
+        request_headers = {}
+
+        if stored_headers is not None:
+            if stored_headers['ETag']:
+                request_headers['If-None-Match'] = stored_headers['ETag']
+            if stored_headers['Last-Modified']:
+                request_headers['If-Modified-Since'] = stored_headers['Last-Modified']
+
+        response = session.get(url, headers=request_headers, stream=True)
+
+        if response.status_code == 304 and stored_headers is not None:
+            log.info('Not modified since last download: %s', url)
+            response.close()
+            return self._get_path(url), None
+
+        response.raise_for_status()
+
+        if not response.headers.get('ETag') and not response.headers.get('Last-Modified'):
+            return None, response
+
+        return self._store(url, response), None
+
+    def get(self, url, session=None):
+        """Gets the content at the given URL, using the stored copy if it hasn't changed on the server
+
+        :param url: The URL of a file
+        :type url: str
+        :param session: A session from :func:`get_session` to reuse. A new one is made if not given.
+        :type session: requests.Session
+        :rtype: bytes
+        """
+        path, response = self._request(url, session=session)
+
+        if response is not None:
+            return response.content
+
+        with self._open(path) as f:
+            return f.read()
+
+    def download(self, url, directory, session=None):
+        """Downloads the content at the given URL to a file without reading it into memory, using the stored copy if
+        it hasn't changed on the server. Content that can't be stored in this cache is written to a new file in the
+        given directory instead.
+
+        :param url: The URL of a file
+        :type url: str
+        :param directory: The directory for content that can't be stored in this cache
+        :type directory: str
+        :param session: A session from :func:`get_session` to reuse. A new one is made if not given.
+        :type session: requests.Session
+        :return: The path of the file, whose lines can be read with :meth:`iter_file_lines`
+        :rtype: str
+        """
+        path, response = self._request(url, session=session)
+
+        if response is None:
+            return path
+
+        return self._write(directory, url, response, {})
+
+    @classmethod
+    def iter_file_lines(cls, path):
+        """Iterates over the lines of the content of a file from :meth:`download`
+
+        :param path: The path of the file
+        :type path: str
+        :return: An iterator over the lines as bytes, without line endings
+        :rtype: iter[bytes]
+        """
+        with cls._open(path) as f:
+            for line in f:
+                yield line.rstrip(b'\r\n')
+
+    def iter_lines(self, url, session=None):
+        """Iterates over the lines at the given URL without reading them all into memory, using the stored copy if
+        it hasn't changed on the server
+
+        :param url: The URL of a file
+        :type url: str
+        :param session: A session from :func:`get_session` to reuse. A new one is made if not given.
+        :type session: requests.Session
+        :return: An iterator over the lines as bytes, without line endings
+        :rtype: iter[bytes]
+        """
+        path, response = self._request(url, session=session)
+
+        if response is not None:
+            for line in response.iter_lines():
+                yield line
+            return
+
+        for line in self.iter_file_lines(path):
+            yield line
+
+    @contextmanager
+    def open(self, url, session=None):
+        """Opens the content at the given URL as a binary file-like object for reading it incrementally, using the
+        stored copy if it hasn't changed on the server
+
+        :param url: The URL of a file
+        :type url: str
+        :param session: A session from :func:`get_session` to reuse. A new one is made if not given.
+        :type session: requests.Session
+        """
+        path, response = self._request(url, session=session)
+
+        if response is not None:
+            try:
+                response.raw.decode_content = True
+            except AttributeError:  # file:// URLs are read from a plain file
+                pass
+
+            try:
+                yield response.raw
+            finally:
+                response.close()
+            return
+
+        with self._open(path) as f:
+            yield f
+
+    def clear(self):
+        """Removes all stored files"""
+        if not os.path.exists(self.directory):
+            return
+
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+def download_url(url, session=None, http_cache=None):
     """Downloads and parses a config file from url
 
     :param url: the URL of a BELNS, BELANNO, or BELEQ file to download and parse
     :type url: str
+    :param session: A session from :func:`get_session` to reuse. A new one is made if not given.
+    :type session: requests.Session
+    :param http_cache: The cache to download the file through. If not given, the file isn't stored.
+    :type http_cache: HTTPCache
     """
-    session = requests.Session()
-    session.mount('file://', FileAdapter())
-    res = session.get(url)
+    if http_cache is not None:
+        return parse_definition(http_cache.get(url, session=session), url=url)
 
-    lines = [line.decode('utf-8', errors='ignore').strip() for line in res.iter_lines()]
+    session = get_session() if session is None else session
+    response = session.get(url)
+    response.raise_for_status()
+
+    return parse_definition(response.content, url=url)
+
+
+def iter_url_lines(url, session=None):
+    """Iterates over the lines at the given URL as they're downloaded, without storing them
+
+    :param url: The URL of a file
+    :type url: str
+    :param session: A session from :func:`get_session` to reuse. A new one is made if not given.
+    :type session: requests.Session
+    :return: An iterator over the lines as bytes, without line endings
+    :rtype: iter[bytes]
+    """
+    session = get_session() if session is None else session
+    response = session.get(url, stream=True)
+    response.raise_for_status()
 
-    value_line = 1 + max(i for i, line in enumerate(lines) if '[Values]' == line.strip())
+    try:
+        for line in response.iter_lines():
+            yield line
+    finally:
+        response.close()
+
+
+def parse_definition(content, url=None):
+    """Parses the content of a BELNS, BELANNO, or BELEQ file
+
+    :param content: The content of the file
+    :type content: bytes
+    :param url: The location of the file, for error messages
+    :type url: str
+    :return: A dictionary of the sections of the header, with the values in the :code:`Values` section
+    :rtype: dict
+    """
+    res, values = parse_definition_lines(content.splitlines(), url=url)
+    res['Values'] = dict(values)
+
+    if not res['Values']:
+        raise ValueError('Downloaded empty file: {}'.format(url))
+
+    return res
+
+
+def parse_definition_lines(lines, url=None):
+    """Parses a BELNS, BELANNO, or BELEQ file from its lines. Only the header is read right away, and the values are
+    parsed as they're iterated over, so the whole file is never in memory.
+
+    :param lines: An iterable over the lines of the file, as bytes or strings
+    :type lines: iter
+    :param url: The location of the file, for error messages
+    :type url: str
+    :return: A pair of a dictionary of the sections of the header and an iterator over the (name, value) pairs in the
+             :code:`Values` section. The value is None for names without one.
+    :rtype: tuple[dict,iter[tuple[str,str]]]
+    """
+    lines = iter(lines)
+    header = []
+
+    for line in lines:
+        line = _decode_line(line)
+
+        if line == '[Values]':
+            break
+
+        header.append(line)
+    else:
+        raise ValueError('Missing [Values] section: {}'.format(url))
 
     metadata_config = ConfigParser(strict=False)
     metadata_config.optionxform = lambda option: option
-    metadata_config.read_file(lines[:value_line])
+    metadata_config.read_file(header)
 
     delimiter = metadata_config['Processing']['DelimiterString']
 
-    value_dict = {}
-    for line in lines[value_line:]:
-        sline = line.rsplit(delimiter, 1)
-        key = sline[0].strip()
+    return {k: dict(v) for k, v in metadata_config.items()}, _iter_definition_values(lines, delimiter)
 
-        value_dict[key] = sline[1].strip() if len(sline) == 2 else None
 
-    if not value_dict:
-        raise ValueError('Downloaded empty file: {}'.format(url))
+def _decode_line(line):
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='ignore')
+    return line.strip()
 
-    res = {}
-    res.update({k: dict(v) for k, v in metadata_config.items()})
-    res['Values'] = value_dict
 
-    return res
+def _iter_definition_values(lines, delimiter):
+    """Parses the (name, value) pairs from the lines in the Values section of a BELNS, BELANNO, or BELEQ file"""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='ignore')
+
+        key, found, value = line.rpartition(delimiter)
+
+        if not found:
+            key, value = value, None
+        else:
+            value = value.strip()
+
+        key = key.strip()
+
+        if key:
+            yield key, value
 
 
 def expand_dict(flat_dict, sep='_'):
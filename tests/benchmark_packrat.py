@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""Compares the time to parse BEL with and without PyParsing's packrat mode. Run it from the root of the repository
+with :code:`python -m tests.benchmark_packrat`.
+
+Packrat mode can't be turned off once it's enabled with :func:`pybel.parser.baseparser.enable_packrat`, so
+everything is parsed without it first.
+"""
+
+from __future__ import print_function
+
+import logging
+import time
+
+import pybel
+from pybel import BELGraph
+from pybel.constructors import build_bel_parser
+from pybel.parser.baseparser import enable_packrat
+from tests.constants import mock_bel_resources, test_bel_thorough, test_bel_slushy, test_bel_simple, \
+    SET_CITATION_TEST, test_set_evidence
+
+log = logging.getLogger(__name__)
+
+#: The number of times each document is parsed. The fastest time is reported.
+REPEATS = 5
+
+#: Statements with deeply nested terms, which PyParsing has to backtrack through many times
+nested_statements = [
+    SET_CITATION_TEST,
+    test_set_evidence,
+    'complex(p(HGNC:AKT1), p(HGNC:EGFR), p(HGNC:MAPT)) -> act(complex(p(HGNC:AKT1), p(HGNC:CFTR)), ma(kin))',
+    'rxn(reactants(a(CHEBI:superoxide), complex(p(HGNC:AKT1), p(HGNC:EGFR))), products(a(CHEBI:"hydrogen peroxide"), '
+    'a(CHEBI:oxygen))) -| tloc(p(HGNC:EGFR), fromLoc(GOCC:intracellular), toLoc(GOCC:"cell surface"))',
+    'composite(p(HGNC:IL6), complex(p(HGNC:AKT1), p(HGNC:EGFR)), a(CHEBI:lipopolysaccharide)) -> '
+    'bp(GOBP:"cell death")',
+    'act(p(HGNC:AKT1, pmod(Ph, Ser, 473)), ma(kin)) => deg(p(HGNC:MAPT, pmod(Ph), var(p.Gly12Val)))',
+    'sec(complex(p(HGNC:AKT1), p(HGNC:EGFR, pmod(Ph)))) -- surf(complex(p(HGNC:IL6), p(HGNC:IL6R)))',
+] * 20
+
+
+def time_function(f):
+    times = []
+    for _ in range(REPEATS):
+        t = time.time()
+        f()
+        times.append(time.time() - t)
+    return min(times)
+
+
+def parse_nested():
+    graph = BELGraph()
+    parser = build_bel_parser(graph)
+    graph.parse_statements(enumerate(nested_statements, start=1), parser)
+
+
+@mock_bel_resources
+def run(mock):
+    benchmarks = [
+        ('test_bel.bel', lambda: pybel.from_path(test_bel_simple)),
+        ('thorough.bel', lambda: pybel.from_path(test_bel_thorough, allow_nested=True)),
+        ('slushy.bel', lambda: pybel.from_path(test_bel_slushy)),
+        ('nested statements', parse_nested),
+    ]
+
+    results = []
+
+    for packrat in (False, True):
+        if packrat:
+            enable_packrat()
+
+        for name, f in benchmarks:
+            results.append((name, packrat, time_function(f)))
+
+    times = {(name, packrat): t for name, packrat, t in results}
+
+    print('{:<20}{:>12}{:>12}{:>10}'.format('Document', 'Default (s)', 'Packrat (s)', 'Speedup'))
+    for name, _ in benchmarks:
+        default_time, packrat_time = times[name, False], times[name, True]
+        print('{:<20}{:>12.3f}{:>12.3f}{:>9.2f}x'.format(name, default_time, packrat_time, default_time / packrat_time))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.CRITICAL)
+    run()
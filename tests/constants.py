@@ -10,11 +10,16 @@ from requests.compat import urlparse
 
 from pybel import BELGraph
 from pybel.constants import *
-from pybel.manager.utils import urldefrag, OWLParser
+from pybel.manager.utils import urldefrag
 from pybel.parser.parse_bel import BelParser
 from pybel.parser.parse_exceptions import *
 from pybel.parser.utils import any_subdict_matches
 
+try:
+    from urllib.request import url2pathname
+except ImportError:
+    from urllib import url2pathname
+
 try:
     from unittest import mock
 except ImportError:
@@ -196,7 +201,9 @@ class MockResponse:
     def __init__(self, mock_url):
         name = get_uri_name(mock_url)
 
-        if mock_url.endswith('.belns'):
+        if mock_url.startswith('file://'):
+            self.path = url2pathname(urlparse(mock_url).path)
+        elif mock_url.endswith('.belns'):
             self.path = os.path.join(belns_dir_path, name)
         elif mock_url.endswith('.belanno'):
             self.path = os.path.join(belanno_dir_path, name)
@@ -212,11 +219,30 @@ class MockResponse:
         if not os.path.exists(self.path):
             raise ValueError("file doesn't exist: {}".format(self.path))
 
+    status_code = 200
+    headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+    @property
+    def content(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
     def iter_lines(self):
         with open(self.path, 'rb') as f:
             for line in f:
                 yield line
 
+    def iter_content(self, chunk_size=1):
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                yield chunk
+
 
 class MockSession:
     """Patches the session object so requests can be redirected through the filesystem without rewriting BEL files"""
@@ -228,7 +254,7 @@ class MockSession:
         pass
 
     @staticmethod
-    def get(url):
+    def get(url, **kwargs):
         return MockResponse(url)
 
 
@@ -248,16 +274,16 @@ def help_check_hgnc(self, namespace_dict):
     self.assertEqual(set('GRP'), set(namespace_dict[HGNC_KEYWORD]['MIA']))
 
 
-def parse_owl_pybel_resolver(iri):
+def open_owl_resolver(iri, http_cache=None):
     path = os.path.join(owl_dir_path, get_uri_name(iri))
 
     if not os.path.exists(path) and '.' not in path:
         path = '{}.owl'.format(path)
 
-    return OWLParser(file=path)
+    return open(path, 'rb')
 
 
-mock_parse_owl_pybel = mock.patch('pybel.manager.utils.parse_owl_pybel', side_effect=parse_owl_pybel_resolver)
+mock_parse_owl_pybel = mock.patch('pybel.manager.utils.open_owl', side_effect=open_owl_resolver)
 
 
 def parse_owl_rdf_resolver(iri):
@@ -10,7 +10,7 @@ from click.testing import CliRunner
 
 from pybel import cli
 from pybel.constants import PYBEL_CONTEXT_TAG, METADATA_NAME
-from pybel.io import from_pickle, from_json, from_path
+from pybel.io import from_pickle, from_json, from_jsonl, from_path
 from pybel.manager.database_io import from_database
 from .constants import test_bel_simple, BelReconstitutionMixin, mock_bel_resources, test_bel_thorough, \
     expected_test_thorough_metadata
@@ -71,6 +71,24 @@ class TestCli(BelReconstitutionMixin, unittest.TestCase):
 
             self.bel_thorough_reconstituted(from_json(test_json))
 
+    @mock_bel_resources
+    def test_convert_jsonl(self, mock_get):
+        with self.runner.isolated_filesystem():
+            test_jsonl = os.path.abspath('test.jsonl')
+
+            args = [
+                'convert',
+                '--path', test_bel_thorough,
+                '--jsonl', test_jsonl,
+                '--jsonl-bel',
+                '--allow-nested'
+            ]
+
+            result = self.runner.invoke(cli.main, args)
+            self.assertEqual(0, result.exit_code, msg=result.exc_info)
+
+            self.bel_thorough_reconstituted(from_jsonl(test_jsonl))
+
     @unittest.skipUnless('NEO_PATH' in os.environ, 'Need environmental variable $NEO_PATH')
     @mock_bel_resources
     def test_neo4j_remote(self, mock_get):
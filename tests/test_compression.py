@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+import pybel
+from pybel.compression import compress, decompress, get_codec, get_codec_names, is_compressed, register_codec, \
+    HEADER_MAGIC
+from pybel.manager import models
+from pybel.manager.graph_cache import GraphCacheManager, load_blob
+from tests.constants import BelReconstitutionMixin, mock_bel_resources, test_bel_simple
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+class TestCodecs(unittest.TestCase):
+    def test_round_trip(self):
+        data = b'PyBEL ' * 100
+
+        for name in get_codec_names():
+            compressed = compress(data, name)
+            self.assertTrue(is_compressed(compressed))
+            self.assertEqual(data, decompress(compressed), msg='Failed on codec: {}'.format(name))
+
+        self.assertLess(len(compress(data, 'zlib')), len(data))
+
+    def test_uncompressed(self):
+        data = pickle.dumps({'a': 1})
+        self.assertFalse(is_compressed(data))
+        self.assertEqual(data, decompress(data))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_codec('missing codec')
+
+        with self.assertRaises(ValueError):
+            decompress(HEADER_MAGIC + bytes(bytearray([255, 1])) + b'data')
+
+        with self.assertRaises(ValueError):
+            register_codec('zlib', 200, bytes, bytes)
+
+
+class TestGraphCompression(BelReconstitutionMixin, unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with mock_bel_resources:
+            cls.graph = pybel.from_path(test_bel_simple)
+
+    def test_bytes(self):
+        graph_bytes = pybel.to_bytes(self.graph, codec='zlib')
+        self.assertTrue(is_compressed(graph_bytes))
+        self.assertLess(len(graph_bytes), len(pybel.to_bytes(self.graph)))
+        self.bel_simple_reconstituted(pybel.from_bytes(graph_bytes))
+
+    def test_pickle(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            pybel.to_pickle(self.graph, path, codec='zlib')
+            self.bel_simple_reconstituted(pybel.from_pickle(path))
+
+            pybel.to_pickle(self.graph, path)
+            self.bel_simple_reconstituted(pybel.from_pickle(path))
+        finally:
+            os.remove(path)
+
+    @mock_bel_resources
+    def test_graph_cache(self, mock_get):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            gcm = GraphCacheManager(connection='sqlite:///' + path, codec='zlib')
+            gcm.insert_graph(self.graph, store_parts=True)
+
+            network = gcm.session.query(models.Network).one()
+            self.assertTrue(is_compressed(network.blob))
+            self.bel_simple_reconstituted(gcm.get_graph(network.name, network.version))
+
+            for edge in gcm.session.query(models.Edge).all():
+                self.assertTrue(is_compressed(edge.blob))
+                self.assertIn(pybel.constants.RELATION, load_blob(edge.blob))
+
+            gcm.session.close()
+        finally:
+            os.remove(path)
+
+    def test_missing_codec(self):
+        with self.assertRaises(ValueError):
+            GraphCacheManager(connection='sqlite://', codec='missing codec')
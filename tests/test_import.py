@@ -1,16 +1,35 @@
 # -*- coding: utf-8 -*-
 
+import json
 import logging
+import multiprocessing
+import os
+import pickle
 import tempfile
 import unittest
+from collections import OrderedDict
+from io import StringIO
 from pathlib import Path
 
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+import mock
+
 import pybel
 from pybel import BELGraph
-from pybel import to_bytes, from_bytes, to_graphml
-from pybel.constants import GENE, CITATION, ANNOTATIONS, EVIDENCE
-from pybel.io import to_json_dict, from_json_dict
+from pybel import to_bytes, from_bytes, to_graphml, to_columnar, from_columnar
+from pybel import constructors
+from pybel.columnar import ColumnarGraph
+from pybel.constants import *
+from pybel.constructors import build_bel_parser
+from pybel.graph import CompactNodeData
+from pybel.io import to_json_dict, from_json_dict, to_jsons, from_json_file, JSONStreamReader, to_jsonl, \
+    from_jsonl_lines
 from pybel.parser import BelParser
+from pybel.parser.baseparser import enable_packrat, get_packrat_cache_size
 from pybel.parser.parse_exceptions import *
 from tests.constants import BelReconstitutionMixin, test_bel_simple, TestTokenParserBase, SET_CITATION_TEST, \
     test_citation_dict, test_set_evidence, mock_bel_resources, test_bel_thorough, test_bel_slushy, test_evidence_text
@@ -41,6 +60,42 @@ class TestThoroughIo(BelReconstitutionMixin):
         graph = from_json_dict(graph_json)
         self.bel_thorough_reconstituted(graph)
 
+    def test_json_stream(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            with open(path, 'w') as f:
+                pybel.to_json(self.graph, f)
+
+            self.bel_thorough_reconstituted(pybel.from_json(path))
+        finally:
+            os.remove(path)
+
+    def test_jsonl(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            with open(path, 'w') as f:
+                pybel.to_jsonl(self.graph, f, bel=True)
+
+            self.bel_thorough_reconstituted(pybel.from_jsonl(path))
+        finally:
+            os.remove(path)
+
+    def test_columnar(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            to_columnar(self.graph, path)
+            graph = from_columnar(path)
+        finally:
+            os.remove(path)
+
+        self.bel_thorough_reconstituted(graph)
+
     def test_graphml(self):
         handle, path = tempfile.mkstemp()
 
@@ -71,6 +126,30 @@ class TestSlushyIo(BelReconstitutionMixin):
         graph = from_json_dict(graph_json)
         self.bel_slushy_reconstituted(graph)
 
+    def test_json_stream(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            with open(path, 'w') as f:
+                pybel.to_json(self.graph, f)
+
+            self.bel_slushy_reconstituted(pybel.from_json(path))
+        finally:
+            os.remove(path)
+
+    def test_columnar(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            to_columnar(self.graph, path)
+            graph = from_columnar(path)
+        finally:
+            os.remove(path)
+
+        self.bel_slushy_reconstituted(graph)
+
     def test_graphml(self):
         handle, path = tempfile.mkstemp()
 
@@ -82,6 +161,205 @@ class TestSlushyIo(BelReconstitutionMixin):
         pybel.from_bytes(g_bytes)
 
 
+class TestJsonStream(BelReconstitutionMixin, unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with mock_bel_resources:
+            cls.graph = pybel.from_path(test_bel_simple)
+
+    def test_same_as_dict(self):
+        self.assertEqual(json.loads(json.dumps(to_json_dict(self.graph))), json.loads(to_jsons(self.graph)))
+
+    def test_small_chunks(self):
+        graph = from_json_file(StringIO(to_jsons(self.graph)), chunk_size=3)
+        self.bel_simple_reconstituted(graph)
+
+    def test_links_before_nodes(self):
+        graph_json = to_json_dict(self.graph)
+        graph_json = OrderedDict([
+            ('links', graph_json['links']),
+            ('nodes', graph_json['nodes']),
+            ('graph', graph_json['graph']),
+        ])
+        graph = from_json_file(StringIO(json.dumps(graph_json)))
+        self.bel_simple_reconstituted(graph)
+
+    def test_reader(self):
+        reader = JSONStreamReader(StringIO(' [1, 234567, {"a": [1.5e3, null]}, "b\\u00e9c", {}, []] '), chunk_size=2)
+        self.assertEqual([1, 234567, {'a': [1500.0, None]}, u'b\u00e9c', {}, []], list(reader.iter_array()))
+
+    def test_reader_invalid(self):
+        with self.assertRaises(ValueError):
+            list(JSONStreamReader(StringIO('{"a": 1')).iter_object())
+
+        with self.assertRaises(ValueError):
+            list(JSONStreamReader(StringIO('[1 2]')).iter_array())
+
+
+class TestJsonLines(BelReconstitutionMixin, unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with mock_bel_resources:
+            cls.graph = pybel.from_path(test_bel_simple)
+
+    def get_lines(self, **kwargs):
+        output = StringIO()
+        to_jsonl(self.graph, output, **kwargs)
+        return output.getvalue().splitlines()
+
+    def test_lines(self):
+        lines = self.get_lines(bel=True)
+        self.assertEqual(1 + self.graph.number_of_nodes() + self.graph.number_of_edges(), len(lines))
+        self.assertEqual('graph', json.loads(lines[0])['type'])
+
+        for line in lines[1:]:
+            self.assertIn('bel', json.loads(line))
+
+    def test_split(self):
+        lines = self.get_lines()
+        middle = len(lines) // 2
+
+        graph = from_jsonl_lines(lines[middle:])
+        graph = from_jsonl_lines(lines[:middle], graph=graph)
+        self.bel_simple_reconstituted(graph)
+
+    def test_append(self):
+        lines = self.get_lines() + self.get_lines(header=False)
+        self.bel_simple_reconstituted(from_jsonl_lines(lines))
+
+    @mock_bel_resources
+    def test_compact(self, mock_get):
+        graph = pybel.from_path(test_bel_simple, compact=True)
+        output = StringIO()
+        to_jsonl(graph, output, bel=True)
+        self.bel_simple_reconstituted(from_jsonl_lines(output.getvalue().splitlines()))
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            from_jsonl_lines(['{"type": "missing"}'])
+
+
+class TestColumnar(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with mock_bel_resources:
+            cls.graph = pybel.from_path(test_bel_thorough, allow_nested=True)
+
+        handle, cls.path = tempfile.mkstemp()
+        os.close(handle)
+        to_columnar(cls.graph, cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+
+    def test_round_trip(self):
+        graph = from_columnar(self.path)
+        self.assertEqual(self.graph.graph, graph.graph)
+        self.assertEqual(sorted(self.graph.nodes(data=True), key=str), sorted(graph.nodes(data=True), key=str))
+        self.assertEqual(
+            sorted(self.graph.edges(keys=True, data=True), key=str),
+            sorted(graph.edges(keys=True, data=True), key=str)
+        )
+
+    def test_random_access(self):
+        with ColumnarGraph(self.path) as columnar_graph:
+            self.assertEqual(self.graph.number_of_nodes(), columnar_graph.number_of_nodes())
+            self.assertEqual(self.graph.number_of_edges(), columnar_graph.number_of_edges())
+
+            node, data = columnar_graph.get_node(3)
+            self.assertEqual(self.graph.node[node], data)
+
+            u, v, k, data = columnar_graph.get_edge(5)
+            self.assertEqual(self.graph.edge[u][v][k], data)
+
+    def test_subgraph(self):
+        nodes = [(PROTEIN, 'HGNC', 'AKT1'), (PROTEIN, 'HGNC', 'EGFR'), (PROTEIN, 'HGNC', 'MISSING')]
+
+        with ColumnarGraph(self.path) as columnar_graph:
+            subgraph = columnar_graph.subgraph(nodes)
+
+        expected = self.graph.subgraph(nodes[:2])
+        self.assertEqual(set(expected.nodes_iter()), set(subgraph.nodes_iter()))
+        self.assertLess(0, subgraph.number_of_edges())
+        self.assertEqual(
+            sorted(expected.edges(keys=True, data=True), key=str),
+            sorted(subgraph.edges(keys=True, data=True), key=str)
+        )
+
+    def test_keys_and_none(self):
+        graph = BELGraph()
+        a, b = (GENE, 'HGNC', 'AKT1'), (GENE, 'HGNC', 'EGFR')
+        graph.add_edge(a, b, key='k', **{RELATION: INCREASES, EVIDENCE: None})
+        graph.add_edge(a, b, key=(1, 'k'), **{RELATION: DECREASES, 'extra': None})
+
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            to_columnar(graph, path)
+            result = from_columnar(path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual({RELATION: INCREASES, EVIDENCE: None}, result.edge[a][b]['k'])
+        self.assertEqual({RELATION: DECREASES, 'extra': None}, result.edge[a][b][(1, 'k')])
+
+    def test_invalid(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            with open(path, 'wb') as f:
+                f.write(to_bytes(self.graph))
+
+            with self.assertRaises(ValueError):
+                from_columnar(path)
+        finally:
+            os.remove(path)
+
+
+def _parse_with_packrat(path, kwargs):
+    """Parses a BEL script with packrat parsing in a worker process, since it can't be turned off once it's enabled"""
+    enable_packrat(64)
+
+    with mock_bel_resources:
+        return pybel.from_path(path, **kwargs), get_packrat_cache_size()
+
+
+class TestPackrat(BelReconstitutionMixin, unittest.TestCase):
+    def parse_with_packrat(self, path, **kwargs):
+        pool = multiprocessing.Pool(1)
+
+        try:
+            graph, packrat_cache_size = pool.apply(_parse_with_packrat, (path, kwargs))
+        finally:
+            pool.close()
+            pool.join()
+
+        self.assertEqual(64, packrat_cache_size)
+        self.assertEqual(0, get_packrat_cache_size())
+
+        return graph
+
+    @mock_bel_resources
+    def test_thorough(self, mock_get):
+        expected = pybel.from_path(test_bel_thorough, allow_nested=True)
+
+        graph = self.parse_with_packrat(test_bel_thorough, allow_nested=True)
+
+        self.bel_thorough_reconstituted(graph)
+        self.assertEqual(sorted(expected.nodes(data=True), key=str), sorted(graph.nodes(data=True), key=str))
+        self.assertEqual(
+            sorted(expected.edges(keys=True, data=True), key=str),
+            sorted(graph.edges(keys=True, data=True), key=str)
+        )
+
+    def test_slushy(self):
+        graph = self.parse_with_packrat(test_bel_slushy, complete_origin=True)
+        self.bel_slushy_reconstituted(graph)
+
+
 class TestImport(BelReconstitutionMixin, unittest.TestCase):
     @mock_bel_resources
     def test_from_fileUrl(self, mock_get):
@@ -89,6 +367,261 @@ class TestImport(BelReconstitutionMixin, unittest.TestCase):
         self.bel_simple_reconstituted(g)
 
 
+class TestParallel(BelReconstitutionMixin, unittest.TestCase):
+    @staticmethod
+    def get_message_words(exception):
+        """Some messages list the contents of sets, which come out in a different order in the worker processes"""
+        return sorted(str(exception).replace(',', ' ').split())
+
+    def assertParallelEqual(self, path, **kwargs):
+        with mock_bel_resources:
+            serial = pybel.from_path(path, **kwargs)
+
+            with mock.patch('pybel.graph.PARALLEL_CHUNK_SIZE', 1):
+                parallel = pybel.from_path(path, workers=2, **kwargs)
+
+        self.assertEqual(sorted(serial.nodes(data=True), key=str), sorted(parallel.nodes(data=True), key=str))
+        self.assertEqual(
+            sorted(serial.edges(keys=True, data=True), key=str),
+            sorted(parallel.edges(keys=True, data=True), key=str)
+        )
+        self.assertEqual(
+            [(n, l, e.__class__, self.get_message_words(e), c) for n, l, e, c in serial.warnings],
+            [(n, l, e.__class__, self.get_message_words(e), c) for n, l, e, c in parallel.warnings]
+        )
+
+        return parallel
+
+    def test_thorough(self):
+        graph = self.assertParallelEqual(test_bel_thorough, allow_nested=True)
+        self.bel_thorough_reconstituted(graph)
+
+    def test_slushy(self):
+        graph = self.assertParallelEqual(test_bel_slushy, complete_origin=True)
+        self.bel_slushy_reconstituted(graph)
+
+
+class TestCompact(BelReconstitutionMixin, unittest.TestCase):
+    @mock_bel_resources
+    def test_thorough(self, mock_get):
+        normal = pybel.from_path(test_bel_thorough, allow_nested=True)
+        compact = pybel.from_path(test_bel_thorough, allow_nested=True, compact=True)
+
+        self.assertEqual(sorted(normal.nodes(data=True), key=str), sorted(compact.nodes(data=True), key=str))
+        self.assertEqual(
+            sorted(normal.edges(keys=True, data=True), key=str),
+            sorted(compact.edges(keys=True, data=True), key=str)
+        )
+        self.bel_thorough_reconstituted(compact)
+
+        graph = from_bytes(to_bytes(compact))
+        self.assertEqual(sorted(normal.nodes(data=True), key=str), sorted(graph.nodes(data=True), key=str))
+        self.assertLess(len(to_bytes(compact)), len(to_bytes(normal)))
+
+    def test_shared_edge_data(self):
+        graph = BELGraph(compact=True)
+        a, b, c = (GENE, 'HGNC', 'AKT1'), (GENE, 'HGNC', 'EGFR'), (GENE, 'HGNC', 'MAPT')
+
+        graph.add_edge(a, b, **{CITATION: test_citation_dict.copy(), EVIDENCE: test_evidence_text,
+                                ANNOTATIONS: {'TestAnnotation': 'a'}})
+        graph.add_edge(b, c, **{CITATION: test_citation_dict.copy(), EVIDENCE: test_evidence_text,
+                                ANNOTATIONS: {'TestAnnotation': 'a'}})
+        graph.add_edge(a, c, **{CITATION: test_citation_dict.copy(), EVIDENCE: test_evidence_text,
+                                ANNOTATIONS: {'TestAnnotation': 'b'}})
+
+        first, second, third = graph.edge[a][b][0], graph.edge[b][c][0], graph.edge[a][c][0]
+        self.assertEqual(test_citation_dict, first[CITATION])
+        self.assertIs(first[CITATION], second[CITATION])
+        self.assertIs(first[CITATION], third[CITATION])
+        self.assertIs(first[ANNOTATIONS], second[ANNOTATIONS])
+        self.assertIsNot(first[ANNOTATIONS], third[ANNOTATIONS])
+        self.assertEqual({'TestAnnotation': 'b'}, third[ANNOTATIONS])
+
+        with self.assertRaises(TypeError):
+            first[ANNOTATIONS]['TestAnnotation'] = 'c'
+
+        self.assertEqual({'TestAnnotation': 'a'}, second[ANNOTATIONS])
+
+    def test_unhashable_annotations(self):
+        graph = BELGraph(compact=True)
+        a, b, c = (GENE, 'HGNC', 'AKT1'), (GENE, 'HGNC', 'EGFR'), (GENE, 'HGNC', 'MAPT')
+
+        graph.add_edge(a, b, **{EVIDENCE: test_evidence_text, ANNOTATIONS: {'TestAnnotation': {'a', 'b'}}})
+        graph.add_edge(b, c, **{EVIDENCE: test_evidence_text, ANNOTATIONS: {'TestAnnotation': {'a', 'b'}}})
+        graph.add_edge(a, c, **{EVIDENCE: test_evidence_text, ANNOTATIONS: {'TestAnnotation': ['a', 'b']}})
+
+        first, second, third = graph.edge[a][b][0], graph.edge[b][c][0], graph.edge[a][c][0]
+        self.assertEqual({'TestAnnotation': {'a', 'b'}}, first[ANNOTATIONS])
+        self.assertIs(first[ANNOTATIONS], second[ANNOTATIONS])
+        self.assertIsInstance(first[ANNOTATIONS]['TestAnnotation'], frozenset)
+
+        self.assertEqual({'TestAnnotation': ['a', 'b']}, third[ANNOTATIONS])
+        third[ANNOTATIONS]['TestAnnotation'] = ['c']
+        self.assertEqual({'TestAnnotation': ['c']}, graph.edge[a][c][0][ANNOTATIONS])
+
+        graph = from_bytes(to_bytes(graph))
+        self.assertIs(graph.edge[a][b][0][ANNOTATIONS], graph.edge[b][c][0][ANNOTATIONS])
+        self.assertEqual({'TestAnnotation': {'a', 'b'}}, graph.edge[a][b][0][ANNOTATIONS])
+
+    def test_interned(self):
+        graph = BELGraph(compact=True)
+        graph.add_simple_node(GENE, 'HGNC', 'AKT1')
+        graph.add_edge((GENE, 'HGNC', 'AKT1'), (GENE, 'HGNC', 'EGFR'))
+        graph.add_node((GENE, 'HGNC', 'EGFR'), **{FUNCTION: GENE, NAMESPACE: 'HGNC', NAME: 'EGFR'})
+
+        node = next(n for n in graph.nodes_iter() if n[2] == 'EGFR')
+        self.assertIs(node[1], graph.node[(GENE, 'HGNC', 'AKT1')][NAMESPACE])
+        self.assertIsInstance(graph.node[node], CompactNodeData)
+        self.assertEqual({FUNCTION: GENE, NAMESPACE: 'HGNC', NAME: 'EGFR'}, graph.node[node])
+
+        graph.node[node]['extra'] = 1
+        self.assertEqual({FUNCTION: GENE, NAMESPACE: 'HGNC', NAME: 'EGFR', 'extra': 1}, dict(graph.node[node]))
+
+        del graph.node[node][NAMESPACE]
+        self.assertNotIn(NAMESPACE, graph.node[node])
+        self.assertEqual(3, len(graph.node[node]))
+        self.assertEqual(1, len(list(graph.nodes_iter(**{NAME: 'EGFR'}))))
+
+    def test_node_data(self):
+        data = CompactNodeData(GENE, 'HGNC', 'AKT1')
+        self.assertFalse(hasattr(data, '__dict__'))
+        self.assertIsInstance(data, MutableMapping)
+
+        self.assertEqual(GENE, data.get(FUNCTION))
+        self.assertIsNone(data.get('extra'))
+        self.assertEqual(1, data.setdefault('extra', 1))
+        self.assertEqual(1, data.setdefault('extra', 2))
+        self.assertEqual({FUNCTION, NAMESPACE, NAME, 'extra'}, set(data.keys()))
+        self.assertEqual(1, data.pop('extra'))
+        self.assertEqual(0, data.pop('extra', 0))
+        self.assertRaises(KeyError, data.pop, 'extra')
+
+        data.update({NAME: 'EGFR'}, extra=2)
+        self.assertEqual({FUNCTION: GENE, NAMESPACE: 'HGNC', NAME: 'EGFR', 'extra': 2}, dict(data.items()))
+        self.assertEqual(data, {FUNCTION: GENE, NAMESPACE: 'HGNC', NAME: 'EGFR', 'extra': 2})
+        self.assertNotEqual(data, {FUNCTION: GENE})
+        self.assertEqual(data, pickle.loads(pickle.dumps(data)))
+
+
+class TestIndexed(BelReconstitutionMixin, unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with mock_bel_resources:
+            cls.graph = pybel.from_path(test_bel_thorough, allow_nested=True)
+            cls.indexed = pybel.from_path(test_bel_thorough, allow_nested=True, indexed=True)
+
+    def assertEdgeQueryEqual(self, expected_count, **kwargs):
+        expected = sorted(self.graph.edges_iter(keys=True, data=True, **kwargs), key=str)
+        self.assertEqual(expected_count, len(expected))
+        self.assertEqual(expected, sorted(self.indexed.edges_iter(keys=True, data=True, **kwargs), key=str))
+
+    def assertNodeQueryEqual(self, expected_count, **kwargs):
+        expected = sorted(self.graph.nodes_iter(data=True, **kwargs), key=str)
+        self.assertEqual(expected_count, len(expected))
+        self.assertEqual(expected, sorted(self.indexed.nodes_iter(data=True, **kwargs), key=str))
+
+    def test_reconstituted(self):
+        self.bel_thorough_reconstituted(self.indexed)
+
+    def test_edge_queries(self):
+        self.assertEdgeQueryEqual(27, relation=INCREASES)
+        self.assertEdgeQueryEqual(34, relation=[INCREASES, DECREASES])
+        self.assertEdgeQueryEqual(1, annotations={'TESTAN1': '1'})
+        self.assertEdgeQueryEqual(1, relation=INCREASES, annotations={'TESTAN1': '1', 'TestRegex': '9000'})
+        self.assertEdgeQueryEqual(0, relation=INCREASES, annotations={'TESTAN1': '3'})
+        self.assertEdgeQueryEqual(32, citation={CITATION_REFERENCE: '123455'})
+
+    def test_node_queries(self):
+        self.assertNodeQueryEqual(49, function=PROTEIN)
+        self.assertNodeQueryEqual(18, function=PROTEIN, namespace='HGNC', name=['AKT1', 'EGFR', 'MIA', 'CFTR'])
+        self.assertNodeQueryEqual(0, function=PROTEIN, namespace='MISSING')
+
+    def test_incremental(self):
+        graph = BELGraph(indexed=True)
+        a, b = (GENE, 'HGNC', 'AKT1'), (GENE, 'HGNC', 'EGFR')
+
+        graph.add_edge(a, b, **{RELATION: INCREASES})
+        graph.add_edge(a, b, **{RELATION: DECREASES})
+        self.assertEqual([(a, b, 1)], list(graph.edges_iter(keys=True, relation=DECREASES)))
+
+        graph.add_edge(a, b, key=1, **{RELATION: INCREASES})
+        self.assertEqual([], list(graph.edges_iter(relation=DECREASES)))
+        self.assertEqual(2, len(list(graph.edges_iter(relation=INCREASES))))
+
+        graph.remove_edge(a, b, 0)
+        self.assertEqual([(a, b, 1)], list(graph.edges_iter(keys=True, relation=INCREASES)))
+
+        self.assertEqual([], list(graph.nodes_iter(function=GENE)))
+        graph.add_simple_node(GENE, 'HGNC', 'MAPT')
+        self.assertEqual([(GENE, 'HGNC', 'MAPT')], list(graph.nodes_iter(function=GENE)))
+
+    def test_unhashable_annotations(self):
+        for compact in (False, True):
+            graph = BELGraph(indexed=True, compact=compact)
+            a, b = (GENE, 'HGNC', 'AKT1'), (GENE, 'HGNC', 'EGFR')
+
+            graph.add_edge(a, b, **{RELATION: INCREASES, ANNOTATIONS: {'TestAnnotation': {'a', 'b'}}})
+            graph.add_edge(a, b, **{RELATION: INCREASES, ANNOTATIONS: {'TestAnnotation': ['a', 'b']}})
+            graph.add_edge(a, b, **{RELATION: INCREASES, ANNOTATIONS: {'TestAnnotation': 'a'}})
+
+            self.assertEqual(3, len(list(graph.edges_iter(relation=INCREASES))))
+            self.assertEqual([(a, b, 2)], list(graph.edges_iter(keys=True, annotations={'TestAnnotation': 'a'})))
+            self.assertEqual([(a, b, 2)], list(graph.edges_iter(keys=True, annotations={'TestAnnotation': u'a'})))
+
+
+class TestDigest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with mock_bel_resources:
+            cls.graph = pybel.from_path(test_bel_thorough, allow_nested=True)
+
+    def test_round_trip(self):
+        self.assertEqual(self.graph.digest(), from_bytes(to_bytes(self.graph)).digest())
+        self.assertEqual(self.graph, from_bytes(to_bytes(self.graph)))
+
+    def test_order(self):
+        graph = BELGraph()
+        graph.graph.update(self.graph.graph)
+        graph.add_nodes_from(reversed(self.graph.nodes(data=True)))
+        graph.add_edges_from(reversed(self.graph.edges(data=True)))
+
+        self.assertEqual(self.graph.digest(), graph.digest())
+        self.assertEqual(self.graph, graph)
+
+    def test_mutation(self):
+        graph = from_bytes(to_bytes(self.graph))
+        digest = graph.digest()
+
+        u, v, k = next(graph.edges_iter(keys=True))
+        data = graph.edge[u][v][k].copy()
+
+        graph.remove_edge(u, v, k)
+        self.assertNotEqual(digest, graph.digest())
+        self.assertNotEqual(self.graph, graph)
+
+        graph.add_edge(u, v, attr_dict=data)
+        self.assertEqual(digest, graph.digest())
+
+        graph.add_edge(u, v, attr_dict=data)
+        self.assertNotEqual(digest, graph.digest())
+
+        graph.document[METADATA_NAME] = 'Other name'
+        self.assertNotEqual(self.graph, graph)
+
+    def test_fallback(self):
+        graph, other = BELGraph(), BELGraph()
+        graph.graph.update(other.graph)
+
+        for g in graph, other:
+            g.add_edge(1, 2, weight=object())
+
+        self.assertRaises(TypeError, graph.digest)
+        self.assertNotEqual(graph, other)
+
+        other.edge[1][2][0]['weight'] = graph.edge[1][2][0]['weight'] = 1
+        self.assertEqual(graph, other)
+
+
 class TestRegex(unittest.TestCase):
     def setUp(self):
         self.graph = BELGraph()
@@ -115,6 +648,61 @@ class TestRegex(unittest.TestCase):
             self.parser.parse_lines(lines)
 
 
+class TestReset(unittest.TestCase):
+    def test_reset(self):
+        parser = BelParser(BELGraph(), namespace_dicts={'TESTNS': {'1': 'G', '2': 'G'}})
+        parser.parse_lines([
+            SET_CITATION_TEST,
+            test_set_evidence,
+            'g(TESTNS:1) -- g(TESTNS:2)'
+        ])
+        self.assertEqual(2, parser.graph.number_of_nodes())
+
+        graph = BELGraph()
+        parser.reset(graph, namespace_dicts={}, namespace_expressions={'dbSNP': 'rs[0-9]*'})
+        self.assertIs(graph, parser.graph)
+        self.assertEqual({}, parser.control_parser.citation)
+
+        with self.assertRaises(MissingCitationException):
+            parser.parseString('g(dbSNP:rs10234) -- g(dbSNP:rs10235)')
+
+        parser.parse_lines([SET_CITATION_TEST, test_set_evidence, 'g(dbSNP:rs10234) -- g(dbSNP:rs10235)'])
+        self.assertEqual(2, graph.number_of_nodes())
+        self.assertIn((GENE, 'dbSNP', 'rs10234'), graph)
+
+        with self.assertRaises(UndefinedNamespaceWarning):
+            parser.parseString('g(TESTNS:1) -- g(TESTNS:2)')
+
+        with self.assertRaises(NakedNameWarning):
+            parser.parseString('g(rs10234) -- g(rs10235)')
+
+        parser.reset(graph, namespace_dicts={}, allow_naked_names=True)
+        parser.parse_lines([SET_CITATION_TEST, test_set_evidence, 'g(rs10234) -- g(rs10235)'])
+
+    def test_build_bel_parser(self):
+        graph_1, graph_2 = BELGraph(), BELGraph()
+
+        parser_1 = build_bel_parser(graph_1)
+        self.assertIs(graph_1, parser_1.graph)
+
+        parser_2 = build_bel_parser(graph_2, allow_nested=True)
+        self.assertIs(parser_1, parser_2)
+        self.assertIs(graph_2, parser_2.graph)
+        self.assertTrue(parser_2.allow_nested)
+
+    @mock_bel_resources
+    def test_build_bel_parser_released(self, mock_get):
+        """Tests that the reused parser doesn't keep the last graph and its definitions"""
+        graph = pybel.from_path(test_bel_simple)
+        self.assertEqual(6, graph.number_of_edges())
+
+        parser = constructors._local.bel_parser
+        self.assertIsNone(parser.graph)
+        self.assertIsNone(parser.identifier_parser.namespace_dict)
+        self.assertEqual({}, parser.control_parser.valid_annotations)
+        self.assertEqual({}, parser.control_parser.citation)
+
+
 class TestFull(TestTokenParserBase):
     def setUp(self):
         self.namespaces = {
@@ -1,13 +1,39 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import os
+import shutil
 import tempfile
+import threading
+import time
 import unittest
 
-from pybel.manager.cache import CacheManager
-from tests.constants import HGNC_URL, help_check_hgnc, CELL_LINE_URL, HGNC_KEYWORD
+import mock
+import networkx as nx
+from sqlalchemy import MetaData, Table, create_engine, inspect
+
+import pybel
+from pybel.constants import GRAPH_NAMESPACE_URL, GRAPH_ANNOTATION_URL
+from pybel.manager import models
+from pybel.manager.cache import CacheManager, LazyNamespace
+from pybel.manager.snapshot import DefinitionSnapshot, write_snapshot, ANNOTATION_SNAPSHOT
+from pybel.manager.utils import parse_owl
+from pybel.utils import HTTPCache, ensure_directory
+from tests.constants import HGNC_URL, help_check_hgnc, CELL_LINE_URL, HGNC_KEYWORD, test_bel_simple, dir_path
 from tests.constants import test_ns_1, test_ns_2, test_an_1
-from tests.constants import wine_iri, mock_bel_resources, mock_parse_owl_pybel, mock_parse_owl_rdf
+from tests.constants import wine_iri, pizza_iri, mock_bel_resources, mock_parse_owl_pybel, mock_parse_owl_rdf
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
 
 test_ns1 = 'file:///' + test_ns_1
 test_ns2 = 'file:///' + test_ns_2
@@ -34,6 +60,40 @@ class TestCachePersistient(unittest.TestCase):
         cm2.ensure_namespace(HGNC_URL)
         help_check_hgnc(self, {HGNC_KEYWORD: cm2.namespace_cache[HGNC_URL]})
 
+    @mock_bel_resources
+    def test_lazy_namespace_pickle(self, mock_get):
+        cm = CacheManager(connection=self.connection, lazy_namespaces=True)
+        namespace = cm.get_namespace(HGNC_URL)
+        self.assertIn('MIA', namespace)
+
+        namespace = pickle.loads(pickle.dumps(namespace))
+        help_check_hgnc(self, {HGNC_KEYWORD: namespace})
+
+        namespace.engine.dispose()
+        cm.session.close()
+
+    @mock_bel_resources
+    def test_old_schema(self, mock_get):
+        """Makes the namespace tables like they were before content hashes and the name index were added"""
+        engine = create_engine(self.connection)
+        metadata = MetaData()
+        Table(models.Namespace.__tablename__, metadata, *[
+            column.copy()
+            for column in models.Namespace.__table__.columns
+            if column.name != 'content_hash'
+        ])
+        metadata.create_all(engine)
+        engine.dispose()
+
+        cm = CacheManager(connection=self.connection)
+        columns = inspect(cm.engine).get_columns(models.Namespace.__tablename__)
+        self.assertIn('content_hash', {column['name'] for column in columns})
+
+        cm.ensure_namespace(HGNC_URL)
+        help_check_hgnc(self, {HGNC_KEYWORD: cm.namespace_cache[HGNC_URL]})
+        self.assertIsNotNone(cm.session.query(models.Namespace.content_hash).scalar())
+        cm.session.close()
+
 
 class TestCache(unittest.TestCase):
     def setUp(self):
@@ -52,6 +112,35 @@ class TestCache(unittest.TestCase):
         self.assertIn('1321N1 cell', self.cm.annotation_cache[CELL_LINE_URL])
         self.assertEqual('CLO_0001072', self.cm.annotation_cache[CELL_LINE_URL]['1321N1 cell'])
 
+        annotation = self.cm.session.query(models.Annotation).filter(models.Annotation.url == CELL_LINE_URL).one()
+        self.assertEqual(len(self.cm.annotation_cache[CELL_LINE_URL]), len(annotation.entries))
+
+    @mock_bel_resources
+    def test_insert_namespace_entries(self, mock_get):
+        self.cm.ensure_namespace(HGNC_URL)
+
+        namespace = self.cm.session.query(models.Namespace).filter(models.Namespace.url == HGNC_URL).one()
+        self.assertEqual(len(self.cm.namespace_cache[HGNC_URL]), len(namespace.entries))
+        self.assertTrue(all(entry.encoding for entry in namespace.entries))
+
+    def test_insert_namespace_repeated_names(self):
+        with open(test_ns_1, 'rb') as f:
+            lines = f.read().splitlines() + [b'TestValue1|P']
+
+        namespace = self.cm.insert_namespace(test_ns1, lines=lines)
+        self.assertEqual(5, len(namespace.entries))
+        self.assertEqual({'P'}, self.cm.get_namespace(test_ns1)['TestValue1'])
+        self.assertEqual({'O'}, self.cm.get_namespace(test_ns1)['TestValue2'])
+
+    def test_insert_annotation_repeated_names(self):
+        with open(test_an_1, 'rb') as f:
+            lines = f.read().splitlines() + [b'TestAnnot1|X']
+
+        annotation = self.cm.insert_annotation(test_an1, lines=lines)
+        self.assertEqual(5, len(annotation.entries))
+        self.assertEqual('X', self.cm.get_annotation(test_an1)['TestAnnot1'])
+        self.assertEqual('O', self.cm.get_annotation(test_an1)['TestAnnot2'])
+
     @mock_parse_owl_rdf
     @mock_parse_owl_pybel
     def test_insert_owl(self, m1, m2):
@@ -59,3 +148,454 @@ class TestCache(unittest.TestCase):
         self.assertIn(wine_iri, self.cm.namespace_term_cache)
         self.assertIn('ChateauMorgon', self.cm.namespace_term_cache[wine_iri])
         self.assertIn('Winery', self.cm.namespace_term_cache[wine_iri])
+
+    @mock_parse_owl_rdf
+    @mock_parse_owl_pybel
+    def test_load_owl(self, m1, m2):
+        graph = parse_owl(wine_iri)
+
+        self.cm.ensure_annotation_owl(wine_iri)
+        self.cm.annotation_term_cache.pop(wine_iri)
+        self.cm.annotation_edge_cache.pop(wine_iri)
+        self.cm.annotation_graph_cache.pop(wine_iri)
+
+        self.cm.ensure_annotation_owl(wine_iri)
+        self.assertIn(('WineSugar', 'WineTaste'), self.cm.annotation_edge_cache[wine_iri])
+        self.assertEqual(set(graph.nodes()), self.cm.annotation_term_cache[wine_iri])
+        self.assertEqual(set(graph.edges()), self.cm.annotation_edge_cache[wine_iri])
+        self.assertEqual(set(graph.edges()), set(self.cm.annotation_graph_cache[wine_iri].edges()))
+
+    @mock_parse_owl_rdf
+    @mock_parse_owl_pybel
+    def test_insert_owl_streamed(self, mock_open_owl, mock_rdf):
+        graph = parse_owl(pizza_iri)
+        mock_open_owl.reset_mock()
+
+        with mock.patch('pybel.manager.utils.OWLParser') as mock_parser:
+            self.cm.ensure_namespace_owl(pizza_iri)
+
+        self.assertFalse(mock_parser.called)
+        self.assertFalse(mock_rdf.called)
+        mock_open_owl.assert_called_once_with(pizza_iri, http_cache=self.cm.http_cache)
+
+        self.assertEqual(set(graph.nodes()), self.cm.namespace_term_cache[pizza_iri])
+        self.assertEqual(set(graph.edges()), self.cm.namespace_edge_cache[pizza_iri])
+
+    @mock_parse_owl_rdf
+    @mock_parse_owl_pybel
+    def test_owl_closure(self, m1, m2):
+        self.cm.ensure_namespace_owl(wine_iri)
+        graph = self.cm.namespace_graph_cache[wine_iri]
+
+        self.assertTrue(self.cm.is_namespace_owl_descendant(wine_iri, 'WineSugar', 'WineTaste'))
+        self.assertTrue(self.cm.is_namespace_owl_descendant(wine_iri, 'WineSugar', 'WineDescriptor'))
+        self.assertFalse(self.cm.is_namespace_owl_descendant(wine_iri, 'WineDescriptor', 'WineSugar'))
+        self.assertIn('Red', self.cm.get_namespace_owl_descendants(wine_iri, 'WineDescriptor'))
+        self.assertEqual(set(), self.cm.get_namespace_owl_ancestors(wine_iri, 'not a term'))
+
+        for node in graph:
+            self.assertEqual(nx.descendants(graph, node), self.cm.get_namespace_owl_ancestors(wine_iri, node))
+            self.assertEqual(nx.ancestors(graph, node), self.cm.get_namespace_owl_descendants(wine_iri, node))
+
+    @mock_parse_owl_rdf
+    @mock_parse_owl_pybel
+    def test_owl_closure_missing(self, m1, m2):
+        """Tests the closure is stored when an ontology was cached without it"""
+        self.cm.ensure_namespace_owl(wine_iri)
+        self.cm.session.execute(models.owl_namespace_closure.delete())
+        self.cm.session.commit()
+
+        self.assertTrue(self.cm.is_namespace_owl_descendant(wine_iri, 'WineSugar', 'WineDescriptor'))
+        self.assertLess(0, self.cm.session.query(models.owl_namespace_closure).count())
+
+
+class TestLazyNamespace(unittest.TestCase):
+    def setUp(self):
+        self.cm = CacheManager(connection='sqlite://', lazy_namespaces=True, namespace_cache_size=2)
+
+    @mock_bel_resources
+    def test_lookup(self, mock_get):
+        namespace = self.cm.get_namespace(HGNC_URL)
+        self.assertIsInstance(namespace, LazyNamespace)
+        help_check_hgnc(self, {HGNC_KEYWORD: namespace})
+
+        self.assertNotIn('NOT A GENE', namespace)
+        with self.assertRaises(KeyError):
+            namespace['NOT A GENE']
+
+        self.assertLessEqual(len(namespace._cache), 2)
+
+        eager = CacheManager(connection='sqlite://').get_namespace(HGNC_URL)
+        self.assertEqual(len(eager), len(namespace))
+        self.assertEqual(set(eager), set(namespace))
+
+    @mock_bel_resources
+    def test_parse(self, mock_get):
+        eager_graph = pybel.from_path(test_bel_simple, manager=CacheManager(connection='sqlite://'))
+        lazy_graph = pybel.from_path(test_bel_simple, manager=self.cm)
+
+        self.assertEqual(eager_graph, lazy_graph)
+        self.assertEqual(len(eager_graph.warnings), len(lazy_graph.warnings))
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cm = CacheManager(connection='sqlite://', snapshots=True, snapshot_directory=self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        path = os.path.join(self.dir, 'test.snapshot')
+        entries = {'b': 'label b', 'a': None, u'\u03b1': u'\u03b2', 'c': ''}
+
+        write_snapshot(path, ANNOTATION_SNAPSHOT, entries.items(), content_hash='abc')
+        snapshot = DefinitionSnapshot(path)
+
+        self.assertEqual('abc', snapshot.content_hash)
+        self.assertEqual(entries, dict(snapshot))
+        self.assertEqual(['a', 'b', 'c', u'\u03b1'], list(snapshot))
+        self.assertNotIn('d', snapshot)
+        with self.assertRaises(KeyError):
+            snapshot['d']
+
+        self.assertEqual(entries, dict(pickle.loads(pickle.dumps(snapshot))))
+        snapshot.close()
+
+    def test_invalid(self):
+        path = os.path.join(self.dir, 'test.snapshot')
+
+        with open(path, 'wb') as f:
+            f.write(b'not a snapshot' * 10)
+
+        with self.assertRaises(ValueError):
+            DefinitionSnapshot(path)
+
+    @mock_bel_resources
+    def test_lookup(self, mock_get):
+        namespace = self.cm.get_namespace(HGNC_URL)
+        self.assertIsInstance(namespace, DefinitionSnapshot)
+        help_check_hgnc(self, {HGNC_KEYWORD: namespace})
+
+        eager = CacheManager(connection='sqlite://').get_namespace(HGNC_URL)
+        self.assertEqual(eager, dict(namespace))
+
+        annotation = self.cm.get_annotation(CELL_LINE_URL)
+        self.assertIsInstance(annotation, DefinitionSnapshot)
+        self.assertEqual('CLO_0001072', annotation['1321N1 cell'])
+
+    @mock_bel_resources
+    def test_rewrite(self, mock_get):
+        """Tests the snapshot is written again when its namespace's file changed"""
+        path = self.cm.get_namespace(HGNC_URL).path
+        mtime = os.path.getmtime(path)
+
+        cm = CacheManager(connection='sqlite://', snapshots=True, snapshot_directory=self.dir)
+        cm.ensure_namespace(HGNC_URL)
+        self.assertEqual(mtime, os.path.getmtime(path))
+
+        namespace = self.cm.session.query(models.Namespace).filter(models.Namespace.url == HGNC_URL).one()
+        namespace.content_hash = 'changed'
+        self.cm.session.commit()
+        del self.cm.namespace_cache[HGNC_URL]
+
+        self.assertEqual('changed', self.cm.get_namespace(HGNC_URL).content_hash)
+
+    @mock_bel_resources
+    def test_parse(self, mock_get):
+        eager_graph = pybel.from_path(test_bel_simple, manager=CacheManager(connection='sqlite://'))
+        snapshot_graph = pybel.from_path(test_bel_simple, manager=self.cm)
+
+        self.assertEqual(eager_graph, snapshot_graph)
+        self.assertEqual(len(eager_graph.warnings), len(snapshot_graph.warnings))
+
+    def test_lazy(self):
+        with self.assertRaises(ValueError):
+            CacheManager(connection='sqlite://', lazy_namespaces=True, snapshots=True)
+
+
+class ResourceServer(ThreadingMixIn, HTTPServer):
+    """Serves files with ETags, keeping track of the requested paths, the response statuses, and how many requests
+    were handled at once"""
+    daemon_threads = True
+
+    def __init__(self, directory=dir_path):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), ResourceRequestHandler)
+        self.directory = directory
+        self.requested = []
+        self.statuses = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/'.format(self.server_address[1])
+
+
+class ResourceRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requested.append(self.path)
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+
+        try:
+            time.sleep(0.1)  # so the downloads overlap if they're made at the same time
+            self.send_file(os.path.join(self.server.directory, self.path.strip('/')))
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def send_file(self, path):
+        if not os.path.exists(path):
+            self.server.statuses.append(404)
+            self.send_error(404)
+            return
+
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        etag = '"{}"'.format(hashlib.sha1(content).hexdigest())
+
+        if self.headers.get('If-None-Match') == etag:
+            self.server.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.server.statuses.append(200)
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ResourceServerTestCase(unittest.TestCase):
+    """Runs a :class:`ResourceServer` and builds a cache manager with its own HTTP cache for each test"""
+    directory = dir_path
+
+    def setUp(self):
+        self.server = ResourceServer(directory=self.directory)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        self.http_cache_dir = tempfile.mkdtemp()
+        self.http_cache = HTTPCache(self.http_cache_dir)
+        self.cm = CacheManager(connection='sqlite://', http_cache=self.http_cache)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+        shutil.rmtree(self.http_cache_dir)
+
+
+class TestPrefetch(ResourceServerTestCase):
+    def setUp(self):
+        super(TestPrefetch, self).setUp()
+
+        self.namespace_urls = {
+            'HGNC': self.server.url + 'belns/hgnc-human-genes.belns',
+            'CHEBI': self.server.url + 'belns/chebi.belns',
+            'GOCC': self.server.url + 'belns/go-cellular-component.belns',
+            'MESHD': self.server.url + 'belns/mesh-diseases.belns',
+        }
+
+        self.annotation_urls = {
+            'CellLine': self.server.url + 'belanno/cell-line.belanno',
+            'MeSHDisease': self.server.url + 'belanno/mesh-diseases.belanno',
+        }
+
+    def test_parse(self):
+        lines = [
+            'SET DOCUMENT Name = "PyBEL Prefetch Test"',
+            'SET DOCUMENT Version = "1.0"',
+            'SET DOCUMENT Description = "Made for testing prefetching definitions"',
+            'SET DOCUMENT Authors = "PyBEL"',
+            'SET DOCUMENT ContactInfo = "pybel@example.com"',
+        ]
+        lines.extend('DEFINE NAMESPACE {} AS URL "{}"'.format(k, v) for k, v in sorted(self.namespace_urls.items()))
+        lines.extend('DEFINE ANNOTATION {} AS URL "{}"'.format(k, v) for k, v in sorted(self.annotation_urls.items()))
+        lines.extend([
+            'SET Citation = {"PubMed","Test Article","12345"}',
+            'SET Evidence = "Evidence"',
+            'SET CellLine = "1321N1 cell"',
+            'p(HGNC:AKT1) -> a(CHEBI:dioxygen)',
+        ])
+
+        graph = pybel.from_lines(lines, manager=self.cm)
+
+        self.assertEqual(1, graph.number_of_edges())
+        self.assertEqual(self.namespace_urls, graph.graph[GRAPH_NAMESPACE_URL])
+        self.assertEqual(self.annotation_urls, graph.graph[GRAPH_ANNOTATION_URL])
+
+        self.assertEqual(6, len(self.server.requested))
+        self.assertEqual(6, len(set(self.server.requested)))
+        self.assertLess(1, self.server.max_active)
+
+        pybel.from_lines(lines, manager=self.cm)
+        self.assertEqual(6, len(self.server.requested), msg='Cached resources should not be downloaded again')
+
+    def test_streamed(self):
+        with mock.patch('pybel.utils.parse_definition') as parse_definition:
+            self.cm.prefetch(namespace_urls=self.namespace_urls.values(), annotation_urls=self.annotation_urls.values())
+
+        self.assertFalse(parse_definition.called)
+        self.assertEqual(6, len(self.server.requested))
+
+        self.assertEqual(4, self.cm.session.query(models.Namespace).count())
+        self.assertEqual(2, self.cm.session.query(models.Annotation).count())
+
+        namespace = self.cm.session.query(models.Namespace).filter(
+            models.Namespace.url == self.namespace_urls['HGNC']).one()
+        self.assertIsNotNone(namespace.content_hash)
+        self.assertIn('AKT1', self.cm.get_namespace(self.namespace_urls['HGNC']))
+
+    def test_missing(self):
+        url = self.server.url + 'belns/missing.belns'
+
+        self.cm.prefetch(namespace_urls=[url, self.namespace_urls['HGNC']])
+        self.assertEqual(1, self.cm.session.query(models.Namespace).count())
+
+        with self.assertRaises(Exception):
+            self.cm.ensure_namespace(url)
+
+
+class TestHTTPCache(ResourceServerTestCase):
+    def test_conditional_get(self):
+        url = self.server.url + 'belns/test_ns_1.belns'
+
+        with open(test_ns_1, 'rb') as f:
+            content = f.read()
+
+        self.assertIsNone(self.http_cache.get_headers(url))
+
+        self.assertEqual(content, self.http_cache.get(url))
+        self.assertEqual([200], self.server.statuses)
+        self.assertIsNotNone(self.http_cache.get_headers(url)['ETag'])
+
+        self.assertEqual(content, self.http_cache.get(url))
+        self.assertEqual(content.splitlines(), list(self.http_cache.iter_lines(url)))
+        self.assertEqual([200, 304, 304], self.server.statuses)
+
+        self.http_cache.clear()
+        self.assertIsNone(self.http_cache.get_headers(url))
+
+    def test_one_file(self):
+        url = self.server.url + 'belns/test_ns_1.belns'
+
+        with open(test_ns_1, 'rb') as f:
+            content = f.read()
+
+        self.http_cache.get(url)
+        self.assertEqual(1, len(os.listdir(self.http_cache_dir)), msg='Headers should be stored with the content')
+
+        with self.http_cache.open(url) as f:
+            self.assertEqual(content, f.read())
+
+        path = self.http_cache.download(url, self.http_cache_dir)
+        self.assertEqual(content.splitlines(), list(self.http_cache.iter_file_lines(path)))
+
+    def test_from_url_use_cache(self):
+        url = self.server.url + 'bel/test_bel.bel'
+
+        with open(test_bel_simple, 'rb') as f:
+            lines = [line.decode('utf-8') for line in f.read().splitlines()]
+
+        with mock.patch('pybel.io.HTTPCache', return_value=self.http_cache), mock.patch('pybel.io.BELGraph') as graph:
+            pybel.from_url(url)
+            self.assertEqual(lines, list(graph.call_args[1]['lines']))
+            self.assertEqual(0, len(os.listdir(self.http_cache_dir)), msg='Documents should not be cached by default')
+
+            pybel.from_url(url, use_cache=True)
+            self.assertEqual(lines, list(graph.call_args[1]['lines']))
+            self.assertIsNotNone(self.http_cache.get_headers(url))
+
+    def test_missing_directory(self):
+        url = self.server.url + 'belns/test_ns_1.belns'
+        http_cache = HTTPCache(os.path.join(self.http_cache_dir, 'missing'))
+
+        ensure_directory(http_cache.directory)
+        self.assertIsNotNone(http_cache.get(url))
+        self.assertIsNotNone(http_cache.get_headers(url))
+
+
+class TestRefresh(ResourceServerTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        shutil.copy(test_ns_1, os.path.join(self.directory, 'test.belns'))
+        shutil.copy(test_an_1, os.path.join(self.directory, 'test.belanno'))
+
+        super(TestRefresh, self).setUp()
+
+        self.namespace_url = self.server.url + 'test.belns'
+        self.annotation_url = self.server.url + 'test.belanno'
+
+    def tearDown(self):
+        super(TestRefresh, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def get_entry_ids(self, model, definition):
+        return {entry.name: entry.id for entry in self.cm.session.query(model).filter_by(**definition)}
+
+    def test_refresh_namespace(self):
+        self.cm.ensure_namespace(self.namespace_url)
+        namespace = self.cm.session.query(models.Namespace).filter_by(url=self.namespace_url).one()
+        entry_ids = self.get_entry_ids(models.NamespaceEntry, {'namespace_id': namespace.id})
+
+        self.assertFalse(self.cm.refresh_namespace(self.namespace_url))
+        self.assertEqual([200, 304], self.server.statuses)
+
+        shutil.copy(test_ns_2, os.path.join(self.directory, 'test.belns'))
+
+        with mock.patch.object(self.http_cache, 'get') as get:
+            self.assertEqual([self.namespace_url], self.cm.refresh())
+
+        self.assertFalse(get.called, msg='Files should be streamed instead of read into memory')
+        self.assertEqual('1.1.0', namespace.version)
+
+        expected = CacheManager(connection='sqlite://').get_namespace(test_ns2)
+        self.assertEqual(expected, self.cm.get_namespace(self.namespace_url))
+
+        new_entry_ids = self.get_entry_ids(models.NamespaceEntry, {'namespace_id': namespace.id})
+        self.assertEqual(entry_ids['TestValue2'], new_entry_ids['TestValue2'])
+        self.assertNotIn('TestValue1', new_entry_ids)
+
+        self.assertFalse(self.cm.refresh_namespace(self.namespace_url))
+
+    def test_refresh_definition_missing(self):
+        self.cm.ensure_namespace(self.namespace_url)
+        self.assertFalse(self.cm.refresh_definition(self.namespace_url))
+
+        with self.assertRaises(ValueError):
+            self.cm.refresh_definition(self.server.url + 'missing.belanno')
+
+        with self.assertRaises(ValueError):
+            self.cm.refresh_definition(wine_iri)
+
+    def test_refresh_annotation(self):
+        self.cm.ensure_annotation(self.annotation_url)
+
+        self.assertEqual([], self.cm.refresh())
+
+        with open(test_an_1) as f:
+            content = f.read()
+
+        with open(os.path.join(self.directory, 'test.belanno'), 'w') as f:
+            f.write(content.replace('TestAnnot1|O', 'TestAnnot6|O').replace('TestAnnot2|O', 'TestAnnot2|P'))
+
+        self.assertTrue(self.cm.refresh_definition(self.annotation_url))
+
+        annotation = self.cm.get_annotation(self.annotation_url)
+        self.assertNotIn('TestAnnot1', annotation)
+        self.assertEqual('O', annotation['TestAnnot6'])
+        self.assertEqual('P', annotation['TestAnnot2'])
+        self.assertEqual(5, len(annotation))
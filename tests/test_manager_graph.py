@@ -6,11 +6,14 @@ import unittest
 from collections import Counter
 
 import sqlalchemy.exc
+import sqlalchemy.orm.exc
+from sqlalchemy.orm.exc import NoResultFound
 
 import pybel
-from pybel.constants import METADATA_NAME, METADATA_VERSION
+from pybel.constants import METADATA_NAME, METADATA_VERSION, ANNOTATIONS, GRAPH_ANNOTATION_URL, RELATION, EVIDENCE
 from pybel.manager import models
-from pybel.manager.graph_cache import GraphCacheManager
+from pybel.manager.graph_cache import GraphCacheManager, LazyBELGraph, load_blob
+from pybel.parser.utils import subdict_matches
 from tests import constants
 from tests.constants import BelReconstitutionMixin, test_bel_thorough, mock_bel_resources, \
     expected_test_thorough_metadata, test_bel_simple
@@ -50,6 +53,69 @@ class TestGraphCache(BelReconstitutionMixin, unittest.TestCase):
         g2 = self.gcm.get_graph(name, version)
         self.bel_thorough_reconstituted(g2)
 
+    @mock_bel_resources
+    def test_lazy(self, mock_get):
+        name = expected_test_thorough_metadata[METADATA_NAME]
+        version = expected_test_thorough_metadata[METADATA_VERSION]
+
+        self.gcm.insert_graph(self.graph)
+
+        graph = self.gcm.get_graph(name, version, lazy=True)
+        self.assertIsInstance(graph, LazyBELGraph)
+        self.assertIsInstance(graph, pybel.BELGraph)
+        self.assertFalse(graph.loaded)
+
+        self.assertEqual(self.graph.number_of_edges(), graph.number_of_edges())
+        self.assertTrue(graph.loaded)
+        self.assertEqual(self.graph, graph)
+        self.bel_thorough_reconstituted(graph.load())
+
+        graph = self.gcm.get_graph(name, version, lazy=True)
+        self.assertEqual(self.graph.document, graph.document)
+
+        graph = self.gcm.get_graph(name, version, lazy=True)
+        copied = pybel.from_bytes(pybel.to_bytes(graph))
+        self.assertIs(pybel.BELGraph, type(copied))
+        self.assertIs(pybel.BELGraph, type(graph.copy()))
+        self.bel_thorough_reconstituted(copied)
+
+        subgraph = graph.subgraph(graph.nodes()[:5])
+        self.assertEqual(5, subgraph.number_of_nodes())
+
+        with self.assertRaises(sqlalchemy.orm.exc.NoResultFound):
+            self.gcm.get_graph(name, 'missing version', lazy=True)
+
+    @mock_bel_resources
+    def test_summaries(self, mock_get):
+        self.gcm.insert_graph(self.graph)
+
+        network = self.gcm.session.query(models.Network).one()
+        self.assertNotIn('blob', network.__dict__)
+
+        summaries = self.gcm.get_network_summaries()
+        self.assertEqual(1, len(summaries))
+        self.assertNotIn('blob', summaries[0])
+        self.assertEqual(expected_test_thorough_metadata[METADATA_NAME], summaries[0]['name'])
+        self.assertEqual(self.graph.number_of_nodes(), summaries[0]['number_of_nodes'])
+        self.assertEqual(self.graph.number_of_edges(), summaries[0]['number_of_edges'])
+
+    @mock_bel_resources
+    def test_summaries_without_counts(self, mock_get):
+        """Tests networks stored before their numbers of nodes and edges were, which are NULL once migrated"""
+        self.gcm.insert_graph(self.graph)
+        self.gcm.session.query(models.Network).update({
+            models.Network.number_of_nodes: None,
+            models.Network.number_of_edges: None,
+        })
+        self.gcm.session.commit()
+
+        summary = self.gcm.get_network_summaries()[0]
+        self.assertEqual(self.graph.number_of_nodes(), summary['number_of_nodes'])
+        self.assertEqual(self.graph.number_of_edges(), summary['number_of_edges'])
+
+        counts = self.gcm.session.query(models.Network.number_of_nodes, models.Network.number_of_edges).one()
+        self.assertEqual((self.graph.number_of_nodes(), self.graph.number_of_edges()), tuple(counts))
+
     @mock_bel_resources
     def test_integrity_failure(self, mock_get):
         """Tests that a graph with the same name and version can't be added twice"""
@@ -118,6 +184,100 @@ class TestGraphCache(BelReconstitutionMixin, unittest.TestCase):
         g2 = self.gcm.get_graph(TEST_BEL_NAME, TEST_BEL_VERSION)
         self.bel_simple_reconstituted(g2)
 
+    @mock_bel_resources
+    def test_store_parts_bulk(self, mock_get):
+        network = self.gcm.insert_graph(self.simple_graph, store_parts=True, bulk=True, chunk_size=2)
+
+        citations = self.gcm.session.query(models.Citation).all()
+        self.assertEqual({'123455', '123456'}, {e.reference for e in citations})
+
+        authors = {'Example Author', 'Example Author2'}
+        self.assertEqual(authors, {a.name for a in self.gcm.session.query(models.Author).all()})
+        self.assertEqual(authors, {a.name for c in citations for a in c.authors})
+
+        evidences_strs = {'Evidence 1 w extra notes', 'Evidence 2', 'Evidence 3'}
+        self.assertEqual(evidences_strs, {e.text for e in self.gcm.session.query(models.Evidence).all()})
+        self.assertEqual(4, self.gcm.session.query(models.Node).count())
+
+        edges = self.gcm.session.query(models.Edge).all()
+        self.assertEqual(6, len(edges))
+        self.assertEqual({edge.id for edge in edges}, {edge.id for edge in network.edges})
+
+        for edge in network.edges:
+            self.assertEqual(edge.relation, load_blob(edge.blob)[RELATION])
+            self.assertEqual(edge.evidence.text, load_blob(edge.blob)[EVIDENCE])
+
+        self.simple_graph.document[METADATA_VERSION] = '1.7'
+        self.gcm.insert_graph(self.simple_graph, store_parts=True, bulk=True)
+        self.simple_graph.document[METADATA_VERSION] = TEST_BEL_VERSION
+
+        self.assertEqual(2, self.gcm.session.query(models.Citation).count())
+        self.assertEqual(2, self.gcm.session.query(models.Author).count())
+        self.assertEqual(3, self.gcm.session.query(models.Evidence).count())
+        self.assertEqual(4, self.gcm.session.query(models.Node).count())
+        self.assertEqual(12, self.gcm.session.query(models.Edge).count())
+
+    def add_simple_graph_with_annotations(self, **kwargs):
+        """Stores the simple graph in the Edge Store, with its TESTAN1 and TESTAN2 annotations"""
+        urls = {}
+
+        for keyword in 'TESTAN1', 'TESTAN2':
+            urls[keyword] = 'http://example.com/{}.belanno'.format(keyword.lower())
+            annotation = models.Annotation(url=urls[keyword], keyword=keyword, name=keyword)
+            for name in '123':
+                annotation.entries.append(models.AnnotationEntry(name=name))
+            self.gcm.session.add(annotation)
+
+        self.gcm.session.commit()
+
+        graph = pybel.from_bytes(pybel.to_bytes(self.simple_graph))
+        graph.graph[GRAPH_ANNOTATION_URL] = urls
+        self.gcm.insert_graph(graph, store_parts=True, **kwargs)
+
+        return graph
+
+    @mock_bel_resources
+    def test_get_graph_by_filter(self, mock_get):
+        graph = self.add_simple_graph_with_annotations()
+
+        def count_edges(**annotations):
+            return sum(1 for _, _, data in graph.edges_iter(data=True, annotations=annotations))
+
+        for annotations in ({'TESTAN1': '1'}, {'TESTAN1': ['1', '2']}, {'TESTAN1': '1', 'TESTAN2': '3'}, {}):
+            filtered = self.gcm.get_graph_by_filter(**annotations)
+            self.assertLess(0, filtered.number_of_edges())
+            self.assertEqual(count_edges(**annotations), filtered.number_of_edges())
+
+            for _, _, data in filtered.edges_iter(data=True):
+                self.assertTrue(subdict_matches(data[ANNOTATIONS], annotations))
+
+        self.assertEqual(0, self.gcm.get_graph_by_filter(TESTAN1='2', TESTAN2='3').number_of_edges())
+        self.assertEqual(count_edges(TESTAN1='1'), self.gcm.get_graph_by_filter(TESTAN1=u'1').number_of_edges())
+        self.assertEqual(0, self.gcm.get_graph_by_filter(TESTAN1=u'12').number_of_edges())
+
+        with self.assertRaises(ValueError):
+            self.gcm.get_graph_by_filter(TESTAN1=1)
+
+    @mock_bel_resources
+    def test_store_parts_bulk_annotations(self, mock_get):
+        graph = self.add_simple_graph_with_annotations(bulk=True)
+
+        edges = self.gcm.session.query(models.Edge).all()
+        self.assertEqual(6, len(edges))
+
+        for edge in edges:
+            data = load_blob(edge.blob)
+            expected = {(key, value) for key, value in data[ANNOTATIONS].items() if key.startswith('TESTAN')}
+            self.assertEqual(expected, {(entry.annotation.keyword, entry.name) for entry in edge.annotations})
+
+        graph.graph[GRAPH_ANNOTATION_URL]['TESTAN2'] = 'http://example.com/missing.belanno'
+        graph.document[METADATA_VERSION] = '1.7'
+
+        with self.assertRaises(NoResultFound):
+            self.gcm.insert_graph(graph, store_parts=True, bulk=True)
+
+        self.gcm.session.rollback()
+
 
 @unittest.skip('Feature not started yet')
 class TestFilter(BelReconstitutionMixin, unittest.TestCase):
@@ -2,12 +2,15 @@
 
 import logging
 import unittest
+from io import BytesIO
 from pathlib import Path
 
+import mock
+
 import pybel
 from pybel.constants import *
 from pybel.manager.cache import CacheManager
-from pybel.manager.utils import parse_owl, OWLParser
+from pybel.manager.utils import parse_owl, OWLParser, OWLReader, OWLFormatError, OWL_NODE, OWL_EDGE
 from pybel.parser.language import belns_encodings
 from pybel.parser.parse_metadata import MetadataParser
 from tests.constants import mock_parse_owl_rdf, mock_bel_resources, mock_parse_owl_pybel, test_owl_ado
@@ -50,6 +53,41 @@ class TestOwlUtils(unittest.TestCase):
         with self.assertRaises(Exception):
             parse_owl('http://example.com/not_owl')
 
+    def test_reader_not_owl_xml(self):
+        rdf = b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"/>'
+
+        for content in (rdf, b'not xml', b''):
+            with self.assertRaises(OWLFormatError):
+                list(OWLReader(BytesIO(content)))
+
+    @mock_parse_owl_rdf
+    def test_parse_owl_error(self, mock_rdf):
+        """Tests that errors in OWL/XML documents aren't hidden by reading them as RDF instead"""
+        content = b'<Ontology xmlns="http://www.w3.org/2002/07/owl#" ontologyIRI="http://example.com/o">' \
+                  b'<SubClassOf/></Ontology>'
+
+        with mock.patch('pybel.manager.utils.open_owl', return_value=BytesIO(content)):
+            with self.assertRaises(ValueError) as cm:
+                parse_owl('http://example.com/o')
+
+        self.assertNotIsInstance(cm.exception, OWLFormatError)
+        self.assertFalse(mock_rdf.called)
+
+    def test_reader(self):
+        reader = OWLReader(test_owl_pizza)
+        items = list(reader)
+
+        self.assertEqual('http://www.lesfleursdunormal.fr/static/_downloads/pizza_onto.owl', reader.iri)
+        self.assertEqual(EXPECTED_PIZZA_NODES, {item[1] for item in items if item[0] == OWL_NODE})
+        self.assertEqual(EXPECTED_PIZZA_EDGES, {item[1:3] for item in items if item[0] == OWL_EDGE})
+
+    def test_content(self):
+        with open(test_owl_pizza, 'rb') as f:
+            owl = OWLParser(content=f.read())
+
+        self.assertEqual(EXPECTED_PIZZA_NODES, set(owl.nodes()))
+        self.assertEqual(EXPECTED_PIZZA_EDGES, set(owl.edges()))
+
 
 class TestParsePizza(TestOwlBase):
     expected_prefixes = {
@@ -3,10 +3,12 @@
 import logging
 import unittest
 
+from pybel import BELGraph
 from pybel.canonicalize import decanonicalize_node, decanonicalize_edge
 from pybel.constants import *
 from pybel.parser.modifiers import FusionParser, LocationParser, GmodParser, FragmentParser, PmodParser
 from pybel.parser.modifiers import GsubParser, TruncParser, PsubParser, VariantParser
+from pybel.parser import BelParser
 from pybel.parser.parse_bel import canonicalize_modifier, canonicalize_node
 from pybel.parser.parse_exceptions import NestedRelationWarning, MalformedTranslocationWarning
 from tests.constants import TestTokenParserBase, SET_CITATION_TEST, test_set_evidence, build_variant_dict, \
@@ -3094,6 +3096,76 @@ class TestRelations(TestTokenParserBase):
         self.parser.parseString(statement)
 
 
+class TestSimpleRelation(unittest.TestCase):
+    namespaces = {
+        'HGNC': {'AKT1': 'GRP', 'EGFR': 'GRP', 'MIR21': 'GRM', 'EGF R': 'GRP'},
+        'CHEBI': {'water': 'A', 'nitric oxide': 'A'},
+        'GOBP': {'apoptosis': 'B'},
+        'MESHD': {'Alzheimer Disease': 'O'},
+        'SCOMP': {'AP-1 Complex': 'C'},
+    }
+
+    statements = [
+        'p(HGNC:AKT1) -> p(HGNC:EGFR)',
+        SET_CITATION_TEST,
+        'p(HGNC:AKT1) -> p(HGNC:EGFR)',
+        test_set_evidence,
+        'p(HGNC:AKT1) -> p(HGNC:EGFR)',
+        'proteinAbundance(HGNC:AKT1) increases proteinAbundance(HGNC:EGFR)',
+        'r(HGNC:AKT1)=>g( HGNC : EGFR )',
+        'm(HGNC:MIR21) -| r(HGNC:EGFR)',
+        'a(CHEBI:water) =| a(CHEBI:"nitric oxide")',
+        'p(HGNC:"EGF R") -- complex(SCOMP:"AP-1 Complex")',
+        'bp(GOBP:apoptosis) pos path(MESHD:"Alzheimer Disease")',
+        'o(MESHD:"Alzheimer Disease") negativeCorrelation bp(GOBP:apoptosis)',
+        'p(HGNC:AKT1) cnc p(HGNC:EGFR)',
+        'p(HGNC:AKT1) → p(HGNC:EGFR)',
+        'p(HGNC:AKT1) eq p(HGNC:EGFR)',
+        'p(HGNC:AKT1) isA p(HGNC:EGFR)',
+        'p(HGNC:AKT1) -> p(HGNC:MISSING)',
+        'p(HGNC:AKT1) -> p(UNDEFINED:EGFR)',
+        'p(HGNC:AKT1) -> bp(HGNC:EGFR)',
+        'p(HGNC:AKT1) -> p(HGNC:EGFR, pmod(Ph))',
+        'p(HGNC:AKT1) -> act(p(HGNC:EGFR))',
+        'p(HGNC:AKT1) hasMember p(HGNC:EGFR)',
+        'p(HGNC:AKT1) -> p(HGNC:EGFR) // comment',
+    ]
+
+    def build(self, fast_path):
+        graph = BELGraph()
+        parser = BelParser(graph, namespace_dicts=self.namespaces, complete_origin=True, fast_path=fast_path)
+        graph.parse_statements(enumerate(self.statements, start=1), parser)
+        return graph
+
+    def test_same_as_grammar(self):
+        slow_graph = self.build(fast_path=False)
+        fast_graph = self.build(fast_path=True)
+
+        self.assertEqual(sorted(slow_graph.nodes(data=True)), sorted(fast_graph.nodes(data=True)))
+        self.assertEqual(
+            sorted(slow_graph.edges(keys=True, data=True), key=str),
+            sorted(fast_graph.edges(keys=True, data=True), key=str)
+        )
+        self.assertEqual(
+            [(n, l, e.__class__, c) for n, l, e, c in slow_graph.warnings],
+            [(n, l, e.__class__, c) for n, l, e, c in fast_graph.warnings]
+        )
+
+    def test_fallback(self):
+        parser = BelParser(BELGraph(), namespace_dicts=self.namespaces, fast_path=True)
+        parser.parse_lines([SET_CITATION_TEST, test_set_evidence])
+
+        self.assertIsNotNone(parser.parse_simple_relation('p(HGNC:AKT1) -> p(HGNC:EGFR)'))
+        self.assertIsNone(parser.parse_simple_relation('p(HGNC:AKT1) -> p(HGNC:EGFR, pmod(Ph))'))
+        self.assertIsNone(parser.parse_simple_relation('p(HGNC:AKT1) -> act(p(HGNC:EGFR))'))
+        self.assertIsNone(parser.parse_simple_relation('p(HGNC:AKT1) hasMember p(HGNC:EGFR)'))
+        self.assertIsNone(parser.parse_simple_relation('act(HGNC:AKT1) -> p(HGNC:EGFR)'))
+        self.assertIsNone(parser.parse_simple_relation('p(HGNC:"A \\"B\\"") -> p(HGNC:EGFR)'))
+
+        result = parser.parseString('p(HGNC:AKT1) -> p(HGNC:EGFR, pmod(Ph))')
+        self.assertEqual(INCREASES, result[RELATION])
+
+
 class TestWrite(TestTokenParserBase):
     def test_1(self):
         cases = [
@@ -10,8 +10,9 @@ from pybel.parser.baseparser import nest
 from pybel.parser.language import amino_acid
 from pybel.parser.parse_exceptions import PlaceholderAminoAcidWarning
 from pybel.parser.parse_identifier import IdentifierParser
-from pybel.parser.utils import split_file_to_annotations_and_definitions
-from pybel.utils import download_url, list2tuple
+from pybel.parser.utils import split_file_to_annotations_and_definitions, split_statements_by_citation, \
+    split_file_to_annotations_and_definitions_lazy
+from pybel.utils import download_url, list2tuple, parse_definition, parse_definition_lines
 from tests.constants import test_an_1, test_bel_simple
 
 
@@ -36,6 +37,70 @@ class TestRandom(unittest.TestCase):
         self.assertEqual(4, len(definitions))
         self.assertEqual(14, len(statements))
 
+    def test_split_lines_lazy(self):
+        with open(test_bel_simple) as f:
+            expected = split_file_to_annotations_and_definitions(f)
+
+        with open(test_bel_simple) as f:
+            docs, definitions, statements = split_file_to_annotations_and_definitions_lazy(f)
+            self.assertEqual(expected[0], docs)
+            self.assertEqual(expected[1], definitions)
+            self.assertEqual(expected[2], list(statements))
+
+    def test_split_lines_lazy_reads_header_only(self):
+        lines_read = []
+
+        def read_lines():
+            with open(test_bel_simple) as f:
+                for line in f:
+                    lines_read.append(line)
+                    yield line
+
+        docs, definitions, statements = split_file_to_annotations_and_definitions_lazy(read_lines())
+        header_length = len(lines_read)
+
+        first_line_number, _ = next(statements)
+        self.assertEqual(header_length, first_line_number)
+        self.assertEqual(header_length, len(lines_read))
+
+        self.assertEqual(14, 1 + len(list(statements)))
+
+    def test_split_lines_lazy_late_definition(self):
+        lines = [
+            'SET DOCUMENT Name = "Test"',
+            'DEFINE NAMESPACE HGNC AS URL "http://example.com/hgnc.belns"',
+            'p(HGNC:A) -> p(HGNC:B)',
+            'DEFINE NAMESPACE CHEBI AS URL "http://example.com/chebi.belns"',
+            'p(HGNC:A) -> a(CHEBI:C)',
+        ]
+
+        docs, definitions, statements = split_file_to_annotations_and_definitions_lazy(lines)
+        self.assertEqual(1, len(docs))
+        self.assertEqual(1, len(definitions))
+        self.assertEqual((3, 'p(HGNC:A) -> p(HGNC:B)'), next(statements))
+
+        with self.assertRaises(ValueError):
+            next(statements)
+
+    def test_split_statements_by_citation(self):
+        statements = list(enumerate([
+            'SET Citation = {"PubMed","Title 1","1"}',
+            'p(HGNC:A) -> p(HGNC:B)',
+            'SET Citation = {"PubMed","Title 2","2"}',
+            'p(HGNC:A) -> p(HGNC:C)',
+            'SET STATEMENT_GROUP = "Group"',
+            'SET Citation = {"PubMed","Title 3","3"}',
+            'UNSET STATEMENT_GROUP',
+            'SET Citation = {"PubMed", "Title 4", "4"} garbage',
+            'SET Citation = {"PubMed", "Title \\"5\\"", "5"}',
+        ], start=1))
+
+        chunks = list(split_statements_by_citation(statements, 1))
+        self.assertEqual([[1, 2], [3, 4, 5, 6, 7], [8, 9]], [[n for n, _ in chunk] for chunk in chunks])
+
+        chunks = list(split_statements_by_citation(statements, 3))
+        self.assertEqual([[1, 2, 3, 4, 5, 6, 7], [8, 9]], [[n for n, _ in chunk] for chunk in chunks])
+
     def test_list2tuple(self):
         l = [None, 1, 's', [1, 2, [4], [[]]]]
         e = (None, 1, 's', (1, 2, (4,), ((),)))
@@ -58,6 +123,24 @@ class TestUtils(unittest.TestCase):
 
         self.assertEqual(expected_values, res['Values'])
 
+    def test_parse_definition_lines(self):
+        with open(test_an_1, 'rb') as f:
+            header, values = parse_definition_lines(f)
+
+            self.assertEqual('TESTAN1', header['AnnotationDefinition']['Keyword'])
+
+            values = iter(values)
+            self.assertEqual(('TestAnnot1', 'O'), next(values))
+            self.assertEqual(4, len(list(values)))
+
+    def test_parse_definition_repeated_names(self):
+        content = b'\n'.join([b'[Processing]', b'DelimiterString=|', b'[Values]', b'A|1', b'B|2', b'A|3'])
+        self.assertEqual({'A': '3', 'B': '2'}, parse_definition(content)['Values'])
+
+    def test_parse_definition_lines_missing_values(self):
+        with self.assertRaises(ValueError):
+            parse_definition_lines([b'[Processing]', b'DelimiterString=|'])
+
     def test_expand_dict(self):
         flat_dict = {
             'k1': 'v1',